@@ -0,0 +1,97 @@
+import re
+import numpy as np
+from typing import Dict, Any, List, Mapping, Sequence
+
+WORD_PATTERN = re.compile(r"[A-Za-z0-9']+")
+SENTENCE_PATTERN = re.compile(r"[.!?]+")
+VOWEL_GROUP_PATTERN = re.compile(r"[aeiouy]+")
+
+# Share of the 0-100 score each criterion carries
+SCORE_WEIGHTS = {
+    "keyword_coverage": 0.35,
+    "length_fit": 0.25,
+    "cta": 0.2,
+    "readability": 0.2
+}
+
+DEFAULT_HEADLINE_WORDS = (4, 12)
+DEFAULT_BODY_WORDS = (20, 60)
+
+def _syllables(word: str) -> int:
+    # Vowel groups, minus a silent trailing "e"; every word has at least one
+    count = len(VOWEL_GROUP_PATTERN.findall(word))
+    if word.endswith("e") and count > 1:
+        count -= 1
+    return max(1, count)
+
+def _length_fit(words: np.ndarray, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    # 1 inside the target range, falling off linearly with the distance outside it
+    distance = np.maximum(np.maximum(low - words, words - high), 0)
+    return np.clip(1 - distance / np.maximum(low, 1), 0, 1)
+
+class AdCopyScorer:
+    """Score ad copy candidates on keyword coverage, length fit, CTA and readability"""
+
+    def score(self, candidates: Sequence[Mapping[str, str]], platforms: Sequence[str], keywords: Sequence[str], platform_templates: Mapping[str, Any]) -> np.ndarray:
+        """Get a 0-100 score per candidate; platforms[i] is the platform of candidates[i]"""
+        count = len(candidates)
+        if count == 0:
+            return np.zeros(0)
+
+        # Per-candidate text statistics are one regex pass each; the scoring is vectorized
+        headline_words = np.empty(count)
+        body_words = np.empty(count)
+        words_per_sentence = np.empty(count)
+        syllables_per_word = np.empty(count)
+        for i, candidate in enumerate(candidates):
+            body = candidate["body"]
+            words = WORD_PATTERN.findall(body)
+            headline_words[i] = len(WORD_PATTERN.findall(candidate["headline"]))
+            body_words[i] = len(words)
+            words_per_sentence[i] = len(words) / max(1, len(SENTENCE_PATTERN.findall(body)))
+            syllables_per_word[i] = sum(_syllables(word.lower()) for word in words) / max(1, len(words))
+
+        texts = np.array([f"{c['headline']} {c['body']} {c['keywords']}".lower() for c in candidates])
+        terms = np.array([keyword.lower() for keyword in keywords if keyword])
+        if terms.size:
+            keyword_coverage = (np.char.find(texts[:, None], terms[None, :]) >= 0).mean(axis=1)
+        else:
+            keyword_coverage = np.ones(count)
+
+        templates = [platform_templates.get(platform, {}) for platform in platforms]
+        headline_range = np.array([template.get("headline_words", DEFAULT_HEADLINE_WORDS) for template in templates], dtype=float)
+        body_range = np.array([template.get("body_words", DEFAULT_BODY_WORDS) for template in templates], dtype=float)
+        length_fit = (
+            0.3 * _length_fit(headline_words, headline_range[:, 0], headline_range[:, 1])
+            + 0.7 * _length_fit(body_words, body_range[:, 0], body_range[:, 1])
+        )
+
+        # A listed CTA scores fully; any other short CTA partially
+        cta = np.array([
+            1.0 if candidate["cta"].lower() in {option.lower() for option in template.get("cta_options", ())}
+            else 0.6 if 0 < len(WORD_PATTERN.findall(candidate["cta"])) <= 5
+            else 0.0
+            for candidate, template in zip(candidates, templates)
+        ])
+
+        # Flesch reading ease mapped so 30 (dense) -> 0 and 80 (plain) -> 1
+        reading_ease = 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word
+        readability = np.clip((reading_ease - 30) / 50, 0, 1)
+
+        features = np.stack([keyword_coverage, length_fit, cta, readability], axis=1)
+        weights = np.array([SCORE_WEIGHTS[name] for name in ("keyword_coverage", "length_fit", "cta", "readability")])
+        return np.round(features @ weights * 100, 1)
+
+    def best_per_platform(self, candidates_by_platform: Dict[str, List[Dict[str, str]]], keywords: Sequence[str], platform_templates: Mapping[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Score every platform's candidates in one pass and keep the highest scoring one"""
+        flat = [(platform, candidate) for platform, candidates in candidates_by_platform.items() for candidate in candidates]
+        scores = self.score([candidate for _, candidate in flat], [platform for platform, _ in flat], keywords, platform_templates)
+
+        best: Dict[str, Dict[str, Any]] = {}
+        for (platform, candidate), score in zip(flat, scores.tolist()):
+            if platform not in best or score > best[platform]["quality_score"]:
+                best[platform] = {**candidate, "quality_score": score, "candidates": len(candidates_by_platform[platform])}
+        return best
+
+# Global scorer shared by ad copy generation
+ad_copy_scorer = AdCopyScorer()
@@ -3,6 +3,8 @@ from typing import Dict, Any, Optional
 from pydantic import BaseModel
 import os
 from marketing_intelligence import api_config
+from knowledge_base import knowledge_base
+from db_migrations import schema_migrator
 
 router = APIRouter(prefix="/api/admin", tags=["Admin Configuration"])
 
@@ -10,12 +12,14 @@ class APIConfigUpdate(BaseModel):
     use_real_apis: bool
     brave_api_key: Optional[str] = None
     perplexity_api_key: Optional[str] = None
+    llm_base_url: Optional[str] = None
 
 class APIStatus(BaseModel):
     use_real_apis: bool
     brave_api_configured: bool
     perplexity_api_configured: bool
     emergent_llm_configured: bool
+    llm_base_url: Optional[str] = None
     configuration_guide: Dict[str, str]
 
 def verify_admin_key(x_admin_key: Optional[str] = Header(None)):
@@ -166,4 +170,57 @@ async def test_apis(admin_key: str = Depends(verify_admin_key)):
             "Optionally add Perplexity API key for additional news sources",
             "Emergent LLM key is already configured for AI features"
         ]
-    }
\ No newline at end of file
+    }
+
+@router.get("/knowledge-base")
+async def get_knowledge_base_status(admin_key: str = Depends(verify_admin_key)):
+    """Get version, table sizes and compile time of the persona rules"""
+    return knowledge_base.get_stats()
+
+@router.post("/knowledge-base/reload")
+async def reload_knowledge_base(admin_key: str = Depends(verify_admin_key)):
+    """Recompile the persona rules file without restarting"""
+    
+    try:
+        stats = knowledge_base.load()
+    except (OSError, ValueError) as e:
+        # A broken rules file leaves the previously compiled tables in place
+        raise HTTPException(status_code=400, detail=f"Knowledge base reload failed: {str(e)}")
+    
+    return {
+        "message": "Knowledge base reloaded successfully",
+        "knowledge_base": stats
+    }
+
+@router.get("/db/schema")
+async def get_schema_status(admin_key: str = Depends(verify_admin_key)):
+    """Get the applied and pending schema migrations"""
+    from server import db
+    return await schema_migrator.get_status(db)
+
+@router.post("/db/migrate")
+async def run_schema_migrations(admin_key: str = Depends(verify_admin_key)):
+    """Apply pending schema migrations now"""
+    from server import db
+    
+    try:
+        applied = await schema_migrator.migrate(db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Schema migration failed: {str(e)}")
+    
+    return {
+        "message": f"Applied {len(applied)} migration(s)",
+        "applied": applied,
+        "schema": await schema_migrator.get_status(db)
+    }
+
+@router.get("/db/explain")
+async def explain_hot_queries(admin_key: str = Depends(verify_admin_key)):
+    """Get the query plans of the hot campaign queries to verify index coverage"""
+    from server import db
+    
+    reports = await schema_migrator.explain(db)
+    return {
+        "queries": reports,
+        "collection_scans": [report["query"] for report in reports if report["collection_scan"]]
+    }
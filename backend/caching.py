@@ -0,0 +1,90 @@
+import time
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Optional, Tuple
+
+class LRUCache:
+    """Bounded least-recently-used cache with optional expiry and hit/miss statistics"""
+
+    def __init__(self, name: str, max_size: int = 1024, ttl_seconds: Optional[float] = None):
+        self.name = name
+        self.max_size = max(1, max_size)
+        self.ttl_seconds = ttl_seconds
+        # key -> (value, expiry timestamp or None)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        # Register so the stats endpoint can report every cache in the process
+        self.registry_key = register_cache(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, marking it as recently used"""
+        with self._lock:
+            if key in self._entries:
+                value, expires_at = self._entries[key]
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry when full"""
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all cached entries (statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit rate statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+# Registry of live named caches in this process; a cache drops out when it is garbage collected
+cache_registry: "weakref.WeakValueDictionary[str, LRUCache]" = weakref.WeakValueDictionary()
+_registry_lock = threading.Lock()
+
+def register_cache(cache: LRUCache) -> str:
+    """Register a cache under its name, suffixed #2, #3, ... when another live cache has it; returns the key"""
+    with _registry_lock:
+        key, count = cache.name, 1
+        while key in cache_registry:
+            count += 1
+            key = f"{cache.name}#{count}"
+        cache_registry[key] = cache
+        return key
+
+def get_cache_stats(name: Optional[str] = None) -> Dict[str, Any]:
+    """Get statistics for one named cache or for all registered caches"""
+    if name is not None:
+        cache = cache_registry.get(name)
+        return cache.get_stats() if cache is not None else {}
+    return {cache_name: cache.get_stats() for cache_name, cache in list(cache_registry.items())}
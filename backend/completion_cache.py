@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path(__file__).parent / "media" / "llm_completions.sqlite3"
+
+# Completion kinds with separate hit statistics
+COMPLETION_KINDS = ("text", "image")
+
+class CompletionCache:
+    """Persistent LLM completion cache keyed by a fingerprint of (model, prompt, params)"""
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 10000, ttl_seconds: Optional[float] = 7 * 24 * 3600):
+        self.path = Path(path or os.environ.get("LLM_CACHE_PATH") or DEFAULT_CACHE_PATH)
+        self.enabled = os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true"
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        # Savings add up the cost each entry was priced at by llm_usage when generated
+        self.stats = {kind: {"hits": 0, "misses": 0, "cost_saved_usd": 0.0} for kind in COMPLETION_KINDS}
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def fingerprint(kind: str, prompt: str, **params: Any) -> str:
+        """Get the cache key for a completion of prompt with the given model and params"""
+        payload = json.dumps({"kind": kind, "prompt": prompt, **params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened lazily so importing the module never touches the disk
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "fingerprint TEXT PRIMARY KEY, kind TEXT NOT NULL, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_used REAL NOT NULL, cost_usd REAL NOT NULL DEFAULT 0)"
+            )
+            # Caches created before entries were priced count their hits as free
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(completions)")}
+            if "cost_usd" not in columns:
+                connection.execute("ALTER TABLE completions ADD COLUMN cost_usd REAL NOT NULL DEFAULT 0")
+            connection.execute("CREATE INDEX IF NOT EXISTS completions_last_used ON completions (last_used)")
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def get(self, fingerprint: str, kind: str = "text") -> Optional[str]:
+        """Get a cached completion, or None when absent or expired"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute("SELECT value, created_at, cost_usd FROM completions WHERE fingerprint = ?", (fingerprint,)).fetchone()
+            if row is not None and self.ttl_seconds and row[1] + self.ttl_seconds <= now:
+                connection.execute("DELETE FROM completions WHERE fingerprint = ?", (fingerprint,))
+                connection.commit()
+                self.expirations += 1
+                row = None
+            if row is None:
+                self.stats[kind]["misses"] += 1
+                return None
+            connection.execute("UPDATE completions SET last_used = ? WHERE fingerprint = ?", (now, fingerprint))
+            connection.commit()
+            self.stats[kind]["hits"] += 1
+            self.stats[kind]["cost_saved_usd"] += row[2]
+            return row[0]
+
+    def put(self, fingerprint: str, value: str, kind: str = "text", cost_usd: float = 0.0):
+        """Store a completion with what generating it cost, evicting the least recently used entries beyond the size bound"""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO completions (fingerprint, kind, value, created_at, last_used, cost_usd) VALUES (?, ?, ?, ?, ?, ?)",
+                (fingerprint, kind, value, now, now, cost_usd)
+            )
+            excess = connection.execute("SELECT COUNT(*) FROM completions").fetchone()[0] - self.max_entries
+            if excess > 0:
+                connection.execute(
+                    "DELETE FROM completions WHERE fingerprint IN "
+                    "(SELECT fingerprint FROM completions ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+                self.evictions += excess
+            connection.commit()
+
+    def record_hit(self, kind: str, cost_usd: float = 0.0):
+        """Count a completion served from another persistent store (e.g. stored images)"""
+        with self._lock:
+            self.stats[kind]["hits"] += 1
+            self.stats[kind]["cost_saved_usd"] += cost_usd
+
+    def record_miss(self, kind: str):
+        """Count a completion that had to be generated outside this cache"""
+        with self._lock:
+            self.stats[kind]["misses"] += 1
+
+    def clear(self):
+        """Drop every cached completion (statistics are kept)"""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM completions")
+            connection.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get entry count, hit rates and cost saved per completion kind, priced like llm_usage"""
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM completions").fetchone()[0] if self.enabled else 0
+            kinds = {}
+            for kind, counts in self.stats.items():
+                lookups = counts["hits"] + counts["misses"]
+                kinds[kind] = {
+                    **counts,
+                    "hit_rate": round(counts["hits"] / lookups, 4) if lookups else 0.0,
+                    "cost_saved_usd": round(counts["cost_saved_usd"], 6)
+                }
+        return {
+            "enabled": self.enabled,
+            "path": str(self.path),
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "kinds": kinds,
+            "cost_saved_usd": round(sum(kind["cost_saved_usd"] for kind in kinds.values()), 6)
+        }
+
+# Global completion cache shared by text and image generation
+completion_cache = CompletionCache(
+    max_entries=int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.environ.get("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))) or None
+)
@@ -0,0 +1,212 @@
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, Awaitable, Callable, List, NamedTuple, Optional, Tuple
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from history_search import history_search_tokens, SEARCH_FIELDS
+
+logger = logging.getLogger(__name__)
+
+class Migration(NamedTuple):
+    """One schema version: indexes to ensure per collection and an optional data step"""
+    version: int
+    description: str
+    indexes: Dict[str, List[IndexModel]]
+    apply: Optional[Callable[[Any], Awaitable[None]]] = None
+
+class MigrationError(Exception):
+    """A migration cannot apply to the data as it stands"""
+
+# Sparse, so legacy documents without an id do not block the unique index
+UNIQUE_ID = {"unique": True, "sparse": True}
+
+async def duplicate_values(collection, field: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """Get values of field shared by more than one document, with their counts"""
+    pipeline = [
+        {"$match": {field: {"$exists": True}}},
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": limit}
+    ]
+    return [{"value": group["_id"], "count": group["count"]} async for group in collection.aggregate(pipeline)]
+
+async def backfill_history_search_tokens(db):
+    """Store search_tokens on history documents saved before history search was indexed"""
+    projection = {field: 1 for field in SEARCH_FIELDS}
+    async for document in db.campaign_history.find({"search_tokens": {"$exists": False}}, projection):
+        await db.campaign_history.update_one(
+            {"_id": document["_id"]},
+            {"$set": {"search_tokens": history_search_tokens(document)}}
+        )
+
+# Applied in version order, each exactly once; index creation is idempotent, so
+# a version interrupted before it was recorded is safe to run again. A version
+# that fails is retried on the next run without holding back the later ones.
+MIGRATIONS = [
+    Migration(1, "Unique ids and newest-first listing for campaigns and campaign history", {
+        "campaigns": [
+            IndexModel([("id", ASCENDING)], name="id_unique", **UNIQUE_ID),
+            IndexModel([("created_at", DESCENDING)], name="created_at_desc")
+        ],
+        "campaign_history": [
+            IndexModel([("id", ASCENDING)], name="id_unique", **UNIQUE_ID),
+            IndexModel([("created_at", DESCENDING)], name="created_at_desc")
+        ]
+    }),
+    Migration(2, "Per-campaign metrics timeline and ROI ranking", {
+        "campaign_metrics": [
+            IndexModel([("id", ASCENDING)], name="id_unique", **UNIQUE_ID),
+            IndexModel([("campaign_id", ASCENDING), ("date_recorded", DESCENDING)], name="campaign_id_date_recorded_desc"),
+            IndexModel([("roi", DESCENDING)], name="roi_desc")
+        ]
+    }),
+    Migration(3, "Indexed history search on edge n-gram search tokens", {
+        "campaign_history": [
+            IndexModel([("search_tokens", ASCENDING), ("created_at", DESCENDING)], name="search_tokens_created_at_desc")
+        ]
+    }, backfill_history_search_tokens)
+]
+
+class HotQuery(NamedTuple):
+    """A query the API runs on every request of some endpoint, explained to verify index coverage"""
+    name: str
+    collection: str
+    filter: Dict[str, Any]
+    sort: List[Tuple[str, int]]
+    limit: int
+
+HOT_QUERIES = [
+    HotQuery("campaigns_recent", "campaigns", {}, [("created_at", DESCENDING)], 100),
+    HotQuery("campaign_by_id", "campaigns", {"id": ""}, [], 1),
+    HotQuery("history_page", "campaign_history", {}, [("created_at", DESCENDING)], 10),
+    HotQuery("history_search", "campaign_history", {"search_tokens": {"$all": ["new", "york"]}}, [("created_at", DESCENDING)], 10),
+    HotQuery("history_by_id", "campaign_history", {"id": ""}, [], 1),
+    HotQuery("metrics_timeline", "campaign_metrics", {"campaign_id": ""}, [("date_recorded", DESCENDING)], 100),
+    HotQuery("top_roi", "campaign_metrics", {}, [("roi", DESCENDING)], 5)
+]
+
+def _plan_stages(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Flatten a winning plan tree top-down into its stages
+    stages = [{"stage": plan.get("stage"), **({"index": plan["indexName"]} if "indexName" in plan else {})}]
+    children = plan.get("inputStages") or ([plan["inputStage"]] if "inputStage" in plan else [])
+    for child in children:
+        stages.extend(_plan_stages(child))
+    return stages
+
+class SchemaMigrator:
+    """Applies versioned index and data migrations once per database and reports hot query plans"""
+
+    def __init__(self, migrations: List[Migration] = MIGRATIONS, hot_queries: List[HotQuery] = HOT_QUERIES, collection: str = "schema_migrations"):
+        self.migrations = sorted(migrations, key=lambda migration: migration.version)
+        self.hot_queries = hot_queries
+        self.collection = collection
+        # Errors of versions that failed in this process, by version
+        self.failures: Dict[int, str] = {}
+
+    @property
+    def latest_version(self) -> int:
+        return self.migrations[-1].version if self.migrations else 0
+
+    async def applied_versions(self, db) -> Dict[int, Dict[str, Any]]:
+        """Get the recorded migrations by version"""
+        records = await db[self.collection].find().to_list(None)
+        return {record["_id"]: record for record in records}
+
+    async def _check_unique_indexes(self, db, migration: Migration):
+        # A unique index build fails on existing duplicates; report them instead
+        conflicts = {}
+        for collection, indexes in migration.indexes.items():
+            for index in indexes:
+                document = index.document
+                if document.get("unique") and len(document["key"]) == 1:
+                    field = next(iter(document["key"]))
+                    duplicates = await duplicate_values(db[collection], field)
+                    if duplicates:
+                        conflicts[f"{collection}.{field}"] = duplicates
+        if conflicts:
+            raise MigrationError(f"Duplicate values block unique indexes: {conflicts}")
+
+    async def _apply(self, db, migration: Migration):
+        await self._check_unique_indexes(db, migration)
+        for collection, indexes in migration.indexes.items():
+            await db[collection].create_indexes(indexes)
+        if migration.apply is not None:
+            await migration.apply(db)
+        try:
+            await db[self.collection].insert_one({
+                "_id": migration.version,
+                "description": migration.description,
+                "applied_at": datetime.now(timezone.utc).isoformat()
+            })
+        except DuplicateKeyError:
+            pass  # Another worker finished the same version first
+
+    async def migrate(self, db) -> List[int]:
+        """Apply every unrecorded migration in order; returns the versions applied now
+
+        A failing version is logged and kept in failures, and the later versions
+        still run.
+        """
+        applied = await self.applied_versions(db)
+        newly_applied = []
+        for migration in self.migrations:
+            if migration.version in applied:
+                continue
+            try:
+                await self._apply(db, migration)
+            except (MigrationError, OperationFailure) as e:
+                self.failures[migration.version] = str(e)
+                logger.error(f"Schema migration {migration.version} failed: {e}")
+                continue
+            self.failures.pop(migration.version, None)
+            logger.info(f"Applied schema migration {migration.version}: {migration.description}")
+            newly_applied.append(migration.version)
+        return newly_applied
+
+    async def get_status(self, db) -> Dict[str, Any]:
+        """Get the current and latest schema versions with the applied and pending migrations"""
+        applied = await self.applied_versions(db)
+        return {
+            "current_version": max(applied, default=0),
+            "latest_version": self.latest_version,
+            "applied": [
+                {"version": version, "description": record.get("description"), "applied_at": record.get("applied_at")}
+                for version, record in sorted(applied.items())
+            ],
+            "pending": [
+                {"version": migration.version, "description": migration.description, "error": self.failures.get(migration.version)}
+                for migration in self.migrations if migration.version not in applied
+            ]
+        }
+
+    async def explain(self, db) -> List[Dict[str, Any]]:
+        """Get the winning plan of every hot query, flagging collection scans and in-memory sorts"""
+        reports = []
+        for query in self.hot_queries:
+            cursor = db[query.collection].find(query.filter).limit(query.limit)
+            if query.sort:
+                cursor = cursor.sort(query.sort)
+            explained = await cursor.explain()
+
+            planner = explained.get("queryPlanner", {})
+            winning_plan = planner.get("winningPlan", {})
+            # Slot-based engine plans nest the classic plan tree under queryPlan
+            stages = _plan_stages(winning_plan.get("queryPlan", winning_plan))
+            stage_names = [stage["stage"] for stage in stages]
+            execution = explained.get("executionStats", {})
+            reports.append({
+                "query": query.name,
+                "collection": query.collection,
+                "filter": query.filter,
+                "sort": dict(query.sort),
+                "stages": stages,
+                "indexes": [stage["index"] for stage in stages if "index" in stage],
+                "collection_scan": "COLLSCAN" in stage_names,
+                "in_memory_sort": "SORT" in stage_names,
+                "docs_examined": execution.get("totalDocsExamined"),
+                "keys_examined": execution.get("totalKeysExamined")
+            })
+        return reports
+
+# Global migrator run on startup and by the admin endpoints
+schema_migrator = SchemaMigrator()
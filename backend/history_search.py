@@ -0,0 +1,37 @@
+import re
+import unicodedata
+from typing import Dict, Any, Iterable, List
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Fields of a campaign history document that search matches against
+SEARCH_FIELDS = ("title", "age_range", "geographic_location", "interests")
+
+# Longer query tokens are matched on their first MAX_GRAM characters
+MAX_GRAM = 15
+
+def normalize_tokens(text: str) -> List[str]:
+    """Lowercase, accent-folded alphanumeric tokens of a text"""
+    folded = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return TOKEN_PATTERN.findall(folded.lower())
+
+def edge_ngrams(token: str) -> Iterable[str]:
+    """Every prefix of a token up to MAX_GRAM characters"""
+    return (token[:length] for length in range(1, min(len(token), MAX_GRAM) + 1))
+
+def history_search_tokens(document: Dict[str, Any]) -> List[str]:
+    """Get the indexed search_tokens of a history document: edge n-grams of its searchable words"""
+    grams = set()
+    for field in SEARCH_FIELDS:
+        value = document.get(field) or ""
+        for text in (value if isinstance(value, list) else [value]):
+            for token in normalize_tokens(str(text)):
+                grams.update(edge_ngrams(token))
+    return sorted(grams)
+
+def history_search_filter(search: str) -> Dict[str, Any]:
+    """Get the query matching documents with a word starting with each word of the search"""
+    terms = sorted({token[:MAX_GRAM] for token in normalize_tokens(search)})
+    if not terms:
+        return {}
+    return {"search_tokens": {"$all": terms}}
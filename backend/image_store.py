@@ -0,0 +1,243 @@
+import io
+import os
+import re
+import json
+import base64
+import asyncio
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+import httpx
+
+try:
+    from PIL import Image
+except ImportError:  # Derivatives are optional; originals are served without Pillow
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_MEDIA_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".webp": "image/webp",
+    ".svg": "image/svg+xml"
+}
+
+IMAGE_HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+# Resized copies offered by the image endpoint: size (px, longest side) and format
+DERIVATIVE_SIZES = (128, 256, 512)
+DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg")
+}
+
+DATA_URL_PATTERN = re.compile(r"^data:(?P<media_type>[\w/+.-]+)?(?:;[\w=-]+)*;base64,(?P<payload>.*)$", re.DOTALL)
+
+def sniff_extension(data: bytes) -> Optional[str]:
+    """Get the file extension for image bytes from their magic number"""
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return ".webp"
+    if b"<svg" in data[:512]:
+        return ".svg"
+    return None
+
+class PersonaImageStore:
+    """Content-addressed persona images on local disk, served by hash"""
+
+    def __init__(self, root_dir: Optional[str] = None, public_base_url: Optional[str] = None, max_image_bytes: int = 20 * 1024 * 1024):
+        self.root_dir = Path(root_dir or os.environ.get("PERSONA_IMAGE_DIR") or Path(__file__).parent / "media" / "persona_images")
+        self.public_base_url = (public_base_url if public_base_url is not None else os.environ.get("IMAGE_PUBLIC_BASE_URL", "")).rstrip("/")
+        self.max_image_bytes = max_image_bytes
+        self.download_timeout = float(os.environ.get("IMAGE_DOWNLOAD_TIMEOUT", "30"))
+        # Reference mode: image fields hold short URLs to the image endpoint, never data: URLs
+        self.reference_mode = os.environ.get("IMAGE_REFERENCE_MODE", "true").lower() == "true"
+        self.derivatives_at_ingest = os.environ.get("IMAGE_DERIVATIVES_AT_INGEST", "false").lower() == "true"
+        # One in-flight download per hash; concurrent requests wait for it
+        self._downloads: Dict[str, asyncio.Future] = {}
+        self.stats = {"stored": 0, "downloads": 0, "download_failures": 0, "deduplicated": 0, "derivatives": 0}
+
+    @staticmethod
+    def prompt_hash(prompt: str, **params: Any) -> str:
+        """Get the store key for an image generated from prompt and params"""
+        payload = json.dumps({"prompt": prompt, **params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def url_for(self, image_hash: str) -> str:
+        """Get the URL the image endpoint serves a stored image from"""
+        return f"{self.public_base_url}/api/marketing/images/{image_hash}"
+
+    def _base_path(self, image_hash: str) -> Path:
+        # Two-level fan-out keeps directories small
+        return self.root_dir / image_hash[:2] / image_hash
+
+    def find(self, image_hash: str) -> Optional[Tuple[Path, str]]:
+        """Get the path and media type of a stored image (None if absent)"""
+        if not IMAGE_HASH_PATTERN.match(image_hash):
+            return None
+        base_path = self._base_path(image_hash)
+        for extension, media_type in IMAGE_MEDIA_TYPES.items():
+            path = base_path.with_suffix(extension)
+            if path.is_file():
+                return path, media_type
+        return None
+
+    def put(self, image_hash: str, data: bytes) -> Path:
+        """Store image bytes under a hash (atomic; existing images are kept)"""
+        extension = sniff_extension(data)
+        if extension is None:
+            raise ValueError("Unrecognized image format")
+        if len(data) > self.max_image_bytes:
+            raise ValueError(f"Image exceeds {self.max_image_bytes} bytes")
+
+        path = self._base_path(image_hash).with_suffix(extension)
+        if path.is_file():
+            return path
+
+        self._write_atomic(path, data)
+        self.stats["stored"] += 1
+        return path
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def derivative(self, image_hash: str, size: int, image_format: str = "webp") -> Optional[Tuple[Path, str]]:
+        """Get a resized copy of a stored image, creating it on first use
+
+        SVGs, and every image when Pillow is not installed, are returned as
+        stored originals.
+        """
+        original = self.find(image_hash)
+        if original is None:
+            return None
+        path, media_type = original
+        if Image is None or media_type == "image/svg+xml":
+            return original
+
+        pil_format, derivative_type = DERIVATIVE_FORMATS[image_format]
+        derivative_path = path.with_name(f"{image_hash}.{size}.{image_format}")
+        if derivative_path.is_file():
+            return derivative_path, derivative_type
+
+        with Image.open(path) as image:
+            image = image.convert("RGBA" if pil_format == "WEBP" and image.mode in ("RGBA", "LA", "P") else "RGB")
+            # thumbnail keeps the aspect ratio and never upscales
+            image.thumbnail((size, size), Image.LANCZOS)
+            buffer = io.BytesIO()
+            image.save(buffer, pil_format, quality=82)
+
+        self._write_atomic(derivative_path, buffer.getvalue())
+        self.stats["derivatives"] += 1
+        return derivative_path, derivative_type
+
+    def create_derivatives(self, image_hash: str):
+        """Pre-render every derivative size of an image in every format"""
+        for size in DERIVATIVE_SIZES:
+            for image_format in DERIVATIVE_FORMATS:
+                self.derivative(image_hash, size, image_format)
+
+    def put_content(self, data: bytes) -> str:
+        """Store image bytes under the hash of their content and return the hash"""
+        image_hash = hashlib.sha256(data).hexdigest()
+        self.put(image_hash, data)
+        return image_hash
+
+    def store_data_url(self, data_url: str) -> Optional[str]:
+        """Move a base64 data: URL into the store and return its reference URL"""
+        match = DATA_URL_PATTERN.match(data_url)
+        if not match:
+            return None
+        try:
+            data = base64.b64decode(match.group("payload"), validate=True)
+            return self.url_for(self.put_content(data))
+        except ValueError as e:
+            logger.warning(f"Could not store inline image: {e}")
+            return None
+
+    def externalize(self, image_url: Optional[str]) -> Optional[str]:
+        """Replace an inline data: URL by a reference URL when reference mode is on"""
+        if self.reference_mode and image_url and image_url.startswith("data:"):
+            return self.store_data_url(image_url) or image_url
+        return image_url
+
+    async def migrate_inline_images(self, collection, field: str = "intelligence_data.persona_image_url") -> int:
+        """Rewrite documents whose image field still holds a data: URL; returns how many changed"""
+        migrated = 0
+        cursor = collection.find({field: {"$regex": "^data:"}}, {"_id": 1, field: 1})
+        async for document in cursor:
+            value = document
+            for part in field.split("."):
+                value = value.get(part) if isinstance(value, dict) else None
+            if not isinstance(value, str):
+                continue
+            image_url = await asyncio.to_thread(self.store_data_url, value)
+            if image_url:
+                await collection.update_one({"_id": document["_id"]}, {"$set": {field: image_url}})
+                migrated += 1
+        return migrated
+
+    async def fetch(self, image_hash: str, source_url: str) -> bool:
+        """Download an image into the store once; returns whether it is stored"""
+        if self.find(image_hash):
+            return True
+
+        pending = self._downloads.get(image_hash)
+        if pending is not None:
+            self.stats["deduplicated"] += 1
+            return await asyncio.shield(pending)
+
+        pending = asyncio.get_running_loop().create_future()
+        self._downloads[image_hash] = pending
+        stored = False
+        try:
+            stored = await self._download(image_hash, source_url)
+            return stored
+        finally:
+            pending.set_result(stored)
+            del self._downloads[image_hash]
+
+    async def _download(self, image_hash: str, source_url: str) -> bool:
+        self.stats["downloads"] += 1
+        try:
+            async with httpx.AsyncClient(timeout=self.download_timeout, follow_redirects=True) as client:
+                response = await client.get(source_url)
+                response.raise_for_status()
+            await asyncio.to_thread(self.put, image_hash, response.content)
+        except Exception as e:
+            self.stats["download_failures"] += 1
+            logger.error(f"Failed to store persona image {image_hash[:12]}: {e}")
+            return False
+
+        if self.derivatives_at_ingest:
+            try:
+                await asyncio.to_thread(self.create_derivatives, image_hash)
+            except Exception as e:
+                logger.warning(f"Failed to pre-render derivatives for {image_hash[:12]}: {e}")
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store location and download statistics"""
+        return {
+            "root_dir": str(self.root_dir),
+            "reference_mode": self.reference_mode,
+            "derivatives_available": Image is not None,
+            **self.stats
+        }
+
+# Global store shared by image generation and the image endpoint
+image_store = PersonaImageStore()
@@ -0,0 +1,143 @@
+import hashlib
+import threading
+import logging
+from array import array
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def sketch_indexes(key: str, width: int, depth: int) -> List[int]:
+    """Row positions of key in a width x depth sketch"""
+    # Double hashing: derive all row positions from one 128-bit digest
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:], 'little') | 1
+    return [(h1 + row * h2) % width for row in range(depth)]
+
+class CountMinSketch:
+    """Fixed-memory frequency estimator (Count-Min with conservative update)"""
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self._rows = [array('I', bytes(4 * width)) for _ in range(depth)]
+
+    def add(self, key: str, count: int = 1, indexes: Optional[List[int]] = None) -> int:
+        """Count key and return its new estimated frequency"""
+        indexes = indexes if indexes is not None else sketch_indexes(key, self.width, self.depth)
+        estimate = min(row[index] for row, index in zip(self._rows, indexes)) + count
+        for row, index in zip(self._rows, indexes):
+            if row[index] < estimate:
+                row[index] = estimate
+        self.total += count
+        return estimate
+
+    def estimate(self, key: str) -> int:
+        """Get the estimated frequency of key (never an underestimate)"""
+        return min(row[index] for row, index in zip(self._rows, sketch_indexes(key, self.width, self.depth)))
+
+class TopKTracker:
+    """Keep the k keys with the highest sketch estimates"""
+
+    def __init__(self, k: int = 20):
+        self.k = k
+        self._counts: Dict[str, int] = {}
+        self._display: Dict[str, str] = {}
+        self._ranked: Optional[List[Tuple[str, int]]] = None
+
+    def offer(self, key: str, display: str, estimate: int):
+        """Update key's estimate, admitting it if it beats the current minimum"""
+        if key not in self._counts and len(self._counts) >= self.k:
+            min_key = min(self._counts, key=self._counts.get)
+            if estimate <= self._counts[min_key]:
+                return
+            del self._counts[min_key]
+            del self._display[min_key]
+
+        self._counts[key] = estimate
+        self._display[key] = display
+        self._ranked = None
+
+    def ranked(self) -> List[Tuple[str, int]]:
+        """Get (keyword, estimate) pairs, highest first (cached between updates)"""
+        if self._ranked is None:
+            self._ranked = sorted(
+                ((self._display[key], count) for key, count in self._counts.items()),
+                key=lambda item: item[1],
+                reverse=True
+            )
+        return self._ranked
+
+class HeavyHitterBucket:
+    """Count-Min sketch plus top-k for one (location, industry) slice"""
+
+    def __init__(self, width: int, depth: int, k: int):
+        self.sketch = CountMinSketch(width, depth)
+        self.top_k = TopKTracker(k)
+
+    def add(self, key: str, display: str, indexes: List[int]):
+        self.top_k.offer(key, display, self.sketch.add(key, indexes=indexes))
+
+class KeywordTrendSketches:
+    """Per-location and per-industry heavy-hitter keywords with bounded memory"""
+
+    def __init__(self, width: int = 2048, depth: int = 4, k: int = 20, max_buckets: int = 128):
+        self.width = width
+        self.depth = depth
+        self.k = k
+        self.max_buckets = max_buckets
+        self.events_recorded = 0
+        self._buckets: "OrderedDict[Tuple[str, str], HeavyHitterBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, location_key: str, industry_key: str) -> HeavyHitterBucket:
+        bucket_key = (location_key, industry_key)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            bucket = HeavyHitterBucket(self.width, self.depth, self.k)
+            self._buckets[bucket_key] = bucket
+            # Evict the least recently updated slice to keep memory constant
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(bucket_key)
+        return bucket
+
+    def record(self, location_keys: List[str], industry_keys: List[str], keywords: List[str]):
+        """Count keywords in every (location, industry) slice they belong to"""
+        # All slices share sketch dimensions, so each keyword is hashed once
+        entries = []
+        for keyword in keywords:
+            key = keyword.strip().lower()
+            if key:
+                entries.append((key, keyword.strip(), sketch_indexes(key, self.width, self.depth)))
+
+        with self._lock:
+            for location_key in dict.fromkeys(location_keys):
+                for industry_key in dict.fromkeys(industry_keys):
+                    bucket = self._bucket(location_key, industry_key)
+                    for key, display, indexes in entries:
+                        bucket.add(key, display, indexes)
+            self.events_recorded += 1
+
+    def top_keywords(self, location_key: str, industry_key: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Get the heaviest keywords for a slice (empty if it has no data)"""
+        bucket = self._buckets.get((location_key, industry_key))
+        return bucket.top_k.ranked()[:limit] if bucket else []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get memory and volume statistics"""
+        return {
+            "buckets": len(self._buckets),
+            "max_buckets": self.max_buckets,
+            "sketch_width": self.width,
+            "sketch_depth": self.depth,
+            "top_k": self.k,
+            "events_recorded": self.events_recorded,
+            "approx_memory_bytes": len(self._buckets) * self.width * self.depth * 4
+        }
+
+# Global sketches fed by generated personas
+keyword_sketches = KeywordTrendSketches()
@@ -0,0 +1,89 @@
+import os
+import json
+import time
+import threading
+import logging
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = Path(__file__).parent / "data" / "persona_rules.json"
+
+# Sections and tables every rules file must define
+REQUIRED_TABLES = {
+    "persona": ["age_group_behaviors", "location_characteristics", "interest_keywords"],
+    "behavioral": ["age_group_motivations", "interest_modifiers", "location_modifiers"],
+    "image_prompt": ["age_descriptors", "location_styles", "interest_styling"],
+    "ad_copy": ["platform_templates", "headline_templates", "color_psychology"]
+}
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts to read-only mappings and lists to tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+class PersonaKnowledgeBase:
+    """Persona rule tables compiled once from a data file and shared by all stages"""
+
+    def __init__(self, rules_path: Optional[str] = None):
+        self.rules_path = Path(rules_path or os.environ.get("PERSONA_RULES_PATH") or DEFAULT_RULES_PATH)
+        self._lock = threading.Lock()
+        self._sections: Mapping[str, Mapping[str, Any]] = MappingProxyType({})
+        self.version = None
+        self.loaded_at = None
+        self.compile_ms = 0.0
+        self.loads = 0
+        self.load()
+
+    def load(self) -> Dict[str, Any]:
+        """Compile the rules file and swap it in; the current tables stay on error"""
+        started = time.perf_counter()
+        with open(self.rules_path, encoding="utf-8") as f:
+            rules = json.load(f)
+
+        for section, tables in REQUIRED_TABLES.items():
+            missing = [table for table in tables if table not in rules.get(section, {})]
+            if missing:
+                raise ValueError(f"Rules file {self.rules_path} is missing {section} tables: {', '.join(missing)}")
+
+        sections = freeze({section: rules[section] for section in REQUIRED_TABLES})
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        # Readers hold a reference to the old mapping, so one assignment swaps atomically
+        with self._lock:
+            self._sections = sections
+            self.version = rules.get("version")
+            self.loaded_at = time.time()
+            self.compile_ms = round(compile_ms, 3)
+            self.loads += 1
+
+        logger.info(f"Compiled persona rules v{self.version} from {self.rules_path.name} in {self.compile_ms}ms")
+        return self.get_stats()
+
+    def section(self, name: str) -> Mapping[str, Any]:
+        """Get the compiled tables of one section"""
+        return self._sections[name]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get version, size and compile time of the loaded rules"""
+        sections = self._sections
+        return {
+            "rules_path": str(self.rules_path),
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "compile_ms": self.compile_ms,
+            "loads": self.loads,
+            "tables": {
+                f"{section}.{table}": len(entries)
+                for section, tables in sections.items()
+                for table, entries in tables.items()
+            }
+        }
+
+# Global knowledge base loaded once per process
+knowledge_base = PersonaKnowledgeBase()
@@ -0,0 +1,322 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+from types import SimpleNamespace
+from typing import Deque, Dict, Any, AsyncIterator, Optional, Tuple
+import httpx
+from completion_cache import completion_cache
+from llm_usage import usage_tracker
+from provider_limits import provider_limiters
+
+logger = logging.getLogger(__name__)
+
+class OpenAICompatibleClient:
+    """Text and image generation against any OpenAI-compatible base URL (e.g. llm_standin)"""
+
+    def __init__(self, api_key: str, base_url: str, timeout: float = 120.0):
+        self.base_url = base_url.rstrip("/")
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+
+    @staticmethod
+    def _chat_payload(prompt: str, model: str = "gpt-5", **params: Any) -> Dict[str, Any]:
+        return {"model": model, "messages": [{"role": "user", "content": prompt}], **params}
+
+    async def generate_text(self, prompt: str, **params: Any) -> str:
+        text, _ = await self.complete(prompt, **params)
+        return text
+
+    async def complete(self, prompt: str, **params: Any) -> Tuple[str, Dict[str, int]]:
+        """Get a completion with the token usage the endpoint reports"""
+        response = await self._http.post("/chat/completions", json=self._chat_payload(prompt, **params))
+        response.raise_for_status()
+        payload = response.json()
+        return payload["choices"][0]["message"]["content"], payload.get("usage") or {}
+
+    async def stream_text(self, prompt: str, **params: Any) -> AsyncIterator[str]:
+        payload = self._chat_payload(prompt, stream=True, **params)
+        async with self._http.stream("POST", "/chat/completions", json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or [{}]
+                content = choices[0].get("delta", {}).get("content")
+                if content:
+                    yield content
+
+    async def generate_images(self, prompt: str, n: int = 1, **params: Any):
+        response = await self._http.post("/images/generations", json={"prompt": prompt, "n": n, **params})
+        response.raise_for_status()
+        # Same shape the image stage reads from the provider SDK: result.data[i].url
+        return SimpleNamespace(data=[SimpleNamespace(**item) for item in response.json().get("data", [])])
+
+    async def aclose(self):
+        await self._http.aclose()
+
+class LatencyTracker:
+    """Rolling window of call latencies per key, for tail-latency thresholds"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._latencies: Dict[str, Deque[float]] = {}
+
+    def add(self, key: str, seconds: float):
+        self._latencies.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, key: str, q: float) -> Optional[float]:
+        """Get the q-th percentile latency in seconds, or None until enough samples exist"""
+        latencies = self._latencies.get(key)
+        if not latencies or len(latencies) < self.min_samples:
+            return None
+        ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+class SharedLLMClient:
+    """Long-lived, connection-pooled text and image generation clients shared by all requests"""
+
+    def __init__(self):
+        self._clients: Dict[str, Any] = {}
+        self._settings: Dict[str, Tuple[str, str]] = {}
+        self.stats = {"clients_created": 0, "requests": 0, "failures": 0}
+        # Hedging: a call slower than the observed p95 gets one duplicate, and the
+        # first to finish wins. The share of hedged calls is capped.
+        self.latencies = LatencyTracker()
+        self.hedge_percentile = float(os.environ.get("LLM_HEDGE_PERCENTILE", "95"))
+        self.max_hedge_rate = float(os.environ.get("LLM_HEDGE_MAX_RATE", "0.05"))
+        self._recent_hedges: Deque[bool] = deque(maxlen=200)
+        self.hedge_stats = {"hedged_calls": 0, "hedges": 0, "hedge_wins": 0, "capped": 0}
+
+    def _get(self, kind: str, api_key: str, base_url: str):
+        # Rebuilt only when the key or endpoint changes
+        settings = (api_key, base_url)
+        if self._settings.get(kind) == settings:
+            return self._clients[kind]
+
+        stale = self._clients.pop(kind, None)
+        if base_url:
+            # One OpenAI-compatible client serves both text and images
+            shared = next((client for other, client in self._clients.items() if self._settings[other] == settings), None)
+            self._clients[kind] = shared or OpenAICompatibleClient(api_key, base_url)
+        elif kind == "text":
+            from emergentintegrations.llm.openai.text_generation import OpenAITextGeneration
+
+            self._clients[kind] = OpenAITextGeneration(api_key=api_key)
+        else:
+            from emergentintegrations.llm.openai.image_generation import OpenAIImageGeneration
+
+            self._clients[kind] = OpenAIImageGeneration(api_key=api_key)
+        self._settings[kind] = settings
+        self.stats["clients_created"] += 1
+
+        if stale is not None and all(client is not stale for client in self._clients.values()):
+            try:
+                asyncio.get_running_loop().create_task(self._close_client(stale))
+            except RuntimeError:
+                pass  # No loop to close on; the client is garbage collected
+        return self._clients[kind]
+
+    def client(self, api_key: str, base_url: str = ""):
+        """Get the pooled text client, pointed at base_url when one is configured"""
+        return self._get("text", api_key, base_url)
+
+    def image_client(self, api_key: str, base_url: str = ""):
+        """Get the pooled image client, pointed at base_url when one is configured"""
+        return self._get("image", api_key, base_url)
+
+    @staticmethod
+    async def _complete(client, prompt: str, params: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, int]]]:
+        if hasattr(client, "complete"):
+            return await client.complete(prompt=prompt, **params)
+        return await client.generate_text(prompt=prompt, **params), None
+
+    async def _timed_complete(self, stage: str, client, prompt: str, params: Dict[str, Any], admitted: Optional[asyncio.Event] = None) -> Tuple[str, Optional[Dict[str, int]]]:
+        # Timed from admission so queueing behind the limiter does not skew the hedge threshold
+        async with provider_limiters["llm"].slot():
+            if admitted is not None:
+                admitted.set()
+            started = time.perf_counter()
+            try:
+                return await self._complete(client, prompt, params)
+            finally:
+                # Cancelled hedge losers count too, or the slow tail would drop out of p95
+                self.latencies.add(stage, time.perf_counter() - started)
+
+    def _hedge_allowed(self) -> bool:
+        recent = self._recent_hedges
+        return sum(recent) < self.max_hedge_rate * max(len(recent), 1)
+
+    async def _hedged_complete(self, stage: str, client, prompt: str, params: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, int]], int]:
+        """Complete a prompt, sending one duplicate if it runs past the stage's observed p95
+
+        Returns the completion, its usage and how many attempts were sent.
+        """
+        self.hedge_stats["hedged_calls"] += 1
+        threshold = self.latencies.percentile(stage, self.hedge_percentile)
+        admitted = asyncio.Event()
+        primary = asyncio.ensure_future(self._timed_complete(stage, client, prompt, params, admitted))
+        hedge = None
+        try:
+            if threshold is None:
+                self._recent_hedges.append(False)
+                return (*await primary, 1)
+
+            # The hedge timer starts when the primary is admitted by the limiter
+            admission = asyncio.ensure_future(admitted.wait())
+            try:
+                await asyncio.wait({primary, admission}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                admission.cancel()
+            if not primary.done():
+                await asyncio.wait({primary}, timeout=threshold)
+            if primary.done():
+                self._recent_hedges.append(False)
+                return (*primary.result(), 1)
+            if not self._hedge_allowed():
+                self.hedge_stats["capped"] += 1
+                self._recent_hedges.append(False)
+                return (*await primary, 1)
+
+            self._recent_hedges.append(True)
+            self.hedge_stats["hedges"] += 1
+            hedge = asyncio.ensure_future(self._timed_complete(stage, client, prompt, params))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    # A failed attempt only matters if the other one fails too
+                    if task.exception() is None or not pending:
+                        if task is hedge and task.exception() is None:
+                            self.hedge_stats["hedge_wins"] += 1
+                        return (*task.result(), 2)
+        finally:
+            # Also reached when the caller is cancelled, so no attempt outlives it
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def generate_text(self, api_key: str, prompt: str, use_cache: bool = True, base_url: str = "", stage: str = "text", hedge: bool = False, **params: Any) -> str:
+        """Run one completion on the shared client, reusing a cached completion of the same prompt"""
+        model = params.get("model", "unknown")
+        started = time.perf_counter()
+        fingerprint = completion_cache.fingerprint("text", prompt, **params)
+        if use_cache:
+            try:
+                cached = await asyncio.to_thread(completion_cache.get, fingerprint)
+            except Exception as e:
+                logger.warning(f"Completion cache lookup failed: {e}")
+                cached = None
+            if cached is not None:
+                usage_tracker.record_text(stage, model, prompt, cached, (time.perf_counter() - started) * 1000, cached=True)
+                return cached
+
+        self.stats["requests"] += 1
+        client = self.client(api_key, base_url)
+        try:
+            if hedge:
+                response, usage, attempts = await self._hedged_complete(stage, client, prompt, params)
+            else:
+                response, usage = await self._timed_complete(stage, client, prompt, params)
+                attempts = 1
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+        latency_ms = (time.perf_counter() - started) * 1000
+        record = usage_tracker.record_text(stage, model, prompt, response or "", latency_ms, usage=usage)
+        if attempts > 1:
+            # The duplicate is billed as well; the loser is cancelled mid-generation,
+            # so it is charged like the winning attempt as an upper bound
+            usage_tracker.record_text(f"{stage}:hedge", model, prompt, response or "", latency_ms, usage=usage)
+
+        if use_cache and isinstance(response, str) and response.strip():
+            try:
+                await asyncio.to_thread(completion_cache.put, fingerprint, response, "text", record.cost_usd)
+            except Exception as e:
+                logger.warning(f"Could not cache completion: {e}")
+        return response
+
+    async def stream_text(self, api_key: str, prompt: str, base_url: str = "", stage: str = "text", **params: Any) -> AsyncIterator[str]:
+        """Yield a completion as it is generated
+
+        Uses the client's streaming call when it has one; otherwise the whole
+        (possibly cached) completion arrives as a single chunk.
+        """
+        client = self.client(api_key, base_url)
+        stream = getattr(client, "stream_text", None)
+        if stream is None:
+            yield await self.generate_text(api_key, prompt, base_url=base_url, stage=stage, **params)
+            return
+
+        model = params.get("model", "unknown")
+        started = time.perf_counter()
+        fingerprint = completion_cache.fingerprint("text", prompt, **params)
+        try:
+            cached = await asyncio.to_thread(completion_cache.get, fingerprint)
+        except Exception as e:
+            logger.warning(f"Completion cache lookup failed: {e}")
+            cached = None
+        if cached is not None:
+            usage_tracker.record_text(stage, model, prompt, cached, (time.perf_counter() - started) * 1000, cached=True)
+            yield cached
+            return
+
+        self.stats["requests"] += 1
+        chunks = []
+        try:
+            async with provider_limiters["llm"].slot():
+                async for chunk in stream(prompt=prompt, **params):
+                    chunks.append(chunk)
+                    yield chunk
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+
+        response = "".join(chunks)
+        record = usage_tracker.record_text(stage, model, prompt, response, (time.perf_counter() - started) * 1000)
+        if response.strip():
+            try:
+                await asyncio.to_thread(completion_cache.put, fingerprint, response, "text", record.cost_usd)
+            except Exception as e:
+                logger.warning(f"Could not cache completion: {e}")
+
+    @staticmethod
+    async def _close_client(client):
+        close = getattr(client, "aclose", None) or getattr(client, "close", None)
+        if close is not None:
+            result = close()
+            if asyncio.iscoroutine(result):
+                await result
+
+    async def close(self):
+        """Release the pooled connections"""
+        clients, self._clients = list(self._clients.values()), {}
+        self._settings = {}
+        for client in {id(client): client for client in clients}.values():
+            await self._close_client(client)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get client reuse and request statistics"""
+        return {
+            "clients": sorted(self._clients),
+            **self.stats,
+            "hedging": {
+                **self.hedge_stats,
+                "percentile": self.hedge_percentile,
+                "max_hedge_rate": self.max_hedge_rate,
+                "recent_hedge_rate": round(sum(self._recent_hedges) / len(self._recent_hedges), 4) if self._recent_hedges else 0.0
+            }
+        }
+
+# Global clients shared by every text and image generation stage
+llm_client = SharedLLMClient()
@@ -0,0 +1,238 @@
+"""
+Local OpenAI-compatible stand-in for the text and image generation APIs.
+
+Point real-API mode at it to load-test the LLM stages without cost or real
+rate limits:
+
+    uvicorn llm_standin:app --port 8011
+    LLM_BASE_URL=http://localhost:8011/v1 USE_REAL_APIS=true EMERGENT_LLM_KEY=standin uvicorn server:app
+
+Latency, failure and rate-limit behaviour come from STANDIN_* environment
+variables and can be changed at runtime with PUT /standin/config.
+"""
+import io
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+from typing import Dict, Any, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# 1x1 PNG served when Pillow is not installed
+FALLBACK_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360f8cf00000301010018dd8db00000000049454e44ae426082"
+)
+
+DEFAULT_PLATFORMS = ["instagram", "linkedin", "tiktok"]
+
+class StandinConfig(BaseModel):
+    text_latency_median_ms: float = float(os.environ.get("STANDIN_TEXT_LATENCY_MEDIAN_MS", "1500"))
+    image_latency_median_ms: float = float(os.environ.get("STANDIN_IMAGE_LATENCY_MEDIAN_MS", "6000"))
+    # Log-normal spread; 0 gives a fixed latency, ~0.5 a realistic long tail
+    latency_sigma: float = float(os.environ.get("STANDIN_LATENCY_SIGMA", "0.5"))
+    failure_rate: float = float(os.environ.get("STANDIN_FAILURE_RATE", "0"))
+    rate_limit_rate: float = float(os.environ.get("STANDIN_RATE_LIMIT_RATE", "0"))
+    # Requests beyond this many in flight get 429, like a provider concurrency cap (0 = unlimited)
+    max_concurrency: int = int(os.environ.get("STANDIN_MAX_CONCURRENCY", "0"))
+    retry_after_seconds: int = int(os.environ.get("STANDIN_RETRY_AFTER_SECONDS", "1"))
+    stream_chunk_chars: int = 12
+    # Optional file of canned completions: {"text": "...", "json": {...}}
+    canned_path: Optional[str] = os.environ.get("STANDIN_CANNED_PATH") or None
+
+class LLMStandin:
+    """Simulated provider: latency distribution, failures, 429s and canned outputs"""
+
+    def __init__(self, config: Optional[StandinConfig] = None):
+        self.config = config or StandinConfig()
+        self.in_flight = 0
+        self.stats = {"requests": 0, "completed": 0, "failures": 0, "rate_limited": 0, "images": 0, "streams": 0}
+        self.canned = self._load_canned(self.config.canned_path)
+
+    @staticmethod
+    def _load_canned(path: Optional[str]) -> Dict[str, Any]:
+        if not path:
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def configure(self, updates: Dict[str, Any]) -> StandinConfig:
+        """Apply runtime config changes"""
+        self.config = StandinConfig(**{**self.config.dict(), **updates})
+        if "canned_path" in updates:
+            self.canned = self._load_canned(self.config.canned_path)
+        return self.config
+
+    def latency(self, median_ms: float) -> float:
+        """Draw one response latency in seconds"""
+        if self.config.latency_sigma <= 0:
+            return median_ms / 1000
+        return random.lognormvariate(0, self.config.latency_sigma) * median_ms / 1000
+
+    def admit(self) -> Optional[JSONResponse]:
+        """Get an error response for a request that fails admission, or None"""
+        self.stats["requests"] += 1
+        config = self.config
+        if (config.max_concurrency and self.in_flight >= config.max_concurrency) or random.random() < config.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"Retry-After": str(config.retry_after_seconds)},
+                content={"error": {"message": "Rate limit reached", "type": "rate_limit_error", "code": "rate_limit_exceeded"}}
+            )
+        if random.random() < config.failure_rate:
+            self.stats["failures"] += 1
+            return JSONResponse(
+                status_code=500,
+                content={"error": {"message": "Simulated upstream failure", "type": "server_error"}}
+            )
+        return None
+
+    def completion_text(self, prompt: str) -> str:
+        """Get a canned completion shaped like what the prompt asks for"""
+        if "JSON object" in prompt:
+            if "json" in self.canned:
+                return json.dumps(self.canned["json"])
+            match = re.search(r"one key per platform \(([^)]*)\)", prompt)
+            platforms = [p.strip() for p in match.group(1).split(",")] if match else DEFAULT_PLATFORMS
+            alternatives = re.search(r"array of (\d+) distinct alternative", prompt)
+            if alternatives:
+                count = int(alternatives.group(1))
+                return json.dumps({platform: [self._ad_copy(platform, variant) for variant in range(count)] for platform in platforms})
+            return json.dumps({platform: self._ad_copy(platform) for platform in platforms})
+        if "text" in self.canned:
+            return self.canned["text"]
+        ad_copy = self._ad_copy("ad")
+        return "\n\n".join(f"{field.upper()}: {value}" for field, value in ad_copy.items())
+
+    @staticmethod
+    def _ad_copy(platform: str, variant: int = 0) -> Dict[str, str]:
+        # Alternatives grow longer so best-of-N scoring has something to choose between
+        extra = " Thousands already switched, and the results speak for themselves." * variant
+        return {
+            "headline": f"Level Up Your Day with Smarter {platform.title()} Picks",
+            "body": "Built for people who want results without the noise. Try it free and see the difference in a week." + extra,
+            "keywords": "smart, proven, effortless, trending",
+            "cta": "Get Started",
+            "color_palette": "#2563EB, #1E40AF, #F8FAFC - Blues build trust while whites keep it clean"
+        }
+
+# Global stand-in served by the app below
+standin = LLMStandin()
+
+app = FastAPI(title="LLM stand-in")
+
+def _prompt_of(payload: Dict[str, Any]) -> str:
+    messages = payload.get("messages") or []
+    return "\n".join(str(message.get("content", "")) for message in messages) or str(payload.get("prompt", ""))
+
+def _usage(prompt: str, completion: str) -> Dict[str, int]:
+    # ~4 characters per token is close enough for load testing
+    prompt_tokens, completion_tokens = max(1, len(prompt) // 4), max(1, len(completion) // 4)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    payload = await request.json()
+    rejected = standin.admit()
+    if rejected is not None:
+        return rejected
+
+    prompt = _prompt_of(payload)
+    text = standin.completion_text(prompt)
+    completion_id = f"chatcmpl-{hashlib.sha1(f'{time.time()}{random.random()}'.encode()).hexdigest()[:24]}"
+    model = payload.get("model", "standin")
+    delay = standin.latency(standin.config.text_latency_median_ms)
+
+    if payload.get("stream"):
+        standin.stats["streams"] += 1
+
+        async def events():
+            standin.in_flight += 1
+            try:
+                size = max(1, standin.config.stream_chunk_chars)
+                chunks = [text[i:i + size] for i in range(0, len(text), size)]
+                for chunk in chunks:
+                    await asyncio.sleep(delay / len(chunks))
+                    data = {"id": completion_id, "object": "chat.completion.chunk", "model": model, "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}]}
+                    yield f"data: {json.dumps(data)}\n\n"
+                data = {"id": completion_id, "object": "chat.completion.chunk", "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": _usage(prompt, text)}
+                yield f"data: {json.dumps(data)}\n\n"
+                yield "data: [DONE]\n\n"
+                standin.stats["completed"] += 1
+            finally:
+                standin.in_flight -= 1
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    standin.in_flight += 1
+    try:
+        await asyncio.sleep(delay)
+    finally:
+        standin.in_flight -= 1
+    standin.stats["completed"] += 1
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": _usage(prompt, text)
+    }
+
+@app.post("/v1/images/generations")
+async def image_generations(request: Request):
+    payload = await request.json()
+    rejected = standin.admit()
+    if rejected is not None:
+        return rejected
+
+    standin.in_flight += 1
+    try:
+        await asyncio.sleep(standin.latency(standin.config.image_latency_median_ms))
+    finally:
+        standin.in_flight -= 1
+    standin.stats["completed"] += 1
+    standin.stats["images"] += 1
+
+    seed = hashlib.sha256(str(payload.get("prompt", "")).encode("utf-8")).hexdigest()[:16]
+    base_url = str(request.base_url).rstrip("/")
+    return {
+        "created": int(time.time()),
+        "data": [{"url": f"{base_url}/images/{seed}-{index}.png"} for index in range(int(payload.get("n", 1)))]
+    }
+
+@app.get("/images/{name}.png")
+async def image_file(name: str):
+    if Image is None:
+        return Response(FALLBACK_PNG, media_type="image/png")
+    # A flat colour derived from the name keeps images distinct and deterministic
+    digest = hashlib.sha256(name.encode("utf-8")).digest()
+    buffer = io.BytesIO()
+    Image.new("RGB", (1024, 1024), tuple(digest[:3])).save(buffer, "PNG")
+    return Response(buffer.getvalue(), media_type="image/png")
+
+@app.get("/standin/config")
+async def get_config():
+    return standin.config.dict()
+
+@app.put("/standin/config")
+async def update_config(updates: Dict[str, Any]):
+    return standin.configure(updates).dict()
+
+@app.get("/standin/stats")
+async def get_stats():
+    return {"in_flight": standin.in_flight, **standin.stats}
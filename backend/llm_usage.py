@@ -0,0 +1,168 @@
+import os
+import time
+import threading
+import contextvars
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# USD per million (prompt, completion) tokens
+TEXT_MODEL_PRICES = {
+    "gpt-5": (1.25, 10.0),
+    "gpt-5-mini": (0.25, 2.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6)
+}
+DEFAULT_TEXT_PRICE = (
+    float(os.environ.get("LLM_DEFAULT_PROMPT_PRICE", "1.25")),
+    float(os.environ.get("LLM_DEFAULT_COMPLETION_PRICE", "10.0"))
+)
+
+# USD per image by (model, quality)
+IMAGE_PRICES = {
+    ("dall-e-3", "standard"): 0.04,
+    ("dall-e-3", "hd"): 0.08,
+    ("gpt-image-1", "standard"): 0.042
+}
+DEFAULT_IMAGE_PRICE = float(os.environ.get("LLM_DEFAULT_IMAGE_PRICE", "0.04"))
+
+USAGE_WINDOWS = {
+    "5m": 5 * 60,
+    "1h": 3600,
+    "24h": 24 * 3600
+}
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (~4 characters per token for English prose)"""
+    return (len(text) + 3) // 4 if text else 0
+
+def text_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Get the estimated USD cost of a text completion"""
+    prompt_price, completion_price = TEXT_MODEL_PRICES.get(model, DEFAULT_TEXT_PRICE)
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+def image_cost(model: str, quality: str = "standard", n: int = 1) -> float:
+    """Get the estimated USD cost of generating n images"""
+    return IMAGE_PRICES.get((model, quality), DEFAULT_IMAGE_PRICE) * n
+
+class UsageRecord(NamedTuple):
+    """One LLM or image call"""
+    stage: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency_ms: float
+    cost_usd: float
+    cached: bool
+
+def _empty_totals() -> Dict[str, float]:
+    return {"calls": 0, "cached_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0, "latency_ms": 0.0, "max_latency_ms": 0.0}
+
+def _add(totals: Dict[str, float], record: UsageRecord):
+    totals["calls"] += 1
+    totals["cached_calls"] += int(record.cached)
+    totals["prompt_tokens"] += record.prompt_tokens
+    totals["completion_tokens"] += record.completion_tokens
+    totals["cost_usd"] += record.cost_usd
+    totals["latency_ms"] += record.latency_ms
+    totals["max_latency_ms"] = max(totals["max_latency_ms"], record.latency_ms)
+
+def _finish(totals: Dict[str, float]) -> Dict[str, Any]:
+    # Latency is summed while aggregating; report the mean
+    calls = totals["calls"]
+    return {
+        "calls": calls,
+        "cached_calls": totals["cached_calls"],
+        "prompt_tokens": totals["prompt_tokens"],
+        "completion_tokens": totals["completion_tokens"],
+        "cost_usd": round(totals["cost_usd"], 6),
+        "avg_latency_ms": round(totals["latency_ms"] / calls, 1) if calls else 0.0,
+        "max_latency_ms": round(totals["max_latency_ms"], 1)
+    }
+
+def summarize(records: List[UsageRecord]) -> Dict[str, Any]:
+    """Aggregate records overall, per stage and per model"""
+    total, stages, models = _empty_totals(), {}, {}
+    for record in records:
+        _add(total, record)
+        _add(stages.setdefault(record.stage, _empty_totals()), record)
+        _add(models.setdefault(record.model, _empty_totals()), record)
+    return {
+        **_finish(total),
+        "by_stage": {stage: _finish(totals) for stage, totals in stages.items()},
+        "by_model": {model: _finish(totals) for model, totals in models.items()}
+    }
+
+class LLMUsageTracker:
+    """Token, latency and cost accounting per request and per time window"""
+
+    def __init__(self, bucket_seconds: int = 60):
+        self.bucket_seconds = bucket_seconds
+        self._lock = threading.Lock()
+        # Minute buckets of (stage, model) totals, oldest first, covering the longest window
+        self._buckets: "OrderedDict[int, Dict[tuple, Dict[str, float]]]" = OrderedDict()
+        # Records of the request being handled in the current task (None outside a request)
+        self._request_records: contextvars.ContextVar[Optional[List[UsageRecord]]] = contextvars.ContextVar("llm_usage_records", default=None)
+
+    @contextmanager
+    def track_request(self) -> Iterator[List[UsageRecord]]:
+        """Collect the records of every call made inside the block, including in gathered tasks"""
+        records: List[UsageRecord] = []
+        token = self._request_records.set(records)
+        try:
+            yield records
+        finally:
+            self._request_records.reset(token)
+
+    def record(self, stage: str, model: str, prompt_tokens: int = 0, completion_tokens: int = 0, latency_ms: float = 0.0, cost_usd: float = 0.0, cached: bool = False) -> UsageRecord:
+        """Account one call to the current request and the time windows"""
+        record = UsageRecord(stage, model, prompt_tokens, completion_tokens, round(latency_ms, 1), cost_usd, cached)
+        records = self._request_records.get()
+        if records is not None:
+            records.append(record)
+
+        bucket = int(time.time() // self.bucket_seconds)
+        with self._lock:
+            totals = self._buckets.setdefault(bucket, {})
+            _add(totals.setdefault((stage, model), _empty_totals()), record)
+            oldest = bucket - max(USAGE_WINDOWS.values()) // self.bucket_seconds
+            while self._buckets and next(iter(self._buckets)) < oldest:
+                self._buckets.popitem(last=False)
+        return record
+
+    def record_text(self, stage: str, model: str, prompt: str, completion: str, latency_ms: float, cached: bool = False, usage: Optional[Dict[str, int]] = None) -> UsageRecord:
+        """Account a text completion, using provider-reported token counts when available"""
+        prompt_tokens = (usage or {}).get("prompt_tokens") or estimate_tokens(prompt)
+        completion_tokens = (usage or {}).get("completion_tokens") or estimate_tokens(completion)
+        cost = 0.0 if cached else text_cost(model, prompt_tokens, completion_tokens)
+        return self.record(stage, model, prompt_tokens, completion_tokens, latency_ms, cost, cached)
+
+    def request_summary(self) -> Optional[Dict[str, Any]]:
+        """Get the usage of the request being handled, if one is tracked"""
+        records = self._request_records.get()
+        return summarize(records) if records is not None else None
+
+    def window_summary(self, window: str = "1h") -> Dict[str, Any]:
+        """Aggregate usage over a time window, overall, per stage and per model"""
+        since = int((time.time() - USAGE_WINDOWS[window]) // self.bucket_seconds)
+        total, stages, models = _empty_totals(), {}, {}
+        with self._lock:
+            for bucket, entries in self._buckets.items():
+                if bucket <= since:
+                    continue
+                for (stage, model), totals in entries.items():
+                    for target in (total, stages.setdefault(stage, _empty_totals()), models.setdefault(model, _empty_totals())):
+                        for field, value in totals.items():
+                            target[field] = max(target[field], value) if field == "max_latency_ms" else target[field] + value
+        return {
+            "window": window,
+            **_finish(total),
+            "by_stage": {stage: _finish(totals) for stage, totals in stages.items()},
+            "by_model": {model: _finish(totals) for model, totals in models.items()}
+        }
+
+# Global usage tracker shared by the LLM client and the generation stages
+usage_tracker = LLMUsageTracker()
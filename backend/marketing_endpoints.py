@@ -1,10 +1,22 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Header
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 import logging
 import asyncio
+import json
 from datetime import datetime
 from marketing_intelligence import MarketingIntelligenceCore
+from caching import get_cache_stats
+from trend_tracking import trend_tracker, TREND_WINDOWS
+from keyword_sketch import keyword_sketches
+from persona_resolution import interest_resolver, location_resolver
+from image_store import image_store, DERIVATIVE_SIZES, DERIVATIVE_FORMATS
+from llm_client import llm_client
+from completion_cache import completion_cache
+from llm_usage import usage_tracker, USAGE_WINDOWS
+from provider_limits import provider_limiters
+from history_search import history_search_tokens
 import sys
 import os
 
@@ -24,7 +36,15 @@ class MarketingIntelligenceRequest(BaseModel):
     age_range: str = Field(..., description="Age range (e.g., '25-34', '18-24', '35-44')")
     geographic_location: str = Field(..., description="Geographic location (e.g., 'New York, NY', 'London, UK')")
     interests: List[str] = Field(..., description="List of interests (e.g., ['technology', 'fitness', 'travel'])")
+    platforms: Optional[List[str]] = Field(None, description="Ad copy platforms (instagram, linkedin, tiktok, facebook, x, youtube, email); defaults to instagram, linkedin and tiktok")
     
+def resolve_request_platforms(request: MarketingIntelligenceRequest) -> List[str]:
+    """Validate the requested ad copy platforms, answering 400 for unknown ones"""
+    try:
+        return marketing_core.ad_generator.resolve_platforms(request.platforms)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 class MarketingIntelligenceResponse(BaseModel):
     trending_keywords_analysis: Dict[str, Any]
     news_insights: Dict[str, Any] 
@@ -46,9 +66,11 @@ async def generate_marketing_intelligence(
     - Persona research and behavioral analysis
     - Recent news and trending topics analysis  
     - AI-generated persona image
-    - Platform-specific ad copy variations (Instagram, LinkedIn, TikTok)
+    - Platform-specific ad copy variations (Instagram, LinkedIn, TikTok by default; see platforms)
     """
     
+    platforms = resolve_request_platforms(request)
+    
     try:
         logger.info(f"Generating marketing intelligence for {request.age_range} persona in {request.geographic_location}")
         
@@ -56,7 +78,8 @@ async def generate_marketing_intelligence(
         intelligence = await marketing_core.generate_complete_intelligence(
             age_range=request.age_range,
             geographic_location=request.geographic_location,
-            interests=request.interests
+            interests=request.interests,
+            platforms=platforms
         )
         
         # Phase 3A: Auto-save to history
@@ -74,7 +97,8 @@ async def generate_marketing_intelligence(
             request.age_range,
             request.geographic_location,
             request.interests,
-            len(intelligence.get("news_insights", {}).get("recent_articles", []))
+            len(intelligence.get("news_insights", {}).get("recent_articles", [])),
+            intelligence.get("trending_keywords_analysis", {}).get("keywords", [])
         )
         
         logger.info("Marketing intelligence generated successfully")
@@ -88,6 +112,62 @@ async def generate_marketing_intelligence(
             detail=f"Failed to generate marketing intelligence: {str(e)}"
         )
 
+@router.post("/ad-copy/stream")
+async def stream_ad_copy(request: MarketingIntelligenceRequest):
+    """
+    Stream platform ad copy as newline-delimited JSON. Each section
+    ({"platform", "section", "content"}) is sent as soon as the model finishes
+    it, followed by the platform's complete copy ({"platform", "ad_copy"}).
+    """
+    
+    platforms = resolve_request_platforms(request)
+    interest_ids = interest_resolver.resolve_all(request.interests)
+    resolved_location = location_resolver.resolve(request.geographic_location)
+    persona_analysis = marketing_core.persona_analyzer.analyze_persona(
+        request.age_range, request.geographic_location, request.interests, interest_ids, resolved_location
+    )
+    
+    async def events():
+        try:
+            async for event in marketing_core.ad_generator.stream_professional_ad_copy(
+                persona_analysis, {}, request.age_range, request.interests, request.geographic_location, interest_ids, platforms
+            ):
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            logger.error(f"Error streaming ad copy: {str(e)}")
+            yield json.dumps({"error": "Ad copy generation failed"}) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson", headers={"Cache-Control": "no-cache"})
+
+class PersonaInput(BaseModel):
+    age_range: str = Field(..., description="Age range (e.g., '25-34', '18-24', '35-44')")
+    geographic_location: str = Field(..., description="Geographic location (e.g., 'New York, NY', 'London, UK')")
+    interests: List[str] = Field(..., description="List of interests (e.g., ['technology', 'fitness', 'travel'])")
+
+class BehavioralBatchRequest(BaseModel):
+    personas: List[PersonaInput] = Field(..., min_length=1, max_length=5000, description="Personas to analyze in one pass")
+
+@router.post("/behavioral-analysis/batch")
+async def generate_behavioral_analysis_batch(request: BehavioralBatchRequest):
+    """Get behavioral chart and demographic breakdown data for many personas in one vectorized pass"""
+    
+    personas = [
+        {"age_range": persona.age_range, "location": persona.geographic_location, "interests": persona.interests}
+        for persona in request.personas
+    ]
+    processor = marketing_core.behavioral_processor
+    # Resolution and scoring are CPU-bound, so they run off the event loop
+    charts = await asyncio.to_thread(processor.generate_behavioral_chart_data_batch, personas)
+    breakdowns = await asyncio.to_thread(processor.generate_demographic_breakdown_batch, personas)
+    
+    return {
+        "results": [
+            {"behavioral_analysis_chart": chart, "demographic_breakdown": breakdown}
+            for chart, breakdown in zip(charts, breakdowns)
+        ],
+        "count": len(personas)
+    }
+
 @router.get("/personas/sample")
 async def get_sample_personas():
     """Get sample persona configurations for testing"""
@@ -128,34 +208,63 @@ async def get_sample_personas():
         }
     }
 
+# Seed keywords served until request telemetry exists for a slice
+DEFAULT_TRENDING_KEYWORDS = {
+    "global": {
+        "general": ["authentic", "sustainable", "AI-powered", "community", "personalized", "innovative"],
+        "technology": ["AI", "automation", "cloud", "cybersecurity", "blockchain", "quantum"],
+        "retail": ["omnichannel", "sustainable", "experience", "personalization", "social commerce"]
+    },
+    "us": {
+        "general": ["local", "made-in-usa", "community", "authentic", "premium", "fast"],
+        "technology": ["silicon valley", "innovation", "startup", "venture", "disruptive"]
+    }
+}
+
+def sketch_location_keys(location: str) -> List[str]:
+    """Location slices (resolved place ids) a persona's keywords are counted in"""
+    resolved_location = location_resolver.resolve(location)
+    return ["global"] + (list(resolved_location.keys) if resolved_location else [])
+
+def sketch_industry_keys(interests: List[str]) -> List[str]:
+    """Industry slices (canonical interest ids) a persona's keywords are counted in"""
+    return ["general"] + interest_resolver.resolve_all(interests)
+
+def sketch_slice(location: str, industry: str) -> tuple:
+    """Map endpoint query parameters onto a sketch slice"""
+    resolved_location = None if location.lower() == "global" else location_resolver.resolve(location)
+    industry_ids = [] if industry.lower() == "general" else interest_resolver.resolve(industry)
+    location_key = resolved_location.keys[0] if resolved_location else location.strip().lower()
+    industry_key = industry_ids[0] if industry_ids else industry.strip().lower()
+    return location_key, industry_key
+
 @router.get("/keywords/trending")
-async def get_trending_keywords(location: str = "global", industry: str = "general"):
+async def get_trending_keywords(location: str = "global", industry: str = "general", limit: int = 10):
     """Get current trending keywords by location and industry"""
     
-    # Mock trending keywords (in real implementation, this would fetch from APIs)
-    trending_data = {
-        "global": {
-            "general": ["authentic", "sustainable", "AI-powered", "community", "personalized", "innovative"],
-            "technology": ["AI", "automation", "cloud", "cybersecurity", "blockchain", "quantum"],
-            "retail": ["omnichannel", "sustainable", "experience", "personalization", "social commerce"]
-        },
-        "us": {
-            "general": ["local", "made-in-usa", "community", "authentic", "premium", "fast"],
-            "technology": ["silicon valley", "innovation", "startup", "venture", "disruptive"]
-        }
-    }
-    
-    location_key = location.lower() if location.lower() in trending_data else "global"
-    industry_key = industry.lower() if industry.lower() in trending_data[location_key] else "general"
+    # Heavy hitters from generated personas, estimated by Count-Min sketches
+    location_key, industry_key = sketch_slice(location, industry)
+    ranked = keyword_sketches.top_keywords(location_key, industry_key, max(1, min(limit, 50)))
     
-    keywords = trending_data[location_key][industry_key]
+    if ranked:
+        keywords = [keyword for keyword, _ in ranked]
+        keyword_counts = [{"keyword": keyword, "estimated_count": count} for keyword, count in ranked]
+        source = "request_telemetry"
+    else:
+        location_key = location.lower() if location.lower() in DEFAULT_TRENDING_KEYWORDS else "global"
+        industry_key = industry.lower() if industry.lower() in DEFAULT_TRENDING_KEYWORDS[location_key] else "general"
+        keywords = DEFAULT_TRENDING_KEYWORDS[location_key][industry_key]
+        keyword_counts = []
+        source = "default"
     
     return {
         "location": location,
         "industry": industry, 
         "trending_keywords": keywords,
+        "keyword_counts": keyword_counts,
+        "source": source,
         "last_updated": datetime.utcnow().isoformat(),
-        "note": "Keywords updated based on current market analysis and news trends"
+        "note": "Keywords ranked by frequency across generated personas for this location and industry"
     }
 
 @router.get("/news/recent")
@@ -183,6 +292,81 @@ async def get_recent_news(location: str = "global", topics: List[str] = None):
         logger.error(f"Failed to fetch recent news: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch recent news")
 
+@router.get("/trends/topics")
+async def get_trending_topics(window: str = "24h", limit: int = 10):
+    """Get time-decayed top themes and keywords from the ingested article stream"""
+    
+    if window not in TREND_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"Unknown window '{window}', expected one of: {', '.join(TREND_WINDOWS)}")
+    
+    return {
+        **trend_tracker.get_snapshot(window=window, limit=max(1, min(limit, 50))),
+        "last_updated": datetime.utcnow().isoformat()
+    }
+
+@router.get("/llm/usage")
+async def get_llm_usage(window: str = "1h"):
+    """Get token, latency and estimated cost totals of LLM and image calls over a time window"""
+    
+    if window not in USAGE_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"Unknown window '{window}', expected one of: {', '.join(USAGE_WINDOWS)}")
+    
+    return {
+        **usage_tracker.window_summary(window),
+        "last_updated": datetime.utcnow().isoformat()
+    }
+
+@router.get("/providers/limits")
+async def get_provider_limits():
+    """Get the adaptive concurrency limit, in-flight calls and queue depth of each outbound provider"""
+    
+    return {
+        "providers": {name: limiter.get_stats() for name, limiter in provider_limiters.items()},
+        "last_updated": datetime.utcnow().isoformat()
+    }
+
+@router.get("/cache/stats")
+async def get_cache_statistics():
+    """Get size and hit-rate statistics for the in-process caches"""
+    
+    return {
+        "caches": get_cache_stats(),
+        "keyword_sketches": keyword_sketches.get_stats(),
+        "image_store": image_store.get_stats(),
+        "persona_images": marketing_core.image_service.get_stats(),
+        "llm_client": llm_client.get_stats(),
+        "llm_completions": completion_cache.get_stats(),
+        "ad_copy": marketing_core.ad_generator.get_stats(),
+        "last_updated": datetime.utcnow().isoformat()
+    }
+
+# Stored images never change under a hash, so clients may cache them indefinitely
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+@router.get("/images/{image_hash}")
+async def get_persona_image(image_hash: str, size: Optional[int] = None, format: str = "webp", if_none_match: Optional[str] = Header(None)):
+    """Serve a stored persona image by its hash, optionally as a resized WebP/JPEG derivative"""
+    
+    if size is not None and size not in DERIVATIVE_SIZES:
+        raise HTTPException(status_code=400, detail=f"Unsupported size {size}, expected one of: {', '.join(map(str, DERIVATIVE_SIZES))}")
+    if format not in DERIVATIVE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{format}', expected one of: {', '.join(DERIVATIVE_FORMATS)}")
+    
+    if size is None:
+        stored = image_store.find(image_hash)
+    else:
+        stored = await asyncio.to_thread(image_store.derivative, image_hash, size, format)
+    if not stored:
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    path, media_type = stored
+    headers = {"Cache-Control": IMAGE_CACHE_CONTROL, "ETag": f'"{path.name}"'}
+    if if_none_match and path.name in if_none_match:
+        return Response(status_code=304, headers=headers)
+    
+    # FileResponse streams from disk (sendfile where the server supports it)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
 async def save_to_campaign_history(age_range: str, location: str, interests: List[str], intelligence_data: Dict[str, Any]):
     """Background task to automatically save generated campaigns to history"""
     try:
@@ -203,6 +387,7 @@ async def save_to_campaign_history(age_range: str, location: str, interests: Lis
             "title": title,
             "created_at": datetime.now(timezone.utc).isoformat()
         }
+        history_entry["search_tokens"] = history_search_tokens(history_entry)
         
         # Save to database
         await db.campaign_history.insert_one(history_entry)
@@ -211,13 +396,17 @@ async def save_to_campaign_history(age_range: str, location: str, interests: Lis
     except Exception as e:
         logger.error(f"Failed to auto-save campaign to history: {str(e)}")
 
-async def log_intelligence_request(age_range: str, location: str, interests: List[str], news_count: int):
+async def log_intelligence_request(age_range: str, location: str, interests: List[str], news_count: int, keywords: List[str] = None):
     """Background task to log marketing intelligence requests for analytics"""
     logger.info(
         f"Marketing Intelligence Analytics - "
         f"Age: {age_range}, Location: {location}, "
         f"Interests: {len(interests)}, News Articles: {news_count}"
     )
+    
+    # Feed the persona's keywords into the trending keyword sketches
+    if keywords:
+        keyword_sketches.record(sketch_location_keys(location), sketch_industry_keys(interests), keywords)
 
 # Phase 6: Campaign Performance Endpoints
 from server import (
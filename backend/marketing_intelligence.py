@@ -1,17 +1,31 @@
 import os
 import json
 import base64
+import html
 import hashlib
 import asyncio
+import time
 import re
 import random
 import feedparser
 import requests
+import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from collections import Counter
 import logging
 from dotenv import load_dotenv
+from caching import LRUCache
+from trend_tracking import trend_tracker, TREND_WINDOWS
+from persona_resolution import interest_resolver, location_resolver, ResolvedLocation
+from knowledge_base import knowledge_base
+from motivation_matrices import MotivationMatrices
+from image_store import image_store
+from llm_client import llm_client
+from completion_cache import completion_cache
+from ad_copy_scoring import ad_copy_scorer
+from llm_usage import usage_tracker, image_cost
+from provider_limits import provider_limiters
 
 # Load environment variables
 load_dotenv()
@@ -26,6 +40,9 @@ class APIConfiguration:
         self.brave_api_key = os.environ.get('BRAVE_SEARCH_API_KEY', '')
         self.perplexity_api_key = os.environ.get('PERPLEXITY_API_KEY', '')
         self.emergent_llm_key = os.environ.get('EMERGENT_LLM_KEY', '')
+        # OpenAI-compatible endpoint to send LLM calls to instead of the Emergent
+        # integrations (e.g. the llm_standin load-testing server)
+        self.llm_base_url = os.environ.get('LLM_BASE_URL', '')
         
     def update_configuration(self, config_data: Dict[str, Any]):
         """Update API configuration dynamically"""
@@ -40,6 +57,10 @@ class APIConfiguration:
         if 'perplexity_api_key' in config_data:
             self.perplexity_api_key = config_data['perplexity_api_key']
             os.environ['PERPLEXITY_API_KEY'] = config_data['perplexity_api_key']
+            
+        if 'llm_base_url' in config_data:
+            self.llm_base_url = config_data['llm_base_url'] or ''
+            os.environ['LLM_BASE_URL'] = self.llm_base_url
     
     def get_status(self) -> Dict[str, Any]:
         """Get current API configuration status"""
@@ -47,7 +68,8 @@ class APIConfiguration:
             "use_real_apis": self.use_real_apis,
             "brave_api_configured": bool(self.brave_api_key),
             "perplexity_api_configured": bool(self.perplexity_api_key),
-            "emergent_llm_configured": bool(self.emergent_llm_key)
+            "emergent_llm_configured": bool(self.emergent_llm_key),
+            "llm_base_url": self.llm_base_url or None
         }
 
 # Global configuration instance
@@ -56,72 +78,43 @@ api_config = APIConfiguration()
 class PersonaAnalyzer:
     """Advanced persona analysis and keyword generation"""
     
-    def __init__(self):
-        self.age_group_behaviors = {
-            "18-24": {
-                "keywords": ["authentic", "trendy", "social", "instant", "viral", "FOMO", "aesthetic", "sustainable", "inclusive", "digital-native"],
-                "behavior": "Highly influenced by social media, values authenticity and peer approval, prefers visual content, early adopters of trends"
-            },
-            "25-34": {
-                "keywords": ["career", "ambitious", "efficient", "premium", "experience", "networking", "growth", "innovative", "work-life balance", "investment"],
-                "behavior": "Career-focused, values efficiency and quality, willing to pay for convenience, influenced by professional networks"
-            },
-            "35-44": {
-                "keywords": ["family", "reliable", "established", "quality", "security", "practical", "trusted", "proven", "comprehensive", "legacy"],
-                "behavior": "Values reliability and proven solutions, family-oriented decision making, prefers established brands with track records"
-            },
-            "45-54": {
-                "keywords": ["expert", "sophisticated", "premium", "exclusive", "authority", "expertise", "traditional", "refined", "distinguished", "prestige"],
-                "behavior": "Values expertise and sophistication, prefers premium offerings, influenced by authority and credibility"
-            },
-            "55+": {
-                "keywords": ["trusted", "heritage", "classic", "dependable", "simple", "clear", "service", "personal", "straightforward", "established"],
-                "behavior": "Values trust and personal service, prefers clear communication, loyal to established brands"
-            }
-        }
-        
-        self.location_characteristics = {
-            "new york": {"keywords": ["fast-paced", "competitive", "premium", "exclusive", "cutting-edge"], "culture": "Urban, fast-paced, status-conscious"},
-            "california": {"keywords": ["innovative", "sustainable", "tech-forward", "progressive", "health-conscious"], "culture": "Tech-savvy, environmentally conscious"},
-            "texas": {"keywords": ["bold", "independent", "value-driven", "practical", "authentic"], "culture": "Independent, value-conscious, practical"},
-            "florida": {"keywords": ["relaxed", "diverse", "vibrant", "lifestyle", "sunshine"], "culture": "Lifestyle-focused, diverse, leisure-oriented"},
-            "london": {"keywords": ["sophisticated", "traditional", "quality", "heritage", "refined"], "culture": "Traditional yet modern, quality-focused"},
-            "toronto": {"keywords": ["multicultural", "progressive", "inclusive", "balanced", "friendly"], "culture": "Multicultural, progressive values"}
-        }
-        
-        self.interest_keywords = {
-            "technology": ["AI", "innovation", "digital", "smart", "automated", "cutting-edge", "disruptive", "next-gen"],
-            "fitness": ["active", "healthy", "performance", "energy", "strength", "wellness", "transformation", "motivation"],
-            "travel": ["adventure", "explore", "discover", "journey", "experience", "wanderlust", "authentic", "memorable"],
-            "food": ["gourmet", "artisanal", "fresh", "organic", "flavorful", "culinary", "farm-to-table", "indulgent"],
-            "art": ["creative", "expressive", "unique", "inspiring", "aesthetic", "curated", "artistic", "imaginative"],
-            "music": ["rhythm", "harmony", "soulful", "energetic", "melodic", "immersive", "emotional", "uplifting"],
-            "fashion": ["stylish", "trendy", "chic", "elegant", "bold", "sophisticated", "contemporary", "statement"]
-        }
+    # Rule tables live in data/persona_rules.json (see knowledge_base)
+    @property
+    def age_group_behaviors(self):
+        return knowledge_base.section("persona")["age_group_behaviors"]
     
-    def analyze_persona(self, age_range: str, location: str, interests: List[str]) -> Dict[str, Any]:
+    @property
+    def location_characteristics(self):
+        return knowledge_base.section("persona")["location_characteristics"]
+    
+    @property
+    def interest_keywords(self):
+        return knowledge_base.section("persona")["interest_keywords"]
+    
+    def analyze_persona(self, age_range: str, location: str, interests: List[str], interest_ids: Optional[List[str]] = None, resolved_location: Optional[ResolvedLocation] = None) -> Dict[str, Any]:
         """Generate comprehensive persona analysis"""
         
+        if interest_ids is None:
+            interest_ids = interest_resolver.resolve_all(interests)
+        if resolved_location is None:
+            resolved_location = location_resolver.resolve(location)
+        
         # Analyze age group
         age_data = self.age_group_behaviors.get(age_range, self.age_group_behaviors["25-34"])
         
         # Analyze location
-        location_key = next((key for key in self.location_characteristics.keys() if key in location.lower()), "general")
-        location_data = self.location_characteristics.get(location_key, {
-            "keywords": ["local", "community", "regional", "accessible"],
+        location_data = (resolved_location.lookup(self.location_characteristics) if resolved_location else None) or {
+            "keywords": ("local", "community", "regional", "accessible"),
             "culture": "Community-focused, local preferences"
-        })
+        }
         
         # Analyze interests
         interest_keywords = []
-        for interest in interests:
-            interest_lower = interest.lower()
-            for key, keywords in self.interest_keywords.items():
-                if key in interest_lower or interest_lower in key:
-                    interest_keywords.extend(keywords[:3])  # Take top 3 per interest
+        for interest_id in interest_ids:
+            interest_keywords.extend(self.interest_keywords.get(interest_id, [])[:3])  # Take top 3 per interest
         
         # Generate trending keywords
-        all_keywords = age_data["keywords"][:5] + location_data["keywords"][:3] + interest_keywords[:7]
+        all_keywords = [*age_data["keywords"][:5], *location_data["keywords"][:3], *interest_keywords[:7]]
         
         # Generate behavioral analysis
         behavior_analysis = f"""
@@ -140,8 +133,8 @@ class PersonaAnalyzer:
             "trending_keywords_analysis": {
                 "summary": f"Analysis based on {age_range} demographic in {location} with interests in {', '.join(interests)}",
                 "keywords": list(set(all_keywords))[:15],  # Remove duplicates, limit to 15
-                "primary_motivators": age_data["keywords"][:3],
-                "regional_influences": location_data["keywords"][:3],
+                "primary_motivators": list(age_data["keywords"][:3]),
+                "regional_influences": list(location_data["keywords"][:3]),
                 "interest_drivers": interest_keywords[:5]
             },
             "behavior_analysis_summary": behavior_analysis
@@ -250,9 +243,35 @@ class NewsCategorizationService:
                 'theater', 'media', 'social media', 'influencer'
             ]
         }
+        
+        # Taxonomy version changes whenever the keyword lists change, so cached
+        # categorizations never outlive the taxonomy that produced them
+        self.taxonomy_version = hashlib.sha1(
+            json.dumps(self.category_keywords, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:12]
+        
+        # The same headlines recur across feeds, refreshes and fallback data
+        self.categorization_cache = LRUCache(
+            "news_categorization",
+            max_size=int(os.environ.get('CATEGORIZATION_CACHE_SIZE', '4096'))
+        )
     
     def categorize_headline(self, headline: str, summary: str = "") -> str:
-        """Categorize a news headline into predefined categories"""
+        """Categorize a news headline into predefined categories (memoized)"""
+        
+        cache_key = hashlib.sha1(
+            f"{self.taxonomy_version}\x00{headline}\x00{summary}".encode('utf-8')
+        ).hexdigest()
+        
+        category = self.categorization_cache.get(cache_key)
+        if category is None:
+            category = self._score_headline(headline, summary)
+            self.categorization_cache.put(cache_key, category)
+        
+        return category
+    
+    def _score_headline(self, headline: str, summary: str) -> str:
+        """Score a headline against every category and pick the best match"""
         
         text_to_analyze = (headline + " " + summary).lower()
         
@@ -301,87 +320,56 @@ class NewsCategorizationService:
 class BehavioralAnalysisProcessor:
     """Generate behavioral analysis data for charts and visualizations"""
     
+    # Demographic age groups in order, with their generation labels
+    age_group_labels = {
+        '18-24': 'Gen Z',
+        '25-34': 'Millennials',
+        '35-44': 'Gen X Early',
+        '45-54': 'Gen X Late',
+        '55+': 'Boomers+'
+    }
+    
     def __init__(self):
-        # Mapping of age groups to key motivational factors
-        self.age_group_motivations = {
-            '18-24': {
-                'Social Recognition': 85,
-                'Authenticity': 90,
-                'Innovation': 80,
-                'Affordability': 75,
-                'Convenience': 70
-            },
-            '25-34': {
-                'Efficiency': 85,
-                'Career Growth': 90,
-                'Quality': 80,
-                'Innovation': 75,
-                'Work-Life Balance': 85
-            },
-            '35-44': {
-                'Reliability': 90,
-                'Family Security': 85,
-                'Quality': 88,
-                'Time Saving': 80,
-                'Value for Money': 75
-            },
-            '45-54': {
-                'Expertise': 85,
-                'Premium Quality': 90,
-                'Reliability': 88,
-                'Status': 70,
-                'Tradition': 75
-            },
-            '55+': {
-                'Trust': 95,
-                'Simplicity': 85,
-                'Personal Service': 90,
-                'Heritage': 80,
-                'Security': 85
-            }
-        }
-        
-        # Interest-based motivation modifiers
-        self.interest_modifiers = {
-            'technology': {'Innovation': +10, 'Efficiency': +8},
-            'fitness': {'Health': +15, 'Performance': +10},
-            'sustainability': {'Social Responsibility': +12, 'Long-term Value': +8},
-            'art': {'Creativity': +15, 'Uniqueness': +10},
-            'business': {'Success': +10, 'Networking': +8},
-            'travel': {'Adventure': +12, 'Experience': +10},
-            'music': {'Expression': +10, 'Community': +8},
-            'fashion': {'Style': +15, 'Trend Awareness': +10}
-        }
+        self._matrices: Optional[Tuple[Any, MotivationMatrices]] = None
+    
+    # Rule tables live in data/persona_rules.json (see knowledge_base); location
+    # modifiers map motivation -> (value assumed when absent, bonus)
+    @property
+    def age_group_motivations(self):
+        return knowledge_base.section("behavioral")["age_group_motivations"]
+    
+    @property
+    def interest_modifiers(self):
+        return knowledge_base.section("behavioral")["interest_modifiers"]
     
-    def generate_behavioral_chart_data(self, age_range: str, interests: List[str], location: str = None) -> List[Dict[str, Any]]:
+    @property
+    def location_modifiers(self):
+        return knowledge_base.section("behavioral")["location_modifiers"]
+    
+    def generate_behavioral_chart_data(self, age_range: str, interests: List[str], location: str = None, interest_ids: Optional[List[str]] = None, resolved_location: Optional[ResolvedLocation] = None) -> List[Dict[str, Any]]:
         """Generate behavioral analysis chart data"""
         
+        if interest_ids is None:
+            interest_ids = interest_resolver.resolve_all(interests)
+        if resolved_location is None and location:
+            resolved_location = location_resolver.resolve(location)
+        
         # Get base motivations for age group
         base_motivations = self.age_group_motivations.get(age_range, self.age_group_motivations['25-34']).copy()
         
         # Apply interest-based modifiers
-        for interest in interests:
-            interest_lower = interest.lower()
-            for interest_key, modifiers in self.interest_modifiers.items():
-                if interest_key in interest_lower or interest_lower in interest_key:
-                    for motivation, modifier in modifiers.items():
-                        if motivation in base_motivations:
-                            base_motivations[motivation] = min(100, base_motivations[motivation] + modifier)
-                        else:
-                            base_motivations[motivation] = min(100, 60 + modifier)
+        for interest_id in interest_ids:
+            for motivation, modifier in self.interest_modifiers.get(interest_id, {}).items():
+                if motivation in base_motivations:
+                    base_motivations[motivation] = min(100, base_motivations[motivation] + modifier)
+                else:
+                    base_motivations[motivation] = min(100, 60 + modifier)
         
         # Geographic location modifiers
-        if location:
-            location_lower = location.lower()
-            if 'new york' in location_lower or 'nyc' in location_lower:
-                base_motivations['Efficiency'] = min(100, base_motivations.get('Efficiency', 70) + 10)
-                base_motivations['Status'] = min(100, base_motivations.get('Status', 60) + 8)
-            elif 'california' in location_lower or 'san francisco' in location_lower:
-                base_motivations['Innovation'] = min(100, base_motivations.get('Innovation', 70) + 12)
-                base_motivations['Social Responsibility'] = min(100, base_motivations.get('Social Responsibility', 60) + 10)
-            elif 'london' in location_lower or 'uk' in location_lower:
-                base_motivations['Quality'] = min(100, base_motivations.get('Quality', 70) + 8)
-                base_motivations['Heritage'] = min(100, base_motivations.get('Heritage', 60) + 10)
+        if resolved_location:
+            location_modifiers = resolved_location.lookup(self.location_modifiers, {})
+            for motivation, (default_value, bonus) in location_modifiers.items():
+                base_motivations[motivation] = min(100, base_motivations.get(motivation, default_value) + bonus)
         
         # Convert to chart format and sort by value
         chart_data = [
@@ -394,17 +382,79 @@ class BehavioralAnalysisProcessor:
         
         return chart_data[:6]
     
+    @property
+    def motivation_matrices(self) -> MotivationMatrices:
+        """Dense motivation matrices, recompiled when the knowledge base reloads"""
+        rules = knowledge_base.section("behavioral")
+        if self._matrices is None or self._matrices[0] is not rules:
+            self._matrices = (rules, MotivationMatrices(rules))
+        return self._matrices[1]
+    
+    def generate_behavioral_chart_data_batch(self, personas: List[Dict[str, Any]], limit: int = 6) -> List[List[Dict[str, Any]]]:
+        """Generate behavioral chart data for many personas in one vectorized pass
+        
+        Each persona is a dict with age_range, interests and location (or
+        pre-resolved interest_ids / resolved_location). Results match
+        generate_behavioral_chart_data except that equal values are ordered
+        by motivation vocabulary.
+        """
+        
+        interest_ids = [
+            persona["interest_ids"] if persona.get("interest_ids") is not None else interest_resolver.resolve_all(persona.get("interests", []))
+            for persona in personas
+        ]
+        resolved_locations = [
+            persona["resolved_location"] if persona.get("resolved_location") is not None else location_resolver.resolve(persona.get("location"))
+            for persona in personas
+        ]
+        
+        matrices = self.motivation_matrices
+        scores = matrices.score([persona.get("age_range", "25-34") for persona in personas], interest_ids, resolved_locations)
+        return matrices.top_motivations(scores, limit)
+    
+    def generate_demographic_breakdown_batch(self, personas: List[Dict[str, Any]], seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Generate demographic breakdowns for many personas in one vectorized pass"""
+        
+        count = len(personas)
+        age_order = list(self.age_group_labels)
+        labels = list(self.age_group_labels.values())
+        default_row = age_order.index('25-34')
+        rows = np.fromiter(
+            (age_order.index(persona.get("age_range")) if persona.get("age_range") in self.age_group_labels else default_row for persona in personas),
+            dtype=np.intp,
+            count=count
+        )
+        
+        rng = np.random.default_rng(seed)
+        primary = rng.integers(75, 86, size=count)
+        market_sizes = rng.integers(10000, 500001, size=count)
+        
+        # Primary group gets 75-85%, adjacent groups split the remainder
+        percentages = np.zeros((count, len(age_order)), dtype=np.int64)
+        personas_index = np.arange(count)
+        percentages[personas_index, rows] = primary
+        adjacent = (rows > 0).astype(np.int64) + (rows < len(age_order) - 1)
+        share = (100 - primary) // adjacent
+        has_previous = rows > 0
+        percentages[personas_index[has_previous], rows[has_previous] - 1] = share[has_previous]
+        has_next = rows < len(age_order) - 1
+        percentages[personas_index[has_next], rows[has_next] + 1] = share[has_next]
+        
+        return [
+            {
+                'age_distribution': [{'label': label, 'percentage': percentage} for label, percentage in zip(labels, row)],
+                'primary_location': persona.get("location"),
+                'top_interests': persona.get("interests", [])[:4],
+                'market_size_estimate': market_size
+            }
+            for persona, row, market_size in zip(personas, percentages.tolist(), market_sizes.tolist())
+        ]
+    
     def generate_demographic_breakdown(self, age_range: str, location: str, interests: List[str]) -> Dict[str, Any]:
         """Generate demographic breakdown data"""
         
         # Age group distribution
-        age_groups = {
-            '18-24': {'label': 'Gen Z', 'percentage': 0},
-            '25-34': {'label': 'Millennials', 'percentage': 0},
-            '35-44': {'label': 'Gen X Early', 'percentage': 0},
-            '45-54': {'label': 'Gen X Late', 'percentage': 0},
-            '55+': {'label': 'Boomers+', 'percentage': 0}
-        }
+        age_groups = {group: {'label': label, 'percentage': 0} for group, label in self.age_group_labels.items()}
         
         # Set primary age group to 70-80%, others get smaller percentages
         primary_percentage = random.randint(75, 85)
@@ -414,7 +464,7 @@ class BehavioralAnalysisProcessor:
         remaining = 100 - primary_percentage
         adjacent_groups = []
         
-        age_order = ['18-24', '25-34', '35-44', '45-54', '55+']
+        age_order = list(self.age_group_labels)
         current_index = age_order.index(age_range)
         
         if current_index > 0:
@@ -463,6 +513,16 @@ class RSSNewsService:
             ]
         }
         
+        # Feed categories to pull for each canonical interest id
+        self.interest_feed_categories = {
+            "technology": ["technology"],
+            "innovation": ["technology"],
+            "business": ["business", "marketing"],
+            "marketing": ["business", "marketing"],
+            "finance": ["business", "marketing"],
+            "startup": ["business", "marketing"]
+        }
+        
         # Fallback news data for when RSS feeds are unavailable
         self.fallback_news = [
             {
@@ -512,6 +572,9 @@ class NewsSearchService:
     
     def __init__(self):
         self.rss_service = RSSNewsService()
+        self.trend_window = os.environ.get('TREND_WINDOW', '24h')
+        if self.trend_window not in TREND_WINDOWS:
+            self.trend_window = '24h'
         self.mock_news_data = {
             "technology": [
                 {
@@ -549,17 +612,20 @@ class NewsSearchService:
             ]
         }
     
-    async def search_recent_news(self, location: str, interests: List[str], age_range: str) -> Dict[str, Any]:
+    async def search_recent_news(self, location: str, interests: List[str], age_range: str, interest_ids: Optional[List[str]] = None) -> Dict[str, Any]:
         """Search for recent news relevant to persona and location using RSS feeds"""
         
+        if interest_ids is None:
+            interest_ids = interest_resolver.resolve_all(interests)
+        
         # Always use RSS feeds for recent, real news
-        return await self._rss_news_search(location, interests, age_range)
+        return await self._rss_news_search(location, interests, age_range, interest_ids)
     
-    async def _rss_news_search(self, location: str, interests: List[str], age_range: str) -> Dict[str, Any]:
+    async def _rss_news_search(self, location: str, interests: List[str], age_range: str, interest_ids: List[str]) -> Dict[str, Any]:
         """RSS-based news search for recent, real articles"""
         try:
             # Fetch recent articles from RSS feeds
-            recent_articles = await self._fetch_rss_articles(interests)
+            recent_articles = await self._fetch_rss_articles(interest_ids)
             
             if not recent_articles:
                 # Use fallback news if RSS feeds fail
@@ -570,7 +636,7 @@ class NewsSearchService:
             categorized_news = self.rss_service.categorization_service.process_news_articles(recent_articles[:8])
             
             # Generate actionable insights
-            insights = self._generate_marketing_insights(recent_articles, location, interests, age_range)
+            insights = self._generate_marketing_insights(recent_articles, location, interests, age_range, interest_ids)
             
             return {
                 "news_results": categorized_news,
@@ -579,10 +645,10 @@ class NewsSearchService:
             
         except Exception as e:
             logger.error(f"RSS news search failed: {e}")
-            return await self._mock_news_search(location, interests, age_range)
+            return await self._mock_news_search(location, interests, age_range, interest_ids)
     
-    async def _fetch_rss_articles(self, interests: List[str]) -> List[Dict[str, Any]]:
-        """Fetch recent articles from RSS feeds based on interests"""
+    async def _fetch_rss_articles(self, interest_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch recent articles from RSS feeds based on resolved interest ids"""
         
         articles = []
         
@@ -590,13 +656,9 @@ class NewsSearchService:
             # Determine which RSS feeds to use based on interests
             relevant_feeds = []
             
-            for interest in interests:
-                interest_lower = interest.lower()
-                if any(tech_term in interest_lower for tech_term in ['tech', 'ai', 'digital', 'software', 'innovation']):
-                    relevant_feeds.extend(self.rss_service.rss_feeds["technology"])
-                elif any(biz_term in interest_lower for biz_term in ['business', 'marketing', 'finance', 'entrepreneur']):
-                    relevant_feeds.extend(self.rss_service.rss_feeds["business"])
-                    relevant_feeds.extend(self.rss_service.rss_feeds["marketing"])
+            for interest_id in interest_ids:
+                for feed_category in self.rss_service.interest_feed_categories.get(interest_id, []):
+                    relevant_feeds.extend(self.rss_service.rss_feeds[feed_category])
             
             # If no specific interests match, use general feeds
             if not relevant_feeds:
@@ -608,8 +670,11 @@ class NewsSearchService:
             # Fetch articles from each feed
             for feed_url in relevant_feeds:
                 try:
-                    # Parse RSS feed
-                    feed = feedparser.parse(feed_url)
+                    # Parse RSS feed off the event loop, under the news provider limit
+                    async with provider_limiters["news"].slot() as call:
+                        feed = await asyncio.to_thread(feedparser.parse, feed_url)
+                        if getattr(feed, "status", 200) == 429 or getattr(feed, "status", 200) >= 500:
+                            call.mark_overloaded()
                     
                     # Extract recent articles (last 2 weeks)
                     cutoff_date = datetime.now() - timedelta(days=14)
@@ -638,6 +703,9 @@ class NewsSearchService:
                     logger.warning(f"Failed to parse RSS feed {feed_url}: {feed_error}")
                     continue
             
+            # Count every fetched article in the process-wide trend stream
+            trend_tracker.ingest_articles(articles)
+            
             # Sort by publication date (newest first)
             articles.sort(key=lambda x: x['published'], reverse=True)
             
@@ -648,46 +716,38 @@ class NewsSearchService:
             logger.error(f"Error fetching RSS articles: {e}")
             return []
     
-    async def _mock_news_search(self, location: str, interests: List[str], age_range: str) -> Dict[str, Any]:
+    async def _mock_news_search(self, location: str, interests: List[str], age_range: str, interest_ids: List[str]) -> Dict[str, Any]:
         """Mock news search with realistic data"""
         
         # Select relevant news based on interests
         relevant_news = []
-        for interest in interests:
-            if interest.lower() in self.mock_news_data:
-                relevant_news.extend(self.mock_news_data[interest.lower()])
-            else:
-                relevant_news.extend(self.mock_news_data["general"])
+        for interest_id in interest_ids:
+            if interest_id in self.mock_news_data:
+                relevant_news.extend(self.mock_news_data[interest_id])
         
         if not relevant_news:
             relevant_news = self.mock_news_data["general"]
         
         # Categorize news articles
-        categorized_news = self.categorization_service.process_news_articles(relevant_news[:5])
+        categorized_news = self.rss_service.categorization_service.process_news_articles(relevant_news[:5])
         
         # Generate actionable insights
-        insights = self._generate_marketing_insights(relevant_news, location, interests, age_range)
+        insights = self._generate_marketing_insights(relevant_news, location, interests, age_range, interest_ids)
         
         return {
             "news_results": categorized_news,  # Now includes categorization
             "insights": insights
         }
     
-    def _generate_marketing_insights(self, news_data: List[Dict], location: str, interests: List[str], age_range: str) -> Dict[str, Any]:
+    def _generate_marketing_insights(self, news_data: List[Dict], location: str, interests: List[str], age_range: str, interest_ids: List[str]) -> Dict[str, Any]:
         """Generate actionable marketing insights from news data"""
         
-        # Analyze news themes
-        themes = []
-        for article in news_data:
-            title_words = article["title"].lower().split()
-            if any(word in ["ai", "technology", "digital"] for word in title_words):
-                themes.append("technology_adoption")
-            if any(word in ["sustainable", "environment", "green"] for word in title_words):
-                themes.append("sustainability_focus")
-            if any(word in ["social", "community", "engagement"] for word in title_words):
-                themes.append("social_engagement")
+        # Themes come from time-decayed counters over the whole article stream,
+        # not just the handful of articles held for this request
+        trend_tracker.ingest_articles(news_data)
+        themes = trend_tracker.top_themes(window=self.trend_window)
         
-        primary_theme = max(set(themes), key=themes.count) if themes else "general_trends"
+        primary_theme = themes[0] if themes else "general_trends"
         
         insight_templates = {
             "technology_adoption": {
@@ -733,12 +793,12 @@ class NewsSearchService:
         return {
             "summary": selected_insights["summary"],
             "actionable_recommendations": selected_insights["recommendations"],
-            "trending_topics": list(set(themes)),
+            "trending_topics": themes,
             "campaign_timing": "Optimal timing: Current market conditions favor immediate campaign launch",
-            "target_channels": self._recommend_channels(age_range, interests)
+            "target_channels": self._recommend_channels(age_range, interest_ids)
         }
     
-    def _recommend_channels(self, age_range: str, interests: List[str]) -> List[str]:
+    def _recommend_channels(self, age_range: str, interest_ids: List[str]) -> List[str]:
         """Recommend marketing channels based on persona"""
         channels = []
         
@@ -749,117 +809,202 @@ class NewsSearchService:
         else:
             channels.extend(["Facebook", "Email", "Traditional Media"])
         
-        if any(interest.lower() in ["technology", "gaming", "digital"] for interest in interests):
+        if any(interest_id in ["technology", "gaming"] for interest_id in interest_ids):
             channels.append("YouTube")
         
         return list(set(channels))
 
+# Fallback persona card, filled in per (age, location, interests)
+PERSONA_FALLBACK_SVG_TEMPLATE = """
+<svg width="400" height="400" xmlns="http://www.w3.org/2000/svg">
+    <defs>
+        <linearGradient id="bg" x1="0%" y1="0%" x2="100%" y2="100%">
+            <stop offset="0%" style="stop-color:#667eea"/>
+            <stop offset="100%" style="stop-color:#764ba2"/>
+        </linearGradient>
+    </defs>
+    <rect width="400" height="400" fill="url(#bg)"/>
+    <circle cx="200" cy="160" r="60" fill="#ffffff" opacity="0.9"/>
+    <circle cx="200" cy="160" r="45" fill="#4338ca"/>
+    <text x="200" y="170" text-anchor="middle" fill="white" font-family="Arial, sans-serif" font-size="24" font-weight="bold">P</text>
+
+    <rect x="50" y="260" width="300" height="100" rx="10" fill="#ffffff" opacity="0.95"/>
+    <text x="200" y="285" text-anchor="middle" fill="#1f2937" font-family="Arial, sans-serif" font-size="18" font-weight="bold">Marketing Persona</text>
+    <text x="200" y="305" text-anchor="middle" fill="#4b5563" font-family="Arial, sans-serif" font-size="14">{age_display} • {location}</text>
+    <text x="200" y="325" text-anchor="middle" fill="#6b7280" font-family="Arial, sans-serif" font-size="12">{interests_display}</text>
+    <text x="200" y="345" text-anchor="middle" fill="#9ca3af" font-family="Arial, sans-serif" font-size="10">Professional Marketing Persona</text>
+</svg>
+"""
+
 class ImageGenerationService:
     """AI image generation service with mock and real API support"""
     
     def __init__(self):
         # Pre-generated base64 placeholder image (1x1 pixel transparent PNG)
         self.placeholder_image = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+        
+        # Personas in the same prompt bucket share images; N variants per bucket add variety
+        self.variants_per_bucket = max(1, int(os.environ.get("PERSONA_IMAGE_VARIANTS", "1")))
+        self.bucket_images = LRUCache("persona_image_buckets", max_size=4096)
+        self._generations: Dict[str, asyncio.Future] = {}
+        self.generation_stats = {"generations": 0, "coalesced": 0}
+        self.fallback_images = LRUCache("persona_fallback_images", max_size=2048)
+        self._placeholder_url: Optional[str] = None
     
-    async def generate_persona_image(self, age_range: str, location: str, interests: List[str], trending_keywords: List[str]) -> str:
+    async def generate_persona_image(self, age_range: str, location: str, interests: List[str], trending_keywords: List[str], interest_ids: Optional[List[str]] = None, resolved_location: Optional[ResolvedLocation] = None) -> str:
         """Generate persona image with real or mock implementation"""
         
+        if interest_ids is None:
+            interest_ids = interest_resolver.resolve_all(interests)
+        if resolved_location is None:
+            resolved_location = location_resolver.resolve(location)
+        
         if api_config.use_real_apis and api_config.emergent_llm_key:
-            return await self._real_image_generation(age_range, location, interests, trending_keywords)
+            return await self._real_image_generation(age_range, location, interests, trending_keywords, interest_ids, resolved_location)
         else:
             return await self._mock_image_generation(age_range, location, interests)
     
-    async def _real_image_generation(self, age_range: str, location: str, interests: List[str], trending_keywords: List[str]) -> str:
+    async def _real_image_generation(self, age_range: str, location: str, interests: List[str], trending_keywords: List[str], interest_ids: List[str], resolved_location: Optional[ResolvedLocation]) -> str:
         """Real image generation using Emergent LLM integration with DALL-E 3"""
         try:
-            from emergentintegrations.llm.openai.image_generation import OpenAIImageGeneration
-            
-            # Create detailed prompt for persona image
-            prompt = self._create_enhanced_image_prompt(age_range, location, interests, trending_keywords)
+            # The prompt depends only on its bucket, so the bucket (plus variant) keys the image
+            bucket = self._image_prompt_bucket(age_range, interest_ids, resolved_location)
+            variant = self._image_variant(age_range, location, interests)
+            bucket_key = (knowledge_base.loads, bucket, variant)  # rule reloads start fresh
+            image_url = self.bucket_images.get(bucket_key)
+            if image_url:
+                completion_cache.record_hit("image", image_cost("dall-e-3"))
+                usage_tracker.record("persona_image", "dall-e-3", cached=True)
+                return image_url
             
-            logger.info(f"Generating persona image with prompt: {prompt[:100]}...")
+            prompt = self._render_image_prompt(bucket)
+            generation_params = {"model": "dall-e-3", "size": "1024x1024", "quality": "standard", "style": "vivid"}
+            image_hash = image_store.prompt_hash(prompt, **generation_params, **({"variant": variant} if variant else {}))
+            if image_store.find(image_hash):
+                logger.info(f"Reusing stored persona image {image_hash[:12]} for bucket {bucket}")
+                completion_cache.record_hit("image", image_cost(generation_params["model"], generation_params["quality"]))
+                usage_tracker.record("persona_image", generation_params["model"], cached=True)
+                image_url = image_store.url_for(image_hash)
+                self.bucket_images.put(bucket_key, image_url)
+                return image_url
             
-            image_gen = OpenAIImageGeneration(api_key=api_config.emergent_llm_key)
-            
-            # Generate with DALL-E 3 parameters
-            result = await image_gen.generate_images(
-                prompt=prompt,
-                model="dall-e-3",
-                size="1024x1024",
-                quality="standard",
-                style="vivid",
-                n=1
-            )
-            
-            if result and hasattr(result, 'data') and len(result.data) > 0:
-                # Get the URL from the response
-                image_url = result.data[0].url if hasattr(result.data[0], 'url') else None
-                
-                if image_url:
-                    logger.info("Successfully generated persona image")
-                    return image_url
-                else:
-                    logger.warning("Image generation succeeded but no URL returned")
-                    return await self._create_persona_fallback_image(age_range, location, interests)
+            # Concurrent personas in a new bucket wait for a single generation
+            pending = self._generations.get(image_hash)
+            if pending is not None:
+                self.generation_stats["coalesced"] += 1
+                image_url = await asyncio.shield(pending)
             else:
-                logger.warning("Image generation returned empty result")
+                pending = asyncio.get_running_loop().create_future()
+                self._generations[image_hash] = pending
+                image_url = None
+                try:
+                    image_url = await self._generate_and_store(prompt, image_hash, generation_params)
+                finally:
+                    pending.set_result(image_url)
+                    del self._generations[image_hash]
+            
+            if not image_url:
                 return await self._create_persona_fallback_image(age_range, location, interests)
+            
+            if image_url == image_store.url_for(image_hash):
+                self.bucket_images.put(bucket_key, image_url)
+            return image_url
                 
         except Exception as e:
             logger.error(f"Real image generation failed: {e}")
             return await self._create_persona_fallback_image(age_range, location, interests)
     
+    async def _generate_and_store(self, prompt: str, image_hash: str, generation_params: Dict[str, str]) -> Optional[str]:
+        """Generate one image and keep a copy in the image store"""
+        
+        logger.info(f"Generating persona image with prompt: {prompt[:100]}...")
+        self.generation_stats["generations"] += 1
+        completion_cache.record_miss("image")
+        
+        image_gen = llm_client.image_client(api_config.emergent_llm_key, api_config.llm_base_url)
+        
+        # Generate with DALL-E 3 parameters
+        async with provider_limiters["image"].slot():
+            started = time.perf_counter()
+            result = await image_gen.generate_images(prompt=prompt, n=1, **generation_params)
+        usage_tracker.record(
+            "persona_image",
+            generation_params["model"],
+            latency_ms=(time.perf_counter() - started) * 1000,
+            cost_usd=image_cost(generation_params["model"], generation_params.get("quality", "standard"))
+        )
+        
+        if result and hasattr(result, 'data') and len(result.data) > 0:
+            # Get the URL from the response
+            image_url = result.data[0].url if hasattr(result.data[0], 'url') else None
+            
+            if image_url:
+                logger.info("Successfully generated persona image")
+                # Provider URLs expire; keep our own copy and serve it by reference
+                if await image_store.fetch(image_hash, image_url):
+                    return image_store.url_for(image_hash)
+                return image_url
+            else:
+                logger.warning("Image generation succeeded but no URL returned")
+        else:
+            logger.warning("Image generation returned empty result")
+        return None
+    
+    def _image_variant(self, age_range: str, location: str, interests: List[str]) -> int:
+        """Stable variant index for a persona within its bucket"""
+        if self.variants_per_bucket == 1:
+            return 0
+        persona_key = "\0".join([age_range, location.strip().lower(), *sorted(interest.strip().lower() for interest in interests)])
+        return int.from_bytes(hashlib.sha256(persona_key.encode('utf-8')).digest()[:4], 'big') % self.variants_per_bucket
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bucket reuse and generation statistics"""
+        return {
+            "variants_per_bucket": self.variants_per_bucket,
+            "buckets": self.bucket_images.get_stats(),
+            **self.generation_stats
+        }
+    
     async def _mock_image_generation(self, age_range: str, location: str, interests: List[str]) -> str:
         """Mock image generation with placeholder"""
-        # Return a data URL with placeholder image
-        return f"data:image/png;base64,{self.placeholder_image}"
+        # Return a data URL with placeholder image, or a reference to its stored copy
+        placeholder_url = f"data:image/png;base64,{self.placeholder_image}"
+        if image_store.reference_mode:
+            if self._placeholder_url is None:
+                self._placeholder_url = await asyncio.to_thread(image_store.externalize, placeholder_url)
+            return self._placeholder_url
+        return placeholder_url
     
-    def _create_enhanced_image_prompt(self, age_range: str, location: str, interests: List[str], trending_keywords: List[str]) -> str:
+    def _create_enhanced_image_prompt(self, age_range: str, location: str, interests: List[str], trending_keywords: List[str], interest_ids: Optional[List[str]] = None, resolved_location: Optional[ResolvedLocation] = None) -> str:
         """Create detailed, professional prompt for DALL-E 3 persona generation"""
         
-        age_descriptors = {
-            "18-24": "young adult aged 20-22, energetic and modern, Gen Z aesthetic",
-            "25-34": "professional in late twenties, confident and contemporary, millennial style",
-            "35-44": "established professional in mid-thirties, polished and mature appearance",
-            "45-54": "experienced professional, sophisticated and refined, business executive style", 
-            "55+": "distinguished mature professional, classic and authoritative presence"
-        }
+        if interest_ids is None:
+            interest_ids = interest_resolver.resolve_all(interests)
+        if resolved_location is None:
+            resolved_location = location_resolver.resolve(location)
         
-        location_styles = {
-            "new york": "urban professional with metropolitan sophistication",
-            "san francisco": "tech-forward professional with innovative style",
-            "california": "relaxed professional with modern West Coast aesthetic",
-            "london": "refined European professional with classic elegance",
-            "texas": "confident American professional with approachable demeanor",
-            "chicago": "midwest professional with practical, grounded appearance"
-        }
+        return self._render_image_prompt(self._image_prompt_bucket(age_range, interest_ids, resolved_location))
+    
+    def _image_prompt_bucket(self, age_range: str, interest_ids: List[str], resolved_location: Optional[ResolvedLocation]) -> Tuple[str, Optional[str], Optional[str]]:
+        """Get the (age, location style, interest styling) rule keys a persona's prompt is built from"""
+        
+        rules = knowledge_base.section("image_prompt")
+        age_key = age_range if age_range in rules["age_descriptors"] else "25-34"
+        location_key = next((key for key in resolved_location.keys if key in rules["location_styles"]), None) if resolved_location else None
+        # Styling cue from the first interest that has one
+        styling_key = next((interest_id for interest_id in interest_ids if interest_id in rules["interest_styling"]), None)
+        return age_key, location_key, styling_key
+    
+    def _render_image_prompt(self, bucket: Tuple[str, Optional[str], Optional[str]]) -> str:
+        """Render the DALL-E prompt for a prompt bucket"""
         
-        interest_styling = {
-            "technology": "wearing modern, minimalist clothing suggesting tech-savvy personality",
-            "business": "in sharp business attire suggesting leadership and success",
-            "fitness": "with a healthy, energetic appearance suggesting active lifestyle",
-            "art": "with creative, stylish elements suggesting artistic sensibility",
-            "fashion": "impeccably styled with attention to fashion details",
-            "travel": "with a worldly, sophisticated appearance",
-            "sustainability": "with natural, conscious styling choices"
-        }
+        rules = knowledge_base.section("image_prompt")
+        age_key, location_key, styling_key = bucket
         
         # Build comprehensive description
-        age_desc = age_descriptors.get(age_range, age_descriptors["25-34"])
-        
-        location_key = next((key for key in location_styles.keys() if key.lower() in location.lower()), "general")
-        location_style = location_styles.get(location_key, "professional with approachable demeanor")
-        
-        # Get styling cues from interests
-        styling_elements = []
-        for interest in interests[:2]:  # Use top 2 interests
-            interest_lower = interest.lower()
-            for key, style in interest_styling.items():
-                if key in interest_lower:
-                    styling_elements.append(style)
-                    break
-        
-        styling_desc = styling_elements[0] if styling_elements else "in professional business casual attire"
+        age_desc = rules["age_descriptors"][age_key]
+        location_style = rules["location_styles"][location_key] if location_key else "professional with approachable demeanor"
+        styling_desc = rules["interest_styling"][styling_key] if styling_key else "in professional business casual attire"
         
         prompt = f"""
         Professional marketing persona photograph: A {age_desc}, {location_style}, {styling_desc}.
@@ -876,135 +1021,258 @@ class ImageGenerationService:
     async def _create_persona_fallback_image(self, age_range: str, location: str, interests: List[str]) -> str:
         """Create professional fallback persona image using CSS/SVG"""
         
+        # Rendered once per (age, location, first three interests)
+        cache_key = (age_range, location, tuple(interests[:3]))
+        image_url = self.fallback_images.get(cache_key)
+        if image_url is None:
+            image_url = await asyncio.to_thread(self._render_persona_fallback_image, age_range, location, interests)
+            self.fallback_images.put(cache_key, image_url)
+        return image_url
+    
+    def _render_persona_fallback_image(self, age_range: str, location: str, interests: List[str]) -> str:
         # Create a professional placeholder with persona details
         age_display = f"{age_range} years"
         interests_display = ", ".join(interests[:3]) if interests else "General interests"
         
         # Generate SVG placeholder with professional styling
-        svg_content = f"""
-        <svg width="400" height="400" xmlns="http://www.w3.org/2000/svg">
-            <defs>
-                <linearGradient id="bg" x1="0%" y1="0%" x2="100%" y2="100%">
-                    <stop offset="0%" style="stop-color:#667eea"/>
-                    <stop offset="100%" style="stop-color:#764ba2"/>
-                </linearGradient>
-            </defs>
-            <rect width="400" height="400" fill="url(#bg)"/>
-            <circle cx="200" cy="160" r="60" fill="#ffffff" opacity="0.9"/>
-            <circle cx="200" cy="160" r="45" fill="#4338ca"/>
-            <text x="200" y="170" text-anchor="middle" fill="white" font-family="Arial, sans-serif" font-size="24" font-weight="bold">P</text>
-            
-            <rect x="50" y="260" width="300" height="100" rx="10" fill="#ffffff" opacity="0.95"/>
-            <text x="200" y="285" text-anchor="middle" fill="#1f2937" font-family="Arial, sans-serif" font-size="18" font-weight="bold">Marketing Persona</text>
-            <text x="200" y="305" text-anchor="middle" fill="#4b5563" font-family="Arial, sans-serif" font-size="14">{age_display} • {location}</text>
-            <text x="200" y="325" text-anchor="middle" fill="#6b7280" font-family="Arial, sans-serif" font-size="12">{interests_display}</text>
-            <text x="200" y="345" text-anchor="middle" fill="#9ca3af" font-family="Arial, sans-serif" font-size="10">Professional Marketing Persona</text>
-        </svg>
-        """
+        svg_content = PERSONA_FALLBACK_SVG_TEMPLATE.format(
+            age_display=html.escape(age_display),
+            location=html.escape(location),
+            interests_display=html.escape(interests_display)
+        ).encode('utf-8')
+        
+        if image_store.reference_mode:
+            return image_store.url_for(image_store.put_content(svg_content))
         
         # Convert SVG to base64 data URL
-        svg_base64 = base64.b64encode(svg_content.encode('utf-8')).decode('utf-8')
+        svg_base64 = base64.b64encode(svg_content).decode('utf-8')
         return f"data:image/svg+xml;base64,{svg_base64}"
 
+# Fields every generated ad must carry, in output order
+AD_COPY_FIELDS = ["headline", "body", "keywords", "cta", "color_palette"]
+
+# Platforms generated when a request does not choose; any platform with a template can be requested
+DEFAULT_AD_PLATFORMS = ["instagram", "linkedin", "tiktok"]
+
+class AdCopyStreamParser:
+    """Incremental parser for sectioned ad copy that emits each section as soon as it closes"""
+    
+    SECTION_HEADERS = [
+        ("HEADLINE:", "headline"),
+        ("BODY:", "body"),
+        ("KEYWORDS:", "keywords"),
+        ("CTA:", "cta"),
+        ("COLOR_PALETTE:", "color_palette")
+    ]
+    
+    def __init__(self):
+        self.sections: Dict[str, str] = {}
+        self._buffer = ""
+        self._current_section: Optional[str] = None
+        self._current_content: List[str] = []
+    
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """Consume streamed text; returns the (section, content) pairs it closed"""
+        self._buffer += chunk
+        # The text after the last newline may be a partial line, so it waits for more input
+        *lines, self._buffer = self._buffer.split('\n')
+        closed = []
+        for line in lines:
+            closed.extend(self._consume_line(line))
+        return closed
+    
+    def close(self) -> List[Tuple[str, str]]:
+        """Finish the stream; returns the sections still open"""
+        closed = self._consume_line(self._buffer) if self._buffer else []
+        self._buffer = ""
+        return closed + self._close_section()
+    
+    def _consume_line(self, line: str) -> List[Tuple[str, str]]:
+        line = line.strip()
+        for header, section in self.SECTION_HEADERS:
+            if line.startswith(header):
+                closed = self._close_section()
+                self._current_section = section
+                self._current_content = [line[len(header):].strip()]
+                return closed
+        if line and self._current_section:
+            self._current_content.append(line)
+        return []
+    
+    def _close_section(self) -> List[Tuple[str, str]]:
+        if self._current_section is None:
+            return []
+        content = '\n'.join(self._current_content).strip()
+        self.sections[self._current_section] = content
+        closed = [(self._current_section, content)]
+        self._current_section = None
+        self._current_content = []
+        return closed
+
 class AdCopyGenerator:
     """AI-powered professional ad copy generation service"""
     
     def __init__(self):
-        self.platform_templates = {
-            "instagram": {
-                "style": "visual, trendy, hashtag-friendly",
-                "tone": "casual, engaging, visual-focused",
-                "cta_options": ["Shop Now", "Learn More", "Discover", "Get Started", "Explore"]
-            },
-            "linkedin": {
-                "style": "professional, results-oriented, business-focused", 
-                "tone": "authoritative, professional, value-driven",
-                "cta_options": ["Learn More", "Get Started", "Request Demo", "Contact Sales", "Download Now"]
-            },
-            "tiktok": {
-                "style": "trendy, informal, entertainment-focused",
-                "tone": "playful, energetic, trend-aware",
-                "cta_options": ["Try Now", "Check It Out", "Get Started", "Join Us", "Discover More"]
-            }
-        }
+        # "combined" asks for every platform in one JSON completion; "per_platform"
+        # sends one prompt per platform
+        self.generation_mode = os.environ.get("AD_COPY_GENERATION_MODE", "combined").lower()
+        # Best-of-N: the combined completion carries N alternatives per platform and
+        # the locally highest scoring one is returned
+        self.candidates_per_platform = max(1, int(os.environ.get("AD_COPY_CANDIDATES", "3")))
+        # Each platform's copy is cached on its own, so a request that adds a platform
+        # only generates that platform
+        self.platform_copies = LRUCache(
+            "ad_copy_platforms",
+            max_size=int(os.environ.get("AD_COPY_CACHE_SIZE", "4096")),
+            ttl_seconds=float(os.environ.get("AD_COPY_CACHE_TTL_SECONDS", "3600"))
+        )
+        self.parse_stats = {"combined_responses": 0, "invalid_json": 0, "platform_fallbacks": 0}
+    
+    # Rule tables live in data/persona_rules.json (see knowledge_base)
+    @property
+    def platform_templates(self):
+        return knowledge_base.section("ad_copy")["platform_templates"]
+    
+    @property
+    def headline_templates(self):
+        return knowledge_base.section("ad_copy")["headline_templates"]
+    
+    @property
+    def color_psychology(self):
+        return knowledge_base.section("ad_copy")["color_psychology"]
+    
+    def resolve_platforms(self, platforms: Optional[List[str]]) -> List[str]:
+        """Normalize a requested platform list (None means the defaults); raises ValueError on unknown platforms"""
         
-        # Professional ad copy templates
-        self.headline_templates = {
-            "instagram": [
-                "Transform Your {interest} Game with {keyword}",
-                "The {keyword} Solution {demographic} Love",
-                "Discover Why {location} Chooses {keyword}",
-                "{keyword} Made Simple for {demographic}"
-            ],
-            "linkedin": [
-                "Drive Results with {keyword} Solutions",
-                "Why {demographic} Trust Our {keyword} Expertise",
-                "Proven {keyword} Strategies for {demographic}",
-                "Unlock {keyword} Success for Your Business"
-            ],
-            "tiktok": [
-                "POV: You Found the Best {keyword} Ever",
-                "This {keyword} Trick Changes Everything",
-                "{demographic} Are Obsessed with This {keyword}",
-                "The {keyword} Everyone's Talking About"
-            ]
-        }
+        if not platforms:
+            return list(DEFAULT_AD_PLATFORMS)
         
-        # Color psychology database
-        self.color_psychology = {
-            "trust": {"colors": ["#2563EB", "#1E40AF", "#3B82F6"], "psychology": "Blue evokes trust, reliability, and professionalism - perfect for building consumer confidence."},
-            "energy": {"colors": ["#DC2626", "#EF4444", "#F97316"], "psychology": "Red and orange create urgency and excitement, driving immediate action and engagement."},
-            "growth": {"colors": ["#16A34A", "#22C55E", "#15803D"], "psychology": "Green represents growth, prosperity, and harmony - ideal for success-oriented messaging."},
-            "luxury": {"colors": ["#7C3AED", "#A855F7", "#1F2937"], "psychology": "Purple and dark tones convey luxury, sophistication, and premium quality."},
-            "innovation": {"colors": ["#06B6D4", "#0EA5E9", "#8B5CF6"], "psychology": "Cyan and purple suggest innovation, creativity, and forward-thinking technology."},
-            "warmth": {"colors": ["#F59E0B", "#FBBF24", "#F97316"], "psychology": "Warm oranges and yellows create friendly, approachable feelings and positive associations."}
-        }
+        resolved = list(dict.fromkeys(platform.strip().lower() for platform in platforms))
+        unknown = [platform for platform in resolved if platform not in self.platform_templates]
+        if unknown:
+            raise ValueError(f"Unsupported platforms: {', '.join(unknown)}; expected any of: {', '.join(self.platform_templates)}")
+        return resolved
     
-    async def generate_professional_ad_copy(self, persona_analysis: Dict, news_insights: Dict, age_range: str, interests: List[str], location: str) -> Dict[str, Any]:
+    async def generate_professional_ad_copy(self, persona_analysis: Dict, news_insights: Dict, age_range: str, interests: List[str], location: str, interest_ids: Optional[List[str]] = None, platforms: Optional[List[str]] = None) -> Dict[str, Any]:
         """Generate complete, professional ad copy ready for deployment"""
         
+        if interest_ids is None:
+            interest_ids = interest_resolver.resolve_all(interests)
+        platforms = self.resolve_platforms(platforms)
+        
         if api_config.use_real_apis and api_config.emergent_llm_key:
-            return await self._real_professional_ad_generation(persona_analysis, news_insights, age_range, interests, location)
+            results = await self._real_professional_ad_generation(persona_analysis, news_insights, age_range, interests, location, interest_ids, platforms)
         else:
-            return await self._mock_professional_ad_generation(persona_analysis, news_insights, age_range, interests, location)
+            results = await self._mock_professional_ad_generation(persona_analysis, news_insights, age_range, interests, location, interest_ids, platforms)
+        return self._add_quality_scores(results, persona_analysis)
+    
+    def _add_quality_scores(self, results: Dict[str, Dict[str, Any]], persona_analysis: Dict) -> Dict[str, Dict[str, Any]]:
+        """Score copies that did not go through best-of-N selection, so every path returns quality_score"""
+        
+        unscored = [platform for platform, ad_copy in results.items() if "quality_score" not in ad_copy]
+        if unscored:
+            keywords = persona_analysis.get("trending_keywords_analysis", {}).get("keywords", [])
+            primary_keywords = keywords[:5] if keywords else ["innovative", "quality"]
+            scores = ad_copy_scorer.score([results[platform] for platform in unscored], unscored, primary_keywords, self.platform_templates)
+            for platform, score in zip(unscored, scores.tolist()):
+                results[platform] = {**results[platform], "quality_score": score, "candidates": 1}
+        return results
+    
+    def _platform_cache_key(self, platform: str, age_range: str, location: str, interest_ids: List[str], primary_keywords: List[str]) -> Tuple:
+        # Rule reloads and generation settings change the copy, so they are part of the key
+        return (
+            knowledge_base.loads, self.generation_mode, self.candidates_per_platform, platform,
+            age_range, " ".join(location.lower().split()), tuple(sorted(interest_ids)), tuple(primary_keywords)
+        )
     
-    async def _real_professional_ad_generation(self, persona_analysis: Dict, news_insights: Dict, age_range: str, interests: List[str], location: str) -> Dict[str, Any]:
+    async def _real_professional_ad_generation(self, persona_analysis: Dict, news_insights: Dict, age_range: str, interests: List[str], location: str, interest_ids: List[str], platforms: List[str]) -> Dict[str, Any]:
         """Real professional ad copy generation using Emergent LLM"""
         try:
-            from emergentintegrations.llm.openai.text_generation import OpenAITextGeneration
-            
-            # Initialize LLM
-            text_gen = OpenAITextGeneration(api_key=api_config.emergent_llm_key)
-            
             # Get keywords and context
             keywords = persona_analysis.get("trending_keywords_analysis", {}).get("keywords", [])
             primary_keywords = keywords[:5] if keywords else ["innovative", "quality"]
             
-            # Create comprehensive prompts for each platform
+            cache_keys = {
+                platform: self._platform_cache_key(platform, age_range, location, interest_ids, primary_keywords)
+                for platform in platforms
+            }
             results = {}
+            for platform, cache_key in cache_keys.items():
+                cached = self.platform_copies.get(cache_key)
+                if cached is not None:
+                    results[platform] = dict(cached)
             
-            for platform in ["instagram", "linkedin", "tiktok"]:
-                prompt = self._create_professional_ad_prompt(
-                    platform, age_range, location, interests, primary_keywords, 
-                    persona_analysis, news_insights
-                )
-                
-                # Generate with LLM
-                response = await text_gen.generate_text(
-                    prompt=prompt,
-                    model="gpt-5",
-                    max_tokens=300,
-                    temperature=0.7
+            missing = [platform for platform in platforms if platform not in results]
+            if missing:
+                generated, fallbacks = await self._generate_platform_copies(
+                    missing, persona_analysis, news_insights, age_range, interests, location, primary_keywords
                 )
-                
-                # Parse structured response
-                results[platform] = self._parse_ad_copy_response(response, platform, primary_keywords)
+                for platform in missing:
+                    results[platform] = generated[platform]
+                    if platform not in fallbacks:
+                        self.platform_copies.put(cache_keys[platform], dict(generated[platform]))
             
-            return results
+            return {platform: results[platform] for platform in platforms}
             
         except Exception as e:
             logger.error(f"Real professional ad generation failed: {e}")
-            return await self._mock_professional_ad_generation(persona_analysis, news_insights, age_range, interests, location)
+            return await self._mock_professional_ad_generation(persona_analysis, news_insights, age_range, interests, location, interest_ids, platforms)
+    
+    async def _generate_platform_copies(self, platforms: List[str], persona_analysis: Dict, news_insights: Dict, age_range: str, interests: List[str], location: str, primary_keywords: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+        """Generate copy for the given platforms; returns the copies and the platforms that fell back"""
+        
+        if self.generation_mode == "combined":
+            # One completion for all platforms sends the shared persona/news context once
+            candidates = self.candidates_per_platform
+            prompt = self._create_multi_platform_ad_prompt(
+                platforms, age_range, location, interests, primary_keywords,
+                persona_analysis, news_insights, candidates
+            )
+            response = await llm_client.generate_text(
+                api_config.emergent_llm_key,
+                prompt,
+                base_url=api_config.llm_base_url,
+                stage="ad_copy:combined",
+                hedge=True,
+                model="gpt-5",
+                max_tokens=300 * len(platforms) * candidates,
+                temperature=0.7
+            )
+            return self._parse_multi_platform_response(response, platforms, primary_keywords)
+        
+        # The platform prompts are independent, so they run concurrently over the
+        # shared client and the stage costs about one LLM round trip; a failed
+        # platform falls back on its own without discarding the others
+        responses = await asyncio.gather(*(
+            llm_client.generate_text(
+                api_config.emergent_llm_key,
+                self._create_professional_ad_prompt(
+                    platform, age_range, location, interests, primary_keywords,
+                    persona_analysis, news_insights
+                ),
+                base_url=api_config.llm_base_url,
+                stage=f"ad_copy:{platform}",
+                hedge=True,
+                model="gpt-5",
+                max_tokens=300,
+                temperature=0.7
+            )
+            for platform in platforms
+        ), return_exceptions=True)
+        
+        # Parse structured responses
+        results, fallbacks = {}, []
+        for platform, response in zip(platforms, responses):
+            if isinstance(response, BaseException):
+                logger.error(f"Ad copy generation for {platform} failed: {response}")
+                ad_copy, fell_back = self._create_fallback_ad_copy(platform, primary_keywords), True
+            else:
+                ad_copy, fell_back = self._parse_ad_copy_response(response, platform, primary_keywords)
+            if fell_back:
+                self.parse_stats["platform_fallbacks"] += 1
+                fallbacks.append(platform)
+            results[platform] = ad_copy
+        return results, fallbacks
     
     def _create_professional_ad_prompt(self, platform: str, age_range: str, location: str, interests: List[str], keywords: List[str], persona_analysis: Dict, news_insights: Dict) -> str:
         """Create comprehensive prompt for professional ad copy generation"""
@@ -1042,60 +1310,203 @@ class AdCopyGenerator:
         
         return prompt.strip()
     
-    def _parse_ad_copy_response(self, response: str, platform: str, keywords: List[str]) -> Dict[str, Any]:
-        """Parse LLM response into structured ad copy format"""
+    def _create_multi_platform_ad_prompt(self, platforms: List[str], age_range: str, location: str, interests: List[str], keywords: List[str], persona_analysis: Dict, news_insights: Dict, candidates: int = 1) -> str:
+        """Create one prompt that asks for every platform's ad copy (N alternatives each) as JSON"""
+        
+        interests_str = ", ".join(interests[:3])
+        keywords_str = ", ".join(keywords[:5])
+        platform_lines = "\n".join(
+            f"        - {platform}: style {template['style']}; tone {template['tone']}; "
+            f"CTA such as {', '.join(template['cta_options'][:3])}"
+            + (f"; headline {template['headline_words'][0]}-{template['headline_words'][1]} words" if "headline_words" in template else "")
+            + (f"; body {template['body_words'][0]}-{template['body_words'][1]} words" if "body_words" in template else "")
+            for platform, template in ((platform, self.platform_templates[platform]) for platform in platforms)
+        )
+        ad_shape = {field: "..." for field in AD_COPY_FIELDS}
+        example = json.dumps({platform: [ad_shape] * min(candidates, 2) if candidates > 1 else ad_shape for platform in platforms[:1]})
+        value_description = (
+            f"Each value is an array of {candidates} distinct alternative ads; each ad is an object"
+            if candidates > 1 else "Each value is an object"
+        )
+        
+        prompt = f"""
+        You are a Senior Ad Copywriter with 15+ years of experience creating high-converting social media ads.
+        
+        Create complete, deployment-ready ad copy for each platform below, for:
+        - Target: {age_range} year-olds in {location}
+        - Interests: {interests_str}
+        - Keywords to incorporate: {keywords_str}
+        
+        Platforms:
+{platform_lines}
+        
+        Return ONLY a JSON object with one key per platform ({", ".join(platforms)}). {value_description} with these string fields:
+        - headline: a catchy, attention-grabbing title that incorporates the main keyword
+        - body: a compelling 2-3 sentence paragraph that speaks to the audience's pain points and desires
+        - keywords: 3-4 trending keywords from the list, comma separated
+        - cta: a clear, action-oriented call-to-action for the platform
+        - color_palette: 3-4 hex color codes with a brief psychology explanation
+        
+        Example shape: {example}
+        
+        Make each ad professional, persuasive, and matched to its platform's style and tone.
+        """
+        
+        return prompt.strip()
+    
+    def _parse_multi_platform_response(self, response: str, platforms: List[str], keywords: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+        """Parse a combined JSON response; platforms with missing or malformed copy fall back individually
+
+        Returns the copies and the platforms that fell back.
+        """
+        
+        self.parse_stats["combined_responses"] += 1
+        payload = self._extract_json_object(response or "")
+        if payload is None:
+            self.parse_stats["invalid_json"] += 1
+            logger.warning("Combined ad copy response was not valid JSON; using fallback copy")
+            payload = {}
+        
+        candidates_by_platform = {}
+        for platform in platforms:
+            section = payload.get(platform)
+            sections = section if isinstance(section, list) else [section]
+            valid = [ad_copy for ad_copy in map(self._validate_ad_copy, sections) if ad_copy is not None]
+            if valid:
+                candidates_by_platform[platform] = valid
+        
+        # Every platform's candidates are scored together; the best one per platform wins
+        best = ad_copy_scorer.best_per_platform(candidates_by_platform, keywords, self.platform_templates)
+        
+        results, fallbacks = {}, []
+        for platform in platforms:
+            ad_copy = best.get(platform)
+            if ad_copy is None:
+                self.parse_stats["platform_fallbacks"] += 1
+                logger.warning(f"Combined ad copy response has no valid {platform} section; using fallback copy")
+                ad_copy = self._create_fallback_ad_copy(platform, keywords)
+                fallbacks.append(platform)
+            results[platform] = ad_copy
+        return results, fallbacks
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the generation mode and combined-response parse statistics"""
+        return {"generation_mode": self.generation_mode, "candidates_per_platform": self.candidates_per_platform, **self.parse_stats}
+    
+    @staticmethod
+    def _extract_json_object(response: str) -> Optional[Dict[str, Any]]:
+        """Get the outermost JSON object in a response, tolerating code fences and surrounding prose"""
+        
+        start = response.find("{")
+        while start != -1:
+            try:
+                payload, _ = json.JSONDecoder().raw_decode(response, start)
+            except ValueError:
+                start = response.find("{", start + 1)
+                continue
+            if isinstance(payload, dict):
+                # Some models nest the platforms one level down
+                nested = payload.get("ads") or payload.get("ad_copy")
+                return nested if isinstance(nested, dict) else payload
+            start = response.find("{", start + 1)
+        return None
+    
+    @staticmethod
+    def _validate_ad_copy(section: Any) -> Optional[Dict[str, Any]]:
+        """Get a platform's ad copy with every field present as non-empty text, or None"""
+        
+        if not isinstance(section, dict):
+            return None
+        
+        ad_copy = {}
+        for field in AD_COPY_FIELDS:
+            value = section.get(field)
+            if isinstance(value, list):
+                value = ", ".join(str(item).strip() for item in value if str(item).strip())
+            if not isinstance(value, str) or not value.strip():
+                return None
+            ad_copy[field] = value.strip()
+        return ad_copy
+    
+    def _parse_ad_copy_response(self, response: str, platform: str, keywords: List[str]) -> Tuple[Dict[str, Any], bool]:
+        """Parse LLM response into structured ad copy format
+
+        Returns the copy and whether it fell back: the response could not be
+        parsed or left sections out, which were filled with defaults.
+        """
         
         try:
-            # Extract sections from response
-            sections = {}
-            current_section = None
-            current_content = []
-            
-            for line in response.split('\n'):
-                line = line.strip()
-                if line.startswith('HEADLINE:'):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content).strip()
-                    current_section = 'headline'
-                    current_content = [line.replace('HEADLINE:', '').strip()]
-                elif line.startswith('BODY:'):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content).strip()
-                    current_section = 'body'
-                    current_content = [line.replace('BODY:', '').strip()]
-                elif line.startswith('KEYWORDS:'):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content).strip()
-                    current_section = 'keywords'
-                    current_content = [line.replace('KEYWORDS:', '').strip()]
-                elif line.startswith('CTA:'):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content).strip()
-                    current_section = 'cta'
-                    current_content = [line.replace('CTA:', '').strip()]
-                elif line.startswith('COLOR_PALETTE:'):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content).strip()
-                    current_section = 'color_palette'
-                    current_content = [line.replace('COLOR_PALETTE:', '').strip()]
-                elif line and current_section:
-                    current_content.append(line)
-            
-            # Add the last section
-            if current_section and current_content:
-                sections[current_section] = '\n'.join(current_content).strip()
-            
-            return {
-                "headline": sections.get('headline', 'Transform Your Experience'),
-                "body": sections.get('body', 'Discover solutions designed for your needs.'),
-                "keywords": sections.get('keywords', ', '.join(keywords[:3])),
-                "cta": sections.get('cta', self.platform_templates[platform]['cta_options'][0]),
-                "color_palette": sections.get('color_palette', 'Professional blues and whites for trust and clarity')
-            }
+            # A complete response is a stream of one chunk
+            parser = AdCopyStreamParser()
+            parser.feed(response)
+            parser.close()
+            complete = all(parser.sections.get(field) for field in AD_COPY_FIELDS)
+            return self._ad_copy_from_sections(parser.sections, platform, keywords), not complete
             
         except Exception as e:
             logger.error(f"Error parsing ad copy response: {e}")
-            return self._create_fallback_ad_copy(platform, keywords)
+            return self._create_fallback_ad_copy(platform, keywords), True
+    
+    def _ad_copy_from_sections(self, sections: Dict[str, str], platform: str, keywords: List[str]) -> Dict[str, Any]:
+        """Fill sections the model left out with defaults"""
+        
+        return {
+            "headline": sections.get('headline', 'Transform Your Experience'),
+            "body": sections.get('body', 'Discover solutions designed for your needs.'),
+            "keywords": sections.get('keywords', ', '.join(keywords[:3])),
+            "cta": sections.get('cta', self.platform_templates[platform]['cta_options'][0]),
+            "color_palette": sections.get('color_palette', 'Professional blues and whites for trust and clarity')
+        }
+    
+    async def stream_professional_ad_copy(self, persona_analysis: Dict, news_insights: Dict, age_range: str, interests: List[str], location: str, interest_ids: Optional[List[str]] = None, platforms: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield ad copy sections per platform as they complete, then each platform's final copy"""
+        
+        if interest_ids is None:
+            interest_ids = interest_resolver.resolve_all(interests)
+        platforms = self.resolve_platforms(platforms)
+        
+        if not (api_config.use_real_apis and api_config.emergent_llm_key):
+            results = await self._mock_professional_ad_generation(persona_analysis, news_insights, age_range, interests, location, interest_ids, platforms)
+            for platform, ad_copy in self._add_quality_scores(results, persona_analysis).items():
+                for section in AD_COPY_FIELDS:
+                    yield {"platform": platform, "section": section, "content": ad_copy[section]}
+                yield {"platform": platform, "ad_copy": ad_copy}
+            return
+        
+        keywords = persona_analysis.get("trending_keywords_analysis", {}).get("keywords", [])
+        primary_keywords = keywords[:5] if keywords else ["innovative", "quality"]
+        events: asyncio.Queue = asyncio.Queue()
+        
+        async def stream_platform(platform: str):
+            parser = AdCopyStreamParser()
+            try:
+                prompt = self._create_professional_ad_prompt(
+                    platform, age_range, location, interests, primary_keywords,
+                    persona_analysis, news_insights
+                )
+                async for chunk in llm_client.stream_text(api_config.emergent_llm_key, prompt, base_url=api_config.llm_base_url, stage=f"ad_copy:{platform}", model="gpt-5", max_tokens=300, temperature=0.7):
+                    for section, content in parser.feed(chunk):
+                        await events.put({"platform": platform, "section": section, "content": content})
+                for section, content in parser.close():
+                    await events.put({"platform": platform, "section": section, "content": content})
+                ad_copy = self._ad_copy_from_sections(parser.sections, platform, primary_keywords)
+            except Exception as e:
+                logger.error(f"Streaming ad copy for {platform} failed: {e}")
+                ad_copy = self._create_fallback_ad_copy(platform, primary_keywords)
+            await events.put({"platform": platform, "ad_copy": self._add_quality_scores({platform: ad_copy}, persona_analysis)[platform]})
+        
+        # Platforms stream concurrently; events interleave in completion order
+        tasks = [asyncio.create_task(stream_platform(platform)) for platform in platforms]
+        try:
+            remaining = len(platforms)
+            while remaining:
+                event = await events.get()
+                if "ad_copy" in event:
+                    remaining -= 1
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
     
     def _create_fallback_ad_copy(self, platform: str, keywords: List[str]) -> Dict[str, Any]:
         """Create fallback professional ad copy"""
@@ -1111,7 +1522,7 @@ class AdCopyGenerator:
             "color_palette": "#2563EB, #1E40AF, #F8FAFC - Professional blues build trust while clean whites ensure readability and modern appeal"
         }
     
-    async def _mock_professional_ad_generation(self, persona_analysis: Dict, news_insights: Dict, age_range: str, interests: List[str], location: str) -> Dict[str, Any]:
+    async def _mock_professional_ad_generation(self, persona_analysis: Dict, news_insights: Dict, age_range: str, interests: List[str], location: str, interest_ids: List[str], platforms: Optional[List[str]] = None) -> Dict[str, Any]:
         """Mock professional ad copy generation with complete structure"""
         
         # Extract key elements
@@ -1121,11 +1532,11 @@ class AdCopyGenerator:
         
         # Select appropriate color psychology based on interests and demographics
         color_theme = "trust"
-        if any(interest.lower() in ["fitness", "health", "wellness"] for interest in interests):
+        if any(interest_id in ["fitness", "health", "wellness"] for interest_id in interest_ids):
             color_theme = "energy"
-        elif any(interest.lower() in ["luxury", "premium", "exclusive"] for interest in interests):
+        elif "luxury" in interest_ids:
             color_theme = "luxury"
-        elif any(interest.lower() in ["tech", "innovation", "startup"] for interest in interests):
+        elif any(interest_id in ["technology", "innovation", "startup"] for interest_id in interest_ids):
             color_theme = "innovation"
         elif age_range in ["18-24", "25-34"]:
             color_theme = "energy"
@@ -1162,7 +1573,43 @@ class AdCopyGenerator:
             "color_palette": f"{color_info['colors'][1]}, {color_info['colors'][0]}, #FF6B6B - {color_info['psychology']}"
         }
         
-        return results
+        # Facebook Ad Copy
+        results["facebook"] = {
+            "headline": f"{primary_keyword.title()} {primary_interest.title()} Made Simple for {location}",
+            "body": f"Your neighbors in {location} are already seeing the difference. Our {primary_keyword} approach to {primary_interest} is built for {age_range}-year-olds who want real results without the hassle. Join a community that has your back.",
+            "keywords": f"{primary_keyword}, {primary_interest}, community, trusted, local",
+            "cta": "Learn More",
+            "color_palette": f"{color_info['colors'][0]}, {color_info['colors'][1]}, #F0F2F5 - {color_info['psychology']}"
+        }
+        
+        # X Ad Copy
+        results["x"] = {
+            "headline": f"{primary_keyword.title()} {primary_interest.title()}, No Fluff",
+            "body": f"{age_range}-year-olds in {location} are switching to {primary_keyword} {primary_interest}. Here's why everyone is talking about it.",
+            "keywords": f"{primary_keyword}, {primary_interest}, trending, now",
+            "cta": "Learn More",
+            "color_palette": f"{color_info['colors'][0]}, #0F1419, #FFFFFF - {color_info['psychology']}"
+        }
+        
+        # YouTube Ad Copy
+        results["youtube"] = {
+            "headline": f"Watch: How {location} Is Rethinking {primary_interest.title()}",
+            "body": f"In the next 30 seconds, see how {age_range}-year-olds in {location} use our {primary_keyword} {primary_interest} approach to get results faster. Real people, real routines, and a method you can start today. Stick around for the before-and-after.",
+            "keywords": f"{primary_keyword}, {primary_interest}, how-to, results, watch",
+            "cta": "Watch Now",
+            "color_palette": f"{color_info['colors'][0]}, {color_info['colors'][2]}, #FF0000 - {color_info['psychology']}"
+        }
+        
+        # Email Ad Copy
+        results["email"] = {
+            "headline": f"Your {primary_keyword.title()} {primary_interest.title()} Upgrade Is Here",
+            "body": f"Hi there, we built something for {age_range}-year-olds in {location} who care about {primary_interest}. Our {primary_keyword} approach saves you time and delivers results you can measure from week one. Thousands of members already rely on it, and we would love for you to see why. Your exclusive offer is waiting below.",
+            "keywords": f"{primary_keyword}, {primary_interest}, exclusive, members, offer",
+            "cta": "Claim Your Offer",
+            "color_palette": f"{color_info['colors'][0]}, {color_info['colors'][1]}, #FFFFFF - {color_info['psychology']}"
+        }
+        
+        return {platform: results[platform] for platform in (platforms or DEFAULT_AD_PLATFORMS)}
 
 class MarketingIntelligenceCore:
     """Main marketing intelligence orchestrator"""
@@ -1175,25 +1622,34 @@ class MarketingIntelligenceCore:
         self.word_cloud_processor = WordCloudProcessor()
         self.behavioral_processor = BehavioralAnalysisProcessor()
     
-    async def generate_complete_intelligence(self, age_range: str, geographic_location: str, interests: List[str]) -> Dict[str, Any]:
+    async def generate_complete_intelligence(self, age_range: str, geographic_location: str, interests: List[str], platforms: Optional[List[str]] = None) -> Dict[str, Any]:
         """Generate complete marketing intelligence report"""
         
+        # Every LLM and image call below is accounted to this request's metadata
+        with usage_tracker.track_request():
+            return await self._generate_complete_intelligence(age_range, geographic_location, interests, platforms)
+    
+    async def _generate_complete_intelligence(self, age_range: str, geographic_location: str, interests: List[str], platforms: Optional[List[str]]) -> Dict[str, Any]:
         try:
+            # Canonicalize free-text interests and location once; every stage keys off the ids
+            interest_ids = interest_resolver.resolve_all(interests)
+            resolved_location = location_resolver.resolve(geographic_location)
+            
             # Step 1: Persona Research and Analysis
-            persona_analysis = self.persona_analyzer.analyze_persona(age_range, geographic_location, interests)
+            persona_analysis = self.persona_analyzer.analyze_persona(age_range, geographic_location, interests, interest_ids, resolved_location)
             
             # Step 2: News Feed & Insights
-            news_data = await self.news_service.search_recent_news(geographic_location, interests, age_range)
+            news_data = await self.news_service.search_recent_news(geographic_location, interests, age_range, interest_ids)
             
             # Step 3: Visual Persona Sketch
             trending_keywords = persona_analysis["trending_keywords_analysis"]["keywords"]
             persona_image_url = await self.image_service.generate_persona_image(
-                age_range, geographic_location, interests, trending_keywords
+                age_range, geographic_location, interests, trending_keywords, interest_ids, resolved_location
             )
             
             # Step 4: Professional Ad Copy Generation
             ad_copy_variations = await self.ad_generator.generate_professional_ad_copy(
-                persona_analysis, news_data, age_range, interests, geographic_location
+                persona_analysis, news_data, age_range, interests, geographic_location, interest_ids, platforms
             )
             
             # Step 5: Process data for advanced visualizations (Phase 3A)
@@ -1206,7 +1662,7 @@ class MarketingIntelligenceCore:
             
             # Generate behavioral analysis chart data
             behavioral_chart_data = self.behavioral_processor.generate_behavioral_chart_data(
-                age_range, interests, geographic_location
+                age_range, interests, geographic_location, interest_ids, resolved_location
             )
             
             # Generate demographic breakdown
@@ -1235,8 +1691,11 @@ class MarketingIntelligenceCore:
                     "persona_profile": {
                         "age_range": age_range,
                         "location": geographic_location,
-                        "interests": interests
+                        "interests": interests,
+                        "interest_ids": interest_ids,
+                        "location_ids": list(resolved_location.keys) if resolved_location else []
                     },
+                    "llm_usage": usage_tracker.request_summary(),
                     "data_version": "3A"  # Track data structure version
                 }
             }
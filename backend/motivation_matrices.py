@@ -0,0 +1,114 @@
+import numpy as np
+from typing import Dict, Any, List, Mapping, Optional, Sequence
+from persona_resolution import ResolvedLocation
+
+# Value an interest-only motivation starts from before its modifier is added
+INTEREST_BASE_VALUE = 60
+MAX_MOTIVATION_VALUE = 100
+
+class MotivationMatrices:
+    """Behavioral rule tables as dense matrices over one motivation vocabulary"""
+
+    def __init__(self, rules: Mapping[str, Any], default_age_range: str = "25-34"):
+        age_motivations = rules["age_group_motivations"]
+        interest_modifiers = rules["interest_modifiers"]
+        location_modifiers = rules["location_modifiers"]
+
+        # Age-group motivations first, so vocabulary order matches the per-persona path
+        self.vocabulary = list(dict.fromkeys(
+            motivation
+            for table in [*age_motivations.values(), *interest_modifiers.values(), *location_modifiers.values()]
+            for motivation in table
+        ))
+        columns = {motivation: column for column, motivation in enumerate(self.vocabulary)}
+        width = len(self.vocabulary)
+
+        self.age_rows = {age_range: row for row, age_range in enumerate(age_motivations)}
+        self.default_age_row = self.age_rows[default_age_range]
+        self.age_values = np.zeros((len(self.age_rows), width), dtype=np.int32)
+        self.age_present = np.zeros((len(self.age_rows), width), dtype=bool)
+        for age_range, motivations in age_motivations.items():
+            for motivation, value in motivations.items():
+                self.age_values[self.age_rows[age_range], columns[motivation]] = value
+                self.age_present[self.age_rows[age_range], columns[motivation]] = True
+
+        self.interest_rows = {interest_id: row for row, interest_id in enumerate(interest_modifiers)}
+        self.interest_values = np.zeros((len(self.interest_rows), width), dtype=np.int32)
+        for interest_id, modifiers in interest_modifiers.items():
+            for motivation, modifier in modifiers.items():
+                self.interest_values[self.interest_rows[interest_id], columns[motivation]] = modifier
+        self.interest_present = (self.interest_values != 0).astype(np.float32)
+        self.interest_values = self.interest_values.astype(np.float32)
+
+        self.location_rows = {place_id: row for row, place_id in enumerate(location_modifiers)}
+        self.location_defaults = np.zeros((len(self.location_rows), width), dtype=np.int32)
+        self.location_bonuses = np.zeros((len(self.location_rows), width), dtype=np.int32)
+        self.location_present = np.zeros((len(self.location_rows), width), dtype=bool)
+        for place_id, modifiers in location_modifiers.items():
+            for motivation, (default_value, bonus) in modifiers.items():
+                self.location_defaults[self.location_rows[place_id], columns[motivation]] = default_value
+                self.location_bonuses[self.location_rows[place_id], columns[motivation]] = bonus
+                self.location_present[self.location_rows[place_id], columns[motivation]] = True
+
+    def score(self, age_ranges: Sequence[str], interest_ids: Sequence[Sequence[str]], resolved_locations: Sequence[Optional[ResolvedLocation]]) -> np.ndarray:
+        """Get an (n personas x vocabulary) score matrix; -1 marks motivations a persona lacks"""
+        count = len(age_ranges)
+        age_rows = np.fromiter((self.age_rows.get(age_range, self.default_age_row) for age_range in age_ranges), dtype=np.intp, count=count)
+        values = self.age_values[age_rows]
+        present = self.age_present[age_rows]
+
+        # Interest modifiers only ever add, so clipping once at the end matches
+        # clipping after every addition
+        if self.interest_rows:
+            personas, rows = [], []
+            for persona, ids in enumerate(interest_ids):
+                for interest_id in set(ids):
+                    row = self.interest_rows.get(interest_id)
+                    if row is not None:
+                        personas.append(persona)
+                        rows.append(row)
+            # Float matmuls go through BLAS; every value involved is a small exact integer
+            hits = np.zeros((count, len(self.interest_rows)), dtype=np.float32)
+            hits[personas, rows] = 1.0
+            touched = (hits @ self.interest_present) > 0
+            values = np.where(present, values, INTEREST_BASE_VALUE) + (hits @ self.interest_values).astype(np.int32)
+            present = present | touched
+        values = np.minimum(values, MAX_MOTIVATION_VALUE)
+
+        location_rows = np.fromiter(
+            (location.lookup(self.location_rows, -1) if location else -1 for location in resolved_locations),
+            dtype=np.intp,
+            count=count
+        )
+        located = location_rows >= 0
+        if located.any():
+            rows = location_rows[located]
+            applies = self.location_present[rows]
+            base = np.where(present[located], values[located], self.location_defaults[rows])
+            boosted = np.minimum(base + self.location_bonuses[rows], MAX_MOTIVATION_VALUE)
+            values[located] = np.where(applies, boosted, values[located])
+            present[located] |= applies
+
+        return np.where(present, values, -1)
+
+    def top_motivations(self, scores: np.ndarray, limit: int = 6) -> List[List[Dict[str, Any]]]:
+        """Get each persona's highest motivations as chart rows"""
+        if scores.size == 0:
+            return [[] for _ in range(scores.shape[0])]
+
+        limit = min(limit, scores.shape[1])
+        top_columns = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+        top_scores = np.take_along_axis(scores, top_columns, axis=1)
+        # Highest value first; ties keep vocabulary order
+        order = np.lexsort((top_columns, -top_scores), axis=1)
+        top_columns = np.take_along_axis(top_columns, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        return [
+            [
+                {"label": self.vocabulary[column], "value": value}
+                for column, value in zip(columns, values)
+                if value >= 0
+            ]
+            for columns, values in zip(top_columns.tolist(), top_scores.tolist())
+        ]
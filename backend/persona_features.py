@@ -0,0 +1,148 @@
+import re
+import logging
+from typing import Dict, List, NamedTuple, Optional, FrozenSet, Tuple
+from caching import LRUCache
+from persona_resolution import interest_resolver, location_resolver, ResolvedLocation
+
+logger = logging.getLogger(__name__)
+
+# Feature tags and the persona phrases that set them. Phrases are matched as
+# whole words (optional plural "s"), with hyphens and spaces interchangeable.
+PERSONA_FEATURE_TERMS = {
+    "age:gen_z": ["gen z", "genz", "gen zer", "zoomer"],
+    "age:millennial": ["millennial"],
+    "age:gen_x": ["gen x", "gen xer"],
+    "age:baby_boomer": ["baby boomer", "boomer"],
+    "age:senior": ["senior", "mature", "retiree"],
+    "age:teenager": ["teenager", "teen"],
+    "age:young_adult": ["young adult", "young"],
+
+    "lifestyle:startup": ["startup", "start up"],
+    "lifestyle:small_business": ["small business", "smb"],
+    "lifestyle:corporate": ["corporate"],
+    "lifestyle:enterprise": ["enterprise"],
+    "lifestyle:entrepreneur": ["entrepreneur"],
+    "lifestyle:freelancer": ["freelancer", "freelance"],
+    "lifestyle:professional": ["professional"],
+    "lifestyle:executive": ["executive"],
+
+    "tech:savvy": ["tech savvy", "techsavvy"],
+    "tech:hesitant": ["tech hesitant", "techhesitant"],
+    "tech:mobile_first": ["mobile first", "mobilefirst"],
+    "tech:digital_native": ["digital native", "digitalnative"],
+
+    "industry:tech": ["tech", "technology", "innovation"],
+    "industry:health": ["healthcare", "medical"],
+    "industry:finance": ["finance", "financial", "banking", "investment"],
+    "industry:creative": ["creative", "design", "designer", "art", "artist"],
+    "industry:education": ["education", "learning"],
+
+    "style:luxury": ["luxury", "premium", "high end"],
+    "style:eco": ["eco", "eco friendly", "sustainable", "green", "environmental"],
+    "trait:wellness": ["wellness"],
+    "trait:busy": ["busy", "time constrained"],
+    "trait:efficient": ["efficient"],
+    "trait:thorough": ["careful", "thorough", "research"],
+    "trait:quality_focused": ["quality focused", "premium"],
+    "trait:budget_conscious": ["budget conscious", "cost effective"],
+
+    "motivation:growth": ["growth", "scale", "scaling", "expand"],
+    "motivation:cost": ["cost", "budget", "affordable", "budget conscious", "cost effective"],
+    "motivation:quality": ["quality", "premium", "reliable", "quality focused"],
+    "motivation:innovation": ["innovation", "cutting edge", "latest"]
+}
+
+PRODUCT_FEATURE_TERMS = {
+    "product:software": ["saas", "software", "app", "application", "platform", "tool"],
+    "product:service": ["service", "consulting", "support"],
+    "product:physical": ["product", "physical", "retail"]
+}
+
+# Single-valued features, resolved by the first matching tag in priority order
+AGE_COHORT_PRIORITY = [
+    ("gen_z", ["age:gen_z"]),
+    ("millennial", ["age:millennial"]),
+    ("gen_x", ["age:gen_x"]),
+    ("baby_boomer", ["age:baby_boomer", "age:senior"]),
+    ("teenager", ["age:teenager"]),
+    ("young_adult", ["age:young_adult"])
+]
+LIFESTYLE_PRIORITY = ["startup", "small_business", "corporate", "entrepreneur", "freelancer", "professional"]
+TECH_LEVEL_PRIORITY = ["savvy", "hesitant", "mobile_first", "digital_native"]
+INDUSTRY_PRIORITY = ["tech", "health", "finance", "creative", "education"]
+PRODUCT_KIND_PRIORITY = ["software", "service", "physical"]
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().replace('-', ' ').replace('_', ' ').split())
+
+class PersonaPhraseMatcher:
+    """One compiled pass that maps text to the feature tags of the phrases it contains"""
+
+    def __init__(self, feature_terms: Dict[str, List[str]]):
+        self.term_tags: Dict[str, FrozenSet[str]] = {}
+        for tag, terms in feature_terms.items():
+            for term in terms:
+                normalized = _normalize(term)
+                self.term_tags[normalized] = self.term_tags.get(normalized, frozenset()) | {tag}
+
+        # Longest phrases first so "young adult" wins over "young"
+        alternation = "|".join(re.escape(term) for term in sorted(self.term_tags, key=len, reverse=True))
+        self._pattern = re.compile(rf"(?<![a-z0-9])({alternation})s?(?![a-z0-9])")
+
+    def match(self, text: str) -> FrozenSet[str]:
+        """Get the feature tags mentioned in text"""
+        tags = set()
+        for term in self._pattern.findall(_normalize(text)):
+            tags |= self.term_tags[term]
+        return frozenset(tags)
+
+class PersonaFeatures(NamedTuple):
+    """Features of an analysis request, extracted once and shared by every generator"""
+    tags: FrozenSet[str]
+    age_cohort: Optional[str]
+    lifestyle: Optional[str]
+    tech_level: Optional[str]
+    industry: Optional[str]
+    product_kind: Optional[str]
+    location: Optional[ResolvedLocation]
+    interest_ids: Tuple[str, ...]
+
+    def has(self, *tags: str) -> bool:
+        """Check whether any of the given tags was matched"""
+        return any(tag in self.tags for tag in tags)
+
+def _first(tags: FrozenSet[str], prefix: str, priority: List[str]) -> Optional[str]:
+    return next((value for value in priority if f"{prefix}:{value}" in tags), None)
+
+class PersonaFeatureExtractor:
+    """Extract persona, product, region and interest features in a single pass"""
+
+    def __init__(self, cache_size: int = 1024):
+        self.persona_matcher = PersonaPhraseMatcher(PERSONA_FEATURE_TERMS)
+        self.product_matcher = PersonaPhraseMatcher(PRODUCT_FEATURE_TERMS)
+        self._cache = LRUCache("persona_features", max_size=cache_size)
+
+    def extract(self, persona: str, product_description: str = "", geographic_location: Optional[str] = None, interests: Optional[str] = None) -> PersonaFeatures:
+        """Get the feature set for one analysis request"""
+        cache_key = (persona, product_description, geographic_location, interests)
+        features = self._cache.get(cache_key)
+        if features is None:
+            features = self._extract(persona, product_description, geographic_location, interests)
+            self._cache.put(cache_key, features)
+        return features
+
+    def _extract(self, persona: str, product_description: str, geographic_location: Optional[str], interests: Optional[str]) -> PersonaFeatures:
+        tags = self.persona_matcher.match(persona) | self.product_matcher.match(product_description or "")
+        return PersonaFeatures(
+            tags=tags,
+            age_cohort=next((cohort for cohort, cohort_tags in AGE_COHORT_PRIORITY if any(tag in tags for tag in cohort_tags)), None),
+            lifestyle=_first(tags, "lifestyle", LIFESTYLE_PRIORITY),
+            tech_level=_first(tags, "tech", TECH_LEVEL_PRIORITY),
+            industry=_first(tags, "industry", INDUSTRY_PRIORITY),
+            product_kind=_first(tags, "product", PRODUCT_KIND_PRIORITY),
+            location=location_resolver.resolve(geographic_location) if geographic_location else None,
+            interest_ids=tuple(interest_resolver.resolve_text(interests))
+        )
+
+# Global extractor, compiled once at import
+persona_feature_extractor = PersonaFeatureExtractor()
@@ -0,0 +1,267 @@
+import re
+import logging
+import unicodedata
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+from caching import LRUCache
+from geographical_service import geo_service, GeographicalIndexService
+
+logger = logging.getLogger(__name__)
+
+# Canonical interest ids and the free-text phrases that map to them
+INTEREST_TAXONOMY = {
+    "technology": ["technology", "technologies", "tech", "ai", "artificial intelligence", "machine learning", "digital", "software", "gadget", "computing", "coding", "programming", "data science"],
+    "innovation": ["innovation", "innovative", "emerging tech"],
+    "startup": ["startup", "start-up", "entrepreneur", "entrepreneurship", "founder"],
+    "business": ["business", "business strategy", "strategy", "management", "leadership", "corporate", "b2b"],
+    "marketing": ["marketing", "advertising", "branding"],
+    "finance": ["finance", "investing", "investment", "banking", "fintech", "personal finance", "stock", "crypto"],
+    "fitness": ["fitness", "gym", "workout", "exercise", "running", "athletic"],
+    "health": ["health", "healthcare", "healthy living", "nutrition", "medical"],
+    "wellness": ["wellness", "wellbeing", "well-being", "mindfulness", "meditation", "yoga", "self-care"],
+    "sustainability": ["sustainability", "sustainable", "sustainable living", "eco", "eco-friendly", "environment", "environmental", "green living", "climate"],
+    "travel": ["travel", "traveling", "travelling", "tourism", "adventure", "backpacking"],
+    "food": ["food", "foodie", "dining", "restaurant", "gastronomy"],
+    "cooking": ["cooking", "baking", "culinary", "recipe", "home cooking"],
+    "art": ["art", "arts", "painting", "design", "creative", "creativity", "drawing"],
+    "music": ["music", "concert", "musician"],
+    "fashion": ["fashion", "style", "clothing", "apparel", "streetwear"],
+    "reading": ["reading", "book", "literature"],
+    "gaming": ["gaming", "game", "video game", "esports", "gamer"],
+    "luxury": ["luxury", "premium", "exclusive", "high-end"],
+    "social_media": ["social media", "influencer", "content creation"],
+    "photography": ["photography"],
+    "family": ["family", "parenting"],
+    "community": ["community", "volunteering"],
+    "lifestyle": ["lifestyle"]
+}
+
+class InterestResolver:
+    """Map free-text interests to canonical interest ids"""
+
+    def __init__(self, taxonomy: Dict[str, List[str]] = INTEREST_TAXONOMY, cache_size: int = 2048):
+        self.synonym_to_id: Dict[str, str] = {}
+        for interest_id, synonyms in taxonomy.items():
+            for synonym in [interest_id.replace('_', ' ')] + synonyms:
+                self.synonym_to_id.setdefault(synonym.lower(), interest_id)
+
+        # One alternation over every synonym, longest first so phrases win,
+        # matched on word boundaries with an optional plural "s"
+        alternation = "|".join(re.escape(synonym) for synonym in sorted(self.synonym_to_id, key=len, reverse=True))
+        self._pattern = re.compile(rf"(?<![a-z0-9])({alternation})s?(?![a-z0-9])")
+        self._sorted_synonyms = sorted(self.synonym_to_id)
+        self._cache = LRUCache("interest_resolution", max_size=cache_size)
+
+    def resolve(self, interest: str) -> Tuple[str, ...]:
+        """Get the canonical ids mentioned by one free-text interest"""
+        normalized = " ".join(interest.lower().replace('_', ' ').split())
+        interest_ids = self._cache.get(normalized)
+        if interest_ids is None:
+            interest_ids = self._match(normalized)
+            self._cache.put(normalized, interest_ids)
+        return interest_ids
+
+    def _match(self, normalized: str) -> Tuple[str, ...]:
+        matches = [self.synonym_to_id[synonym] for synonym in self._pattern.findall(normalized)]
+        if not matches and len(normalized) >= 3:
+            # Abbreviations such as "fit" or "photo" still resolve by prefix
+            prefix_match = next((synonym for synonym in self._sorted_synonyms if synonym.startswith(normalized)), None)
+            if prefix_match:
+                matches = [self.synonym_to_id[prefix_match]]
+        return tuple(dict.fromkeys(matches))
+
+    def resolve_all(self, interests: List[str]) -> List[str]:
+        """Get the ordered, de-duplicated canonical ids for a list of interests"""
+        return list(dict.fromkeys(interest_id for interest in interests for interest_id in self.resolve(interest)))
+
+    def resolve_text(self, interests: Optional[str]) -> List[str]:
+        """Get canonical ids for a comma-separated interests string"""
+        if not interests:
+            return []
+        return self.resolve_all([interest for interest in interests.split(',') if interest.strip()])
+
+# Global resolver shared by every pipeline stage
+interest_resolver = InterestResolver()
+
+# Informal place names mapped to a name the geographical index knows
+LOCATION_ALIASES = {
+    "nyc": "new york city",
+    "new york": "new york city",
+    "manhattan": "new york city",
+    "brooklyn": "new york city",
+    "sf": "san francisco",
+    "bay area": "san francisco",
+    "silicon valley": "san francisco",
+    "la": "los angeles",
+    "dallas": "texas",
+    "houston": "texas",
+    "uk": "united kingdom",
+    "britain": "united kingdom",
+    "great britain": "united kingdom",
+    "england": "united kingdom",
+    "scotland": "united kingdom",
+    "wales": "united kingdom",
+    "us": "united states",
+    "usa": "united states",
+    "u.s.": "united states",
+    "america": "united states",
+    "united states of america": "united states",
+    "uae": "united arab emirates",
+    "sao paulo": "são paulo",
+    # Longer than the bare state name "washington", so these match first
+    "washington dc": "district of columbia",
+    "washington d.c.": "district of columbia",
+    "washington, dc": "district of columbia",
+    "washington, d.c.": "district of columbia",
+    "d.c.": "district of columbia"
+}
+
+# State and province names for the state codes used by the geographical index
+STATE_NAMES = {
+    "United States": {"NY": "new york state", "CA": "california", "IL": "illinois", "TX": "texas", "FL": "florida", "WA": "washington", "MA": "massachusetts", "CO": "colorado", "GA": "georgia", "DC": "district of columbia"},
+    "Canada": {"ON": "ontario", "BC": "british columbia", "QC": "quebec", "AB": "alberta"},
+    "Australia": {"NSW": "new south wales", "VIC": "victoria", "QLD": "queensland", "WA": "western australia"}
+}
+
+def _slug(name: str) -> str:
+    folded = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', folded.lower()).strip('-')
+
+class ResolvedLocation(NamedTuple):
+    """Canonical place for a free-text geographic location"""
+    display: str
+    city: Optional[str]
+    state: Optional[str]
+    country: Optional[str]
+    region: Optional[str]
+    keys: Tuple[str, ...]  # Place ids, most specific first
+
+    def lookup(self, table: Dict[str, Any], default: Any = None) -> Any:
+        """Get the most specific entry of a table keyed by place ids"""
+        return next((table[key] for key in self.keys if key in table), default)
+
+class LocationResolver:
+    """Resolve free-text locations to canonical places using the geographical index"""
+
+    def __init__(self, geo_index: GeographicalIndexService = geo_service, cache_size: int = 2048):
+        self.geo_index = geo_index
+        data = geo_index.geographical_data or {}
+        self._countries = {country["name"]: country for country in data.get("countries", [])}
+        self._regions = {region["name"] for region in data.get("regions", [])}
+
+        # name -> (kind, payload); longer names win in the compiled pattern
+        self._names: Dict[str, Tuple[str, Any]] = {}
+        for region in self._regions:
+            self._names[region.lower()] = ("region", region)
+        for country_name in self._countries:
+            self._names[country_name.lower()] = ("country", country_name)
+        for country_name, states in STATE_NAMES.items():
+            for code, state_name in states.items():
+                self._names.setdefault(state_name, ("state", (country_name, code)))
+        for city in data.get("cities", []):
+            self._names[city["name"].lower()] = ("city", city)
+            self._names.setdefault(_slug(city["name"]).replace('-', ' '), ("city", city))
+        for alias, target in LOCATION_ALIASES.items():
+            if target in self._names:
+                self._names.setdefault(alias, self._names[target])
+
+        # Bare state codes ("NY", "ON") only count as a whole comma-separated part
+        self._state_codes: Dict[str, List[Tuple[str, str]]] = {}
+        for country_name, states in STATE_NAMES.items():
+            for code in states:
+                self._state_codes.setdefault(code.lower(), []).append((country_name, code))
+
+        alternation = "|".join(re.escape(name) for name in sorted(self._names, key=len, reverse=True))
+        self._pattern = re.compile(rf"(?<![\w])({alternation})(?![\w])")
+        self._cache = LRUCache("location_resolution", max_size=cache_size)
+
+    def resolve(self, location: Optional[str]) -> Optional[ResolvedLocation]:
+        """Get the canonical place for a location string (None if unknown)"""
+        normalized = " ".join((location or "").lower().split())
+        if not normalized:
+            return None
+
+        place = self._cache.get(normalized, False)
+        if place is False:
+            place = self._resolve(normalized)
+            self._cache.put(normalized, place)
+        return place
+
+    def _resolve(self, normalized: str) -> Optional[ResolvedLocation]:
+        city = state = country = region = None
+
+        for name in self._pattern.findall(normalized):
+            kind, payload = self._names[name]
+            if kind == "city" and city is None:
+                city = payload
+            elif kind == "state" and state is None:
+                state = payload
+            elif kind == "country" and country is None:
+                country = payload
+            elif kind == "region" and region is None:
+                region = payload
+
+        if region and not (city or state or country):
+            return self._build(region=region)
+
+        if state is None:
+            for part in normalized.split(','):
+                candidates = self._state_codes.get(part.strip(), [])
+                if candidates:
+                    # Prefer the state of an already matched country (WA: US vs Australia)
+                    known_country = city["country"] if city else country
+                    state = next((candidate for candidate in candidates if candidate[0] == known_country), candidates[0])
+                    break
+
+        if not (city or state or country):
+            # Partial input such as "san fran" falls back to index search
+            matches = self.geo_index.search_locations(normalized, limit=1)
+            if not matches or matches[0]["match_score"] < 75:
+                return None
+            match = matches[0]
+            if match["type"] == "city":
+                city = next(item for item in self.geo_index.geographical_data["cities"] if item["display"] == match["display"])
+            elif match["type"] == "country":
+                country = match["name"]
+            else:
+                return self._build(region=match["name"])
+
+        return self._build(city=city, state=state, country=country)
+
+    def _build(self, city: Optional[Dict[str, Any]] = None, state: Optional[Tuple[str, str]] = None, country: Optional[str] = None, region: Optional[str] = None) -> ResolvedLocation:
+        if city:
+            country = city["country"]
+            if city["state"]:
+                state = (country, city["state"])
+        if state and not country:
+            country = state[0]
+        if country and not region:
+            region = self._countries.get(country, {}).get("region")
+
+        keys = []
+        if city:
+            keys.append(f"city:{_slug(city['name'])}")
+        if state:
+            keys.append(f"state:{_slug(state[0])}:{state[1].lower()}")
+        if country:
+            keys.append(f"country:{_slug(country)}")
+        if region:
+            keys.append(f"region:{_slug(region)}")
+
+        if city:
+            display = city["display"]
+        elif state:
+            display = f"{STATE_NAMES[state[0]][state[1]].replace(' state', '').title()}, {state[0]}"
+        else:
+            display = country or region
+
+        return ResolvedLocation(
+            display=display,
+            city=city["name"] if city else None,
+            state=state[1] if state else None,
+            country=country,
+            region=region,
+            keys=tuple(keys)
+        )
+
+# Global resolver shared by every pipeline stage
+location_resolver = LocationResolver()
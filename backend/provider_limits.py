@@ -0,0 +1,158 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Any, AsyncIterator, Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+def is_overload(error: BaseException) -> bool:
+    """Check whether a provider error means it is throttling or overloaded (429, 5xx, timeout)"""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException)):
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "too many requests" in message
+
+class LimiterCall:
+    """Handle for one admitted call; lets callers report overloads that are not exceptions"""
+    __slots__ = ("overloaded",)
+
+    def __init__(self):
+        self.overloaded = False
+
+    def mark_overloaded(self):
+        self.overloaded = True
+
+class AIMDLimiter:
+    """Concurrency limit that grows additively while a provider is healthy and shrinks multiplicatively when it is not"""
+
+    def __init__(self, name: str, initial_limit: int = 8, min_limit: int = 1, max_limit: int = 64,
+                 overload_factor: float = 0.5, latency_factor: float = 0.9, latency_tolerance: float = 2.0):
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        # 429/5xx halve the limit; latencies past tolerance x baseline trim it more gently
+        self.overload_factor = overload_factor
+        self.latency_factor = latency_factor
+        self.latency_tolerance = latency_tolerance
+        self.latency_baseline: Optional[float] = None
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        self.stats = {"calls": 0, "successes": 0, "overloads": 0, "slow_calls": 0, "increases": 0, "decreases": 0, "queued": 0, "max_queue_depth": 0}
+
+    async def acquire(self):
+        """Wait for a free slot; FIFO once calls are queued"""
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self._waiters))
+        try:
+            # The releasing call hands its slot over by resolving the future
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            elif waiter in self._waiters:
+                # A release may already have popped and skipped the cancelled future
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self):
+        """Free a slot and admit queued calls up to the current limit"""
+        self.in_flight -= 1
+        self._admit_waiters()
+
+    def _admit_waiters(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _decrease(self, factor: float):
+        # One decrease per baseline round trip, so a burst of failures from the
+        # same window does not collapse the limit
+        now = time.monotonic()
+        if now - self._last_decrease < max(self.latency_baseline or 0.0, 0.5):
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * factor)
+        self.stats["decreases"] += 1
+
+    def record(self, latency: float, overloaded: bool):
+        """Adapt the limit to one finished call"""
+        if overloaded:
+            self.stats["overloads"] += 1
+            self._decrease(self.overload_factor)
+            return
+
+        self.stats["successes"] += 1
+        slow = self.latency_baseline is not None and latency > self.latency_tolerance * self.latency_baseline
+        self.latency_baseline = latency if self.latency_baseline is None else 0.95 * self.latency_baseline + 0.05 * latency
+        if slow:
+            self.stats["slow_calls"] += 1
+            self._decrease(self.latency_factor)
+        elif self.in_flight + 1 >= int(self.limit) and self.limit < self.max_limit:
+            # Only grow while the limit is actually the constraint
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self.stats["increases"] += 1
+            self._admit_waiters()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[LimiterCall]:
+        """Run one provider call under the limit and feed its outcome back"""
+        await self.acquire()
+        self.stats["calls"] += 1
+        call = LimiterCall()
+        started = time.perf_counter()
+        try:
+            yield call
+        except Exception as e:
+            self.release()
+            if is_overload(e):
+                self.record(time.perf_counter() - started, overloaded=True)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        else:
+            self.release()
+            self.record(time.perf_counter() - started, overloaded=call.overloaded)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the current limit, load and adaptation counters"""
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "latency_baseline_ms": round(self.latency_baseline * 1000, 1) if self.latency_baseline is not None else None,
+            **self.stats
+        }
+
+def _limiter(name: str, initial_limit: int, max_limit: int) -> AIMDLimiter:
+    prefix = f"{name.upper()}_CONCURRENCY"
+    return AIMDLimiter(
+        name,
+        initial_limit=int(os.environ.get(f"{prefix}_INITIAL", str(initial_limit))),
+        max_limit=int(os.environ.get(f"{prefix}_MAX", str(max_limit)))
+    )
+
+# Global per-provider limiters for outbound calls
+provider_limiters = {
+    "llm": _limiter("llm", 16, 64),
+    "image": _limiter("image", 4, 16),
+    "news": _limiter("news", 8, 32)
+}
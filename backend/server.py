@@ -11,6 +11,14 @@ import uuid
 from datetime import datetime, timezone
 import re
 import random
+import hashlib
+from caching import LRUCache
+from image_store import image_store
+from llm_client import llm_client
+from db_migrations import schema_migrator
+from history_search import history_search_tokens, history_search_filter
+import asyncio
+from persona_features import persona_feature_extractor, PersonaFeatures
 
 
 ROOT_DIR = Path(__file__).parent
@@ -130,110 +138,143 @@ class PerformanceAnalysisResponse(BaseModel):
     next_steps: List[str]
 
 
+# Regional rules keyed by resolved place ids, most specific match wins
+REGIONAL_BEHAVIOR_INSIGHTS = {
+    "country:united-kingdom": "UK market values understated confidence, quality craftsmanship, and subtle premium positioning. Prefers polite, professional tone with heritage references. ",
+    "state:united-states:ny": "NYC market values speed, efficiency, and bold innovation. Responds to direct, confident messaging with competitive advantages. Fast-paced decision making. ",
+    "state:united-states:ca": "California tech market values innovation, sustainability, and forward-thinking solutions. Prefers authentic, purpose-driven messaging with social impact. ",
+    "state:united-states:tx": "Texas market values practicality, value, and straightforward communication. Prefers results-focused messaging with clear ROI and no-nonsense approach. ",
+    "country:germany": "German market values precision, quality, and thorough documentation. Prefers detailed, fact-based messaging with engineering excellence and reliability focus. ",
+    "country:japan": "Japanese market values respect, quality, and continuous improvement. Prefers polite, service-oriented messaging with attention to detail and customer care. ",
+    "country:australia": "Australian market values authenticity, fairness, and practical solutions. Prefers friendly, direct messaging without pretension or excessive formality. "
+}
+
+REGIONAL_COLORS = {
+    "country:united-kingdom": ColorInfo(hex_code="#1B365D", color_name="British Navy", psychological_effect="Traditional and trustworthy, appeals to British preference for understated elegance"),
+    "country:japan": ColorInfo(hex_code="#C41E3A", color_name="Japanese Red", psychological_effect="Respectful yet vibrant, aligns with Japanese aesthetic preferences"),
+    "country:germany": ColorInfo(hex_code="#000000", color_name="German Black", psychological_effect="Precise and professional, appeals to German preference for functionality")
+}
+
+REGIONAL_TRENDING_WORDS = {
+    "country:united-kingdom": ["bespoke", "heritage", "traditional", "quality-assured", "british-made", "established"],
+    "state:united-states:ny": ["fast-paced", "cutting-edge", "metropolitan", "premium", "exclusive", "competitive"],
+    "state:united-states:ca": ["innovative", "disruptive", "sustainable", "forward-thinking", "conscious", "progressive"],
+    "country:germany": ["engineered", "precision-built", "systematic", "reliable", "methodical", "quality-tested"],
+    "country:japan": ["refined", "meticulous", "harmonious", "respectful", "continuous-improvement", "quality-focused"]
+}
+
+# Behavioral rules keyed by extracted persona features (see persona_features)
+AGE_COHORT_BEHAVIORS = {
+    'gen_z': "Highly digital-native, values authenticity and social responsibility, prefers visual content over text, influenced by peer recommendations and social proof.",
+    'millennial': "Tech-savvy but values work-life balance, prefers experiences over possessions, responsive to personalized content, values transparency and brand authenticity.",
+    'gen_x': "Pragmatic decision-makers, values quality and reliability, responds to direct benefits and ROI, prefers detailed information before purchasing.",
+    'baby_boomer': "Values traditional customer service, prefers phone/email communication, motivated by security and stability, appreciates loyalty programs.",
+    'teenager': "Highly influenced by social media trends, values peer approval, prefers mobile-first experiences, responds to gamification and instant gratification.",
+    'young_adult': "Career-focused, budget-conscious, values convenience and efficiency, influenced by online reviews and social proof."
+}
+
+LIFESTYLE_BEHAVIORS = {
+    'startup': "Risk-tolerant, values innovation and efficiency, prefers scalable solutions, motivated by growth potential and competitive advantage.",
+    'small_business': "Cost-conscious, values practical solutions, prefers proven results, needs easy implementation and reliable support.",
+    'corporate': "Process-oriented, values compliance and security, prefers established vendors, motivated by ROI and risk mitigation.",
+    'entrepreneur': "Self-motivated, values flexibility and control, prefers customizable solutions, motivated by productivity gains.",
+    'freelancer': "Budget-sensitive, values time-saving tools, prefers simple interfaces, motivated by efficiency and client satisfaction.",
+    'professional': "Career-focused, values reputation and results, prefers high-quality solutions, motivated by professional advancement."
+}
+
+TECH_LEVEL_BEHAVIORS = {
+    'savvy': "Early adopters, comfortable with complex features, values innovation and cutting-edge solutions, prefers self-service options.",
+    'hesitant': "Prefers simple, intuitive interfaces, values human support, needs clear instructions, motivated by proven reliability.",
+    'mobile_first': "Expects seamless mobile experience, values speed and convenience, prefers app-based solutions, motivated by accessibility.",
+    'digital_native': "Expects instant results, values integration capabilities, prefers cloud-based solutions, motivated by efficiency gains."
+}
+
+INTEREST_BEHAVIORS = {
+    'sustainability': "Environmentally conscious, values long-term thinking, influenced by social responsibility messaging, prefers brands with clear sustainability practices.",
+    'fitness': "Health-focused, goal-oriented, values performance metrics and results, responsive to achievement-based messaging and progress tracking.",
+    'technology': "Early adopter, values innovation and efficiency, comfortable with technical details, influenced by cutting-edge features and future-forward messaging.",
+    'travel': "Experience-focused, values freedom and flexibility, influenced by lifestyle messaging, responsive to adventure and discovery themes.",
+    'cooking': "Detail-oriented, values quality ingredients and processes, appreciates craftsmanship, responsive to artisanal and premium positioning.",
+    'art': "Creative and expressive, values authenticity and uniqueness, influenced by aesthetic appeal, responsive to customization and personal expression.",
+    'music': "Emotionally driven, values authentic expression, influenced by brand personality and tone, responsive to community and cultural messaging.",
+    'reading': "Intellectually curious, values depth and expertise, influenced by authoritative content, responsive to educational and thought leadership messaging.",
+    'gaming': "Achievement-oriented, values engagement and progression, influenced by interactive experiences, responsive to gamification and competitive elements."
+}
+
+# Repeated analysis requests (the campaign generator re-requests on every edit)
+analysis_cache = LRUCache(
+    "generate_analysis",
+    max_size=int(os.environ.get("ANALYSIS_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.environ.get("ANALYSIS_CACHE_TTL_SECONDS", "3600"))
+)
+
+def normalize_analysis_text(text: Optional[str]) -> str:
+    """Lower-case and collapse whitespace so equivalent inputs share seeds and cache entries"""
+    return " ".join((text or "").lower().split())
+
+def analysis_seed(*parts: Optional[str]) -> int:
+    """Stable random seed derived from normalized inputs"""
+    digest = hashlib.sha256("\0".join(normalize_analysis_text(part) for part in parts).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
 # Advanced Analysis Logic Functions
-def analyze_persona_behavior(persona: str, product_description: str, geographic_location: Optional[str] = None, interests: Optional[str] = None) -> str:
+def analyze_persona_behavior(persona: str, product_description: str, geographic_location: Optional[str] = None, interests: Optional[str] = None, features: Optional[PersonaFeatures] = None) -> str:
     """Generate behavioral analysis based on marketing psychology"""
     
     # Extract key demographic and psychographic indicators
-    persona_lower = persona.lower()
-    
-    # Age group analysis
-    age_indicators = {
-        'gen z': "Highly digital-native, values authenticity and social responsibility, prefers visual content over text, influenced by peer recommendations and social proof.",
-        'millennials': "Tech-savvy but values work-life balance, prefers experiences over possessions, responsive to personalized content, values transparency and brand authenticity.",
-        'gen x': "Pragmatic decision-makers, values quality and reliability, responds to direct benefits and ROI, prefers detailed information before purchasing.",
-        'baby boomers': "Values traditional customer service, prefers phone/email communication, motivated by security and stability, appreciates loyalty programs.",
-        'teenagers': "Highly influenced by social media trends, values peer approval, prefers mobile-first experiences, responds to gamification and instant gratification.",
-        'young adults': "Career-focused, budget-conscious, values convenience and efficiency, influenced by online reviews and social proof."
-    }
-    
-    # Professional/lifestyle analysis
-    lifestyle_indicators = {
-        'startup': "Risk-tolerant, values innovation and efficiency, prefers scalable solutions, motivated by growth potential and competitive advantage.",
-        'small business': "Cost-conscious, values practical solutions, prefers proven results, needs easy implementation and reliable support.",
-        'corporate': "Process-oriented, values compliance and security, prefers established vendors, motivated by ROI and risk mitigation.",
-        'entrepreneur': "Self-motivated, values flexibility and control, prefers customizable solutions, motivated by productivity gains.",
-        'freelancer': "Budget-sensitive, values time-saving tools, prefers simple interfaces, motivated by efficiency and client satisfaction.",
-        'professional': "Career-focused, values reputation and results, prefers high-quality solutions, motivated by professional advancement."
-    }
-    
-    # Technology adoption patterns
-    tech_indicators = {
-        'tech-savvy': "Early adopters, comfortable with complex features, values innovation and cutting-edge solutions, prefers self-service options.",
-        'tech-hesitant': "Prefers simple, intuitive interfaces, values human support, needs clear instructions, motivated by proven reliability.",
-        'mobile-first': "Expects seamless mobile experience, values speed and convenience, prefers app-based solutions, motivated by accessibility.",
-        'digital native': "Expects instant results, values integration capabilities, prefers cloud-based solutions, motivated by efficiency gains."
-    }
+    if features is None:
+        features = persona_feature_extractor.extract(persona, product_description, geographic_location, interests)
     
     # Build comprehensive analysis
     analysis_parts = []
     
     # Demographic analysis
-    for age_group, behavior in age_indicators.items():
-        if any(term in persona_lower for term in age_group.split()):
-            analysis_parts.append(f"**Age Demographics**: {behavior}")
-            break
+    if features.age_cohort in AGE_COHORT_BEHAVIORS:
+        analysis_parts.append(f"**Age Demographics**: {AGE_COHORT_BEHAVIORS[features.age_cohort]}")
     
     # Professional context analysis  
-    for lifestyle, behavior in lifestyle_indicators.items():
-        if lifestyle in persona_lower:
-            analysis_parts.append(f"**Professional Context**: {behavior}")
-            break
+    if features.lifestyle in LIFESTYLE_BEHAVIORS:
+        analysis_parts.append(f"**Professional Context**: {LIFESTYLE_BEHAVIORS[features.lifestyle]}")
     
     # Technology adoption analysis
-    for tech_level, behavior in tech_indicators.items():
-        if tech_level.replace('-', ' ') in persona_lower or tech_level.replace('-', '') in persona_lower:
-            analysis_parts.append(f"**Technology Adoption**: {behavior}")
-            break
+    if features.tech_level in TECH_LEVEL_BEHAVIORS:
+        analysis_parts.append(f"**Technology Adoption**: {TECH_LEVEL_BEHAVIORS[features.tech_level]}")
     
     # Product-specific behavioral predictions
-    product_lower = product_description.lower()
-    if any(term in product_lower for term in ['saas', 'software', 'app', 'platform', 'tool']):
+    if features.product_kind == 'software':
         analysis_parts.append("**Product Engagement**: Likely to evaluate through free trials, values feature demonstrations, influenced by case studies and user testimonials, expects seamless onboarding experience.")
-    elif any(term in product_lower for term in ['service', 'consulting', 'support']):
+    elif features.product_kind == 'service':
         analysis_parts.append("**Service Engagement**: Values personal relationships, influenced by credentials and testimonials, prefers consultation-based sales approach, motivated by problem-solving capabilities.")
-    elif any(term in product_lower for term in ['product', 'physical', 'retail']):
+    elif features.product_kind == 'physical':
         analysis_parts.append("**Product Engagement**: Influenced by reviews and ratings, values quality guarantees, prefers detailed product information, motivated by value proposition and convenience.")
     
     # Decision-making patterns
-    if any(term in persona_lower for term in ['busy', 'time-constrained', 'efficient']):
+    if features.has('trait:busy', 'trait:efficient'):
         analysis_parts.append("**Decision Pattern**: Quick decision-maker when value is clear, prefers concise information, values time-saving benefits, responsive to limited-time offers.")
-    elif any(term in persona_lower for term in ['careful', 'thorough', 'research']):
+    elif features.has('trait:thorough'):
         analysis_parts.append("**Decision Pattern**: Thorough researcher, compares multiple options, values detailed information, influenced by expert opinions and comprehensive reviews.")
     
     # Pain points and motivations
     motivation_analysis = "**Core Motivations**: "
-    if any(term in persona_lower for term in ['growth', 'scale', 'expand']):
+    if features.has('motivation:growth'):
         motivation_analysis += "Driven by growth opportunities and scalability. "
-    if any(term in persona_lower for term in ['cost', 'budget', 'affordable']):
+    if features.has('motivation:cost'):
         motivation_analysis += "Cost-conscious, seeks value for money. "
-    if any(term in persona_lower for term in ['quality', 'premium', 'reliable']):
+    if features.has('motivation:quality'):
         motivation_analysis += "Quality-focused, willing to pay for excellence. "
-    if any(term in persona_lower for term in ['innovation', 'cutting-edge', 'latest']):
+    if features.has('motivation:innovation'):
         motivation_analysis += "Innovation-driven, values newest technologies. "
     
     analysis_parts.append(motivation_analysis)
     
     # Geographic and cultural analysis
     if geographic_location:
-        location_lower = geographic_location.lower()
         location_analysis = "**Geographic Insights**: "
         
         # Regional preferences
-        if any(region in location_lower for region in ['uk', 'london', 'britain', 'england']):
-            location_analysis += "UK market values understated confidence, quality craftsmanship, and subtle premium positioning. Prefers polite, professional tone with heritage references. "
-        elif any(region in location_lower for region in ['new york', 'nyc', 'manhattan']):
-            location_analysis += "NYC market values speed, efficiency, and bold innovation. Responds to direct, confident messaging with competitive advantages. Fast-paced decision making. "
-        elif any(region in location_lower for region in ['california', 'san francisco', 'bay area', 'silicon valley']):
-            location_analysis += "California tech market values innovation, sustainability, and forward-thinking solutions. Prefers authentic, purpose-driven messaging with social impact. "
-        elif any(region in location_lower for region in ['texas', 'austin', 'dallas', 'houston']):
-            location_analysis += "Texas market values practicality, value, and straightforward communication. Prefers results-focused messaging with clear ROI and no-nonsense approach. "
-        elif any(region in location_lower for region in ['germany', 'berlin', 'munich']):
-            location_analysis += "German market values precision, quality, and thorough documentation. Prefers detailed, fact-based messaging with engineering excellence and reliability focus. "
-        elif any(region in location_lower for region in ['japan', 'tokyo', 'osaka']):
-            location_analysis += "Japanese market values respect, quality, and continuous improvement. Prefers polite, service-oriented messaging with attention to detail and customer care. "
-        elif any(region in location_lower for region in ['australia', 'sydney', 'melbourne']):
-            location_analysis += "Australian market values authenticity, fairness, and practical solutions. Prefers friendly, direct messaging without pretension or excessive formality. "
+        regional_insight = features.location.lookup(REGIONAL_BEHAVIOR_INSIGHTS) if features.location else None
+        if regional_insight:
+            location_analysis += regional_insight
         else:
             location_analysis += f"Local market preferences in {geographic_location} should be considered for cultural alignment and regional business practices. "
         
@@ -241,25 +282,9 @@ def analyze_persona_behavior(persona: str, product_description: str, geographic_
     
     # Interest-based behavioral insights
     if interests:
-        interests_lower = interests.lower()
         interests_analysis = "**Interest-Based Behavior**: "
         
-        interest_patterns = {
-            'sustainability': "Environmentally conscious, values long-term thinking, influenced by social responsibility messaging, prefers brands with clear sustainability practices.",
-            'fitness': "Health-focused, goal-oriented, values performance metrics and results, responsive to achievement-based messaging and progress tracking.",
-            'technology': "Early adopter, values innovation and efficiency, comfortable with technical details, influenced by cutting-edge features and future-forward messaging.",
-            'travel': "Experience-focused, values freedom and flexibility, influenced by lifestyle messaging, responsive to adventure and discovery themes.",
-            'cooking': "Detail-oriented, values quality ingredients and processes, appreciates craftsmanship, responsive to artisanal and premium positioning.",
-            'art': "Creative and expressive, values authenticity and uniqueness, influenced by aesthetic appeal, responsive to customization and personal expression.",
-            'music': "Emotionally driven, values authentic expression, influenced by brand personality and tone, responsive to community and cultural messaging.",
-            'reading': "Intellectually curious, values depth and expertise, influenced by authoritative content, responsive to educational and thought leadership messaging.",
-            'gaming': "Achievement-oriented, values engagement and progression, influenced by interactive experiences, responsive to gamification and competitive elements."
-        }
-        
-        matched_interests = []
-        for interest, behavior in interest_patterns.items():
-            if interest in interests_lower:
-                matched_interests.append(behavior)
+        matched_interests = [behavior for interest_id, behavior in INTEREST_BEHAVIORS.items() if interest_id in features.interest_ids]
         
         if matched_interests:
             interests_analysis += " ".join(matched_interests[:2])  # Limit to avoid too much text
@@ -275,14 +300,15 @@ def analyze_persona_behavior(persona: str, product_description: str, geographic_
         # Fallback generic analysis
         return """**General Analysis**: This persona likely values practical solutions that address specific needs. They respond well to clear value propositions, social proof through testimonials, and transparent communication. Decision-making is influenced by perceived benefits, ease of implementation, and alignment with personal or professional goals. They prefer authentic, straightforward messaging over overly promotional content."""
 
-def generate_color_palette(persona: str, geographic_location: Optional[str] = None, interests: Optional[str] = None) -> List[ColorInfo]:
+def generate_color_palette(persona: str, geographic_location: Optional[str] = None, interests: Optional[str] = None, features: Optional[PersonaFeatures] = None) -> List[ColorInfo]:
     """Generate color palette based on color psychology and persona characteristics"""
     
-    persona_lower = persona.lower()
+    if features is None:
+        features = persona_feature_extractor.extract(persona, geographic_location=geographic_location, interests=interests)
     colors = []
     
     # Age-based color preferences
-    if any(term in persona_lower for term in ['gen z', 'teenager', 'young']):
+    if features.has('age:gen_z', 'age:teenager', 'age:young_adult'):
         colors.extend([
             ColorInfo(hex_code="#FF6B6B", color_name="Coral Red", psychological_effect="Energetic and youthful, creates excitement and captures attention of younger demographics"),
             ColorInfo(hex_code="#4ECDC4", color_name="Turquoise", psychological_effect="Fresh and modern, appeals to creative and tech-savvy individuals"),
@@ -290,7 +316,7 @@ def generate_color_palette(persona: str, geographic_location: Optional[str] = No
             ColorInfo(hex_code="#96CEB4", color_name="Mint Green", psychological_effect="Calming and optimistic, suggests growth and positive change")
         ])
     
-    elif any(term in persona_lower for term in ['millennials', 'millennial']):
+    elif features.has('age:millennial'):
         colors.extend([
             ColorInfo(hex_code="#3498DB", color_name="Professional Blue", psychological_effect="Trustworthy and competent, appeals to career-focused individuals"),
             ColorInfo(hex_code="#E74C3C", color_name="Confident Red", psychological_effect="Bold and decisive, motivates action and conveys confidence"),
@@ -298,7 +324,7 @@ def generate_color_palette(persona: str, geographic_location: Optional[str] = No
             ColorInfo(hex_code="#F39C12", color_name="Optimistic Orange", psychological_effect="Enthusiastic and innovative, encourages exploration and creativity")
         ])
     
-    elif any(term in persona_lower for term in ['gen x', 'professional', 'executive']):
+    elif features.has('age:gen_x', 'lifestyle:professional', 'lifestyle:executive'):
         colors.extend([
             ColorInfo(hex_code="#2C3E50", color_name="Executive Navy", psychological_effect="Authoritative and sophisticated, conveys professionalism and stability"),
             ColorInfo(hex_code="#34495E", color_name="Steel Gray", psychological_effect="Reliable and practical, appeals to logical decision-makers"),
@@ -306,7 +332,7 @@ def generate_color_palette(persona: str, geographic_location: Optional[str] = No
             ColorInfo(hex_code="#D35400", color_name="Amber", psychological_effect="Warm yet professional, encourages engagement while maintaining credibility")
         ])
     
-    elif any(term in persona_lower for term in ['baby boomers', 'senior', 'mature']):
+    elif features.has('age:baby_boomer', 'age:senior'):
         colors.extend([
             ColorInfo(hex_code="#1B4F72", color_name="Traditional Blue", psychological_effect="Trustworthy and established, appeals to traditional values and stability"),
             ColorInfo(hex_code="#943126", color_name="Heritage Red", psychological_effect="Classic and reliable, evokes quality and time-tested value"),
@@ -315,51 +341,46 @@ def generate_color_palette(persona: str, geographic_location: Optional[str] = No
         ])
     
     # Industry-specific color additions
-    if any(term in persona_lower for term in ['tech', 'startup', 'innovation']):
+    if features.has('industry:tech', 'lifestyle:startup'):
         if len(colors) < 5:
             colors.append(ColorInfo(hex_code="#9B59B6", color_name="Innovation Purple", psychological_effect="Creative and forward-thinking, appeals to tech innovators"))
     
-    elif any(term in persona_lower for term in ['healthcare', 'medical', 'wellness']):
+    elif features.has('industry:health', 'trait:wellness'):
         if len(colors) < 5:
             colors.append(ColorInfo(hex_code="#16A085", color_name="Medical Teal", psychological_effect="Healing and trustworthy, creates sense of care and professionalism"))
     
-    elif any(term in persona_lower for term in ['finance', 'banking', 'investment']):
+    elif features.has('industry:finance'):
         if len(colors) < 5:
             colors.append(ColorInfo(hex_code="#1565C0", color_name="Financial Blue", psychological_effect="Secure and dependable, builds confidence in financial decisions"))
     
-    elif any(term in persona_lower for term in ['creative', 'design', 'art']):
+    elif features.has('industry:creative'):
         if len(colors) < 5:
             colors.append(ColorInfo(hex_code="#FF5722", color_name="Creative Orange", psychological_effect="Inspiring and energetic, stimulates creativity and artistic expression"))
     
     # Personality-based colors
-    if any(term in persona_lower for term in ['luxury', 'premium', 'high-end']):
+    if features.has('style:luxury'):
         if len(colors) < 5:
             colors.append(ColorInfo(hex_code="#000000", color_name="Luxury Black", psychological_effect="Sophisticated and exclusive, conveys premium quality and elegance"))
     
-    elif any(term in persona_lower for term in ['eco', 'sustainable', 'green', 'environmental']):
+    elif features.has('style:eco'):
         if len(colors) < 5:
             colors.append(ColorInfo(hex_code="#4CAF50", color_name="Earth Green", psychological_effect="Natural and sustainable, appeals to environmentally conscious consumers"))
     
     # Geographic color preferences
     if geographic_location and len(colors) < 5:
-        location_lower = geographic_location.lower()
-        if any(region in location_lower for region in ['uk', 'britain', 'england']):
-            colors.append(ColorInfo(hex_code="#1B365D", color_name="British Navy", psychological_effect="Traditional and trustworthy, appeals to British preference for understated elegance"))
-        elif any(region in location_lower for region in ['japan', 'tokyo']):
-            colors.append(ColorInfo(hex_code="#C41E3A", color_name="Japanese Red", psychological_effect="Respectful yet vibrant, aligns with Japanese aesthetic preferences"))
-        elif any(region in location_lower for region in ['germany', 'berlin']):
-            colors.append(ColorInfo(hex_code="#000000", color_name="German Black", psychological_effect="Precise and professional, appeals to German preference for functionality"))
+        regional_color = features.location.lookup(REGIONAL_COLORS) if features.location else None
+        if regional_color:
+            colors.append(regional_color)
     
     # Interest-based color additions
     if interests and len(colors) < 5:
-        interests_lower = interests.lower()
-        if 'sustainability' in interests_lower or 'eco' in interests_lower:
+        if 'sustainability' in features.interest_ids:
             colors.append(ColorInfo(hex_code="#2E7D32", color_name="Eco Green", psychological_effect="Natural and responsible, appeals to environmentally conscious mindset"))
-        elif 'fitness' in interests_lower or 'health' in interests_lower:
+        elif 'fitness' in features.interest_ids or 'health' in features.interest_ids:
             colors.append(ColorInfo(hex_code="#FF5722", color_name="Energy Orange", psychological_effect="Energetic and motivating, appeals to fitness and health enthusiasts"))
-        elif 'art' in interests_lower or 'creative' in interests_lower:
+        elif 'art' in features.interest_ids:
             colors.append(ColorInfo(hex_code="#9C27B0", color_name="Creative Purple", psychological_effect="Artistic and inspiring, resonates with creative personalities"))
-        elif 'technology' in interests_lower or 'tech' in interests_lower:
+        elif 'technology' in features.interest_ids:
             colors.append(ColorInfo(hex_code="#00BCD4", color_name="Tech Cyan", psychological_effect="Modern and innovative, appeals to technology enthusiasts"))
     
     # Ensure we have at least 3-4 colors, add defaults if needed
@@ -373,35 +394,36 @@ def generate_color_palette(persona: str, geographic_location: Optional[str] = No
     # Return 3-5 colors maximum
     return colors[:5]
 
-def generate_trending_words(persona: str, geographic_location: Optional[str] = None, interests: Optional[str] = None) -> List[str]:
+def generate_trending_words(persona: str, geographic_location: Optional[str] = None, interests: Optional[str] = None, features: Optional[PersonaFeatures] = None) -> List[str]:
     """Generate trending words and phrases relevant to the persona"""
     
-    persona_lower = persona.lower()
+    if features is None:
+        features = persona_feature_extractor.extract(persona, geographic_location=geographic_location, interests=interests)
     trending_words = []
     
     # Age group specific trending words
-    if any(term in persona_lower for term in ['gen z', 'teenager']):
+    if features.has('age:gen_z', 'age:teenager'):
         trending_words.extend([
             "authentic", "viral", "sustainable", "inclusive", "accessible", "instant", 
             "personalized", "interactive", "gamified", "social", "visual", "mobile-native",
             "eco-friendly", "diverse", "transparent", "relatable", "engaging"
         ])
     
-    elif any(term in persona_lower for term in ['millennials', 'millennial']):
+    elif features.has('age:millennial'):
         trending_words.extend([
             "experience-driven", "purpose-built", "work-life balance", "sustainable", 
             "personalized", "data-driven", "seamless", "intuitive", "collaborative",
             "flexible", "innovative", "transparent", "authentic", "efficient", "scalable"
         ])
     
-    elif any(term in persona_lower for term in ['gen x', 'professional']):
+    elif features.has('age:gen_x', 'lifestyle:professional'):
         trending_words.extend([
             "results-driven", "proven", "reliable", "efficient", "streamlined", 
             "professional-grade", "enterprise-ready", "secure", "compliant", "robust",
             "time-saving", "cost-effective", "strategic", "comprehensive", "established"
         ])
     
-    elif any(term in persona_lower for term in ['baby boomers', 'senior']):
+    elif features.has('age:baby_boomer', 'age:senior'):
         trending_words.extend([
             "trusted", "established", "reliable", "straightforward", "quality", 
             "service-oriented", "personal", "secure", "time-tested", "dependable",
@@ -409,70 +431,70 @@ def generate_trending_words(persona: str, geographic_location: Optional[str] = N
         ])
     
     # Tech adoption level words
-    if any(term in persona_lower for term in ['tech-savvy', 'digital native']):
+    if features.has('tech:savvy', 'tech:digital_native'):
         trending_words.extend([
             "AI-powered", "cloud-based", "automated", "integrated", "smart", 
             "next-generation", "cutting-edge", "advanced", "intelligent", "connected"
         ])
     
-    elif any(term in persona_lower for term in ['tech-hesitant']):
+    elif features.has('tech:hesitant'):
         trending_words.extend([
             "simple", "user-friendly", "guided", "supported", "straightforward", 
             "easy-to-use", "intuitive", "clear", "step-by-step", "helpful"
         ])
     
     # Professional context words
-    if any(term in persona_lower for term in ['startup', 'entrepreneur']):
+    if features.has('lifestyle:startup', 'lifestyle:entrepreneur'):
         trending_words.extend([
             "disruptive", "agile", "scalable", "lean", "growth-focused", "innovative", 
             "MVP", "rapid", "flexible", "bootstrapped", "pivot-ready", "competitive advantage"
         ])
     
-    elif any(term in persona_lower for term in ['small business', 'SMB']):
+    elif features.has('lifestyle:small_business'):
         trending_words.extend([
             "affordable", "practical", "ROI-focused", "easy-to-implement", "local", 
             "community-driven", "family-owned", "personalized service", "cost-effective", "reliable"
         ])
     
-    elif any(term in persona_lower for term in ['corporate', 'enterprise']):
+    elif features.has('lifestyle:corporate', 'lifestyle:enterprise'):
         trending_words.extend([
             "enterprise-grade", "compliant", "secure", "scalable", "centralized", 
             "standardized", "policy-compliant", "audit-ready", "governance", "institutional"
         ])
     
     # Industry-specific trending words
-    if any(term in persona_lower for term in ['healthcare', 'medical']):
+    if features.has('industry:health'):
         trending_words.extend([
             "HIPAA-compliant", "patient-centered", "evidence-based", "clinically-proven", 
             "telehealth", "precision", "wellness-focused", "care coordination"
         ])
     
-    elif any(term in persona_lower for term in ['finance', 'banking']):
+    elif features.has('industry:finance'):
         trending_words.extend([
             "fintech", "blockchain", "secure", "regulated", "compliance-ready", 
             "fraud-protection", "real-time", "financial wellness", "digital banking"
         ])
     
-    elif any(term in persona_lower for term in ['education', 'learning']):
+    elif features.has('industry:education'):
         trending_words.extend([
             "adaptive learning", "personalized curriculum", "skill-building", 
             "certification-ready", "microlearning", "gamified education", "virtual classroom"
         ])
     
     # Behavioral trait words
-    if any(term in persona_lower for term in ['busy', 'time-constrained']):
+    if features.has('trait:busy'):
         trending_words.extend([
             "time-saving", "automated", "streamlined", "efficient", "quick-setup", 
             "instant", "on-the-go", "mobile-optimized", "fast-track"
         ])
     
-    elif any(term in persona_lower for term in ['quality-focused', 'premium']):
+    elif features.has('trait:quality_focused'):
         trending_words.extend([
             "premium", "high-quality", "artisanal", "crafted", "exclusive", 
             "luxury", "boutique", "curated", "elite", "sophisticated"
         ])
     
-    elif any(term in persona_lower for term in ['budget-conscious', 'cost-effective']):
+    elif features.has('trait:budget_conscious'):
         trending_words.extend([
             "affordable", "value-packed", "cost-effective", "budget-friendly", 
             "economical", "smart investment", "maximum ROI", "cost-saving", "efficient pricing"
@@ -480,37 +502,27 @@ def generate_trending_words(persona: str, geographic_location: Optional[str] = N
     
     # Geographic trending words
     if geographic_location:
-        location_lower = geographic_location.lower()
-        if any(region in location_lower for region in ['uk', 'london', 'britain']):
-            trending_words.extend(["bespoke", "heritage", "traditional", "quality-assured", "british-made", "established"])
-        elif any(region in location_lower for region in ['new york', 'nyc']):
-            trending_words.extend(["fast-paced", "cutting-edge", "metropolitan", "premium", "exclusive", "competitive"])
-        elif any(region in location_lower for region in ['california', 'bay area', 'silicon valley']):
-            trending_words.extend(["innovative", "disruptive", "sustainable", "forward-thinking", "conscious", "progressive"])
-        elif any(region in location_lower for region in ['germany', 'berlin']):
-            trending_words.extend(["engineered", "precision-built", "systematic", "reliable", "methodical", "quality-tested"])
-        elif any(region in location_lower for region in ['japan', 'tokyo']):
-            trending_words.extend(["refined", "meticulous", "harmonious", "respectful", "continuous-improvement", "quality-focused"])
+        if features.location:
+            trending_words.extend(features.location.lookup(REGIONAL_TRENDING_WORDS, []))
     
     # Interest-based trending words
     if interests:
-        interests_lower = interests.lower()
-        if 'sustainability' in interests_lower:
+        if 'sustainability' in features.interest_ids:
             trending_words.extend(["eco-friendly", "carbon-neutral", "sustainable", "renewable", "responsible", "green"])
-        if 'fitness' in interests_lower:
+        if 'fitness' in features.interest_ids:
             trending_words.extend(["performance-driven", "goal-oriented", "energizing", "motivational", "strength-building", "wellness-focused"])
-        if 'technology' in interests_lower:
+        if 'technology' in features.interest_ids:
             trending_words.extend(["AI-powered", "smart", "automated", "next-gen", "digital-first", "tech-enabled"])
-        if 'art' in interests_lower:
+        if 'art' in features.interest_ids:
             trending_words.extend(["creative", "expressive", "unique", "artistic", "inspirational", "aesthetic"])
-        if 'travel' in interests_lower:
+        if 'travel' in features.interest_ids:
             trending_words.extend(["adventure-ready", "portable", "flexible", "global", "culturally-aware", "exploration-focused"])
-        if 'cooking' in interests_lower:
+        if 'cooking' in features.interest_ids:
             trending_words.extend(["artisanal", "crafted", "gourmet", "quality-ingredients", "flavorful", "culinary-inspired"])
     
-    # Remove duplicates and shuffle for variety
-    trending_words = list(set(trending_words))
-    random.shuffle(trending_words)
+    # Remove duplicates and shuffle for variety, seeded so identical requests agree
+    trending_words = sorted(set(trending_words))
+    random.Random(analysis_seed(persona, geographic_location, interests)).shuffle(trending_words)
     
     # Return 8-15 trending words, enhanced with geographic and interest context
     return trending_words[:12]
@@ -782,21 +794,39 @@ async def get_campaign(campaign_id: str):
 async def generate_advanced_analysis(request: AnalysisRequest):
     """Generate advanced persona analysis including behavior, color psychology, and trending words"""
     try:
+        cache_key = tuple(
+            normalize_analysis_text(value)
+            for value in (request.persona, request.product_description, request.geographic_location, request.interests)
+        )
+        cached_response = analysis_cache.get(cache_key)
+        if cached_response is not None:
+            logger.info(f"Serving cached advanced analysis for persona: {request.persona[:50]}...")
+            return cached_response
+        
         logger.info(f"Generating advanced analysis for persona: {request.persona[:50]}...")
         
+        # Extract persona, product, region and interest features once for all generators
+        features = persona_feature_extractor.extract(
+            request.persona,
+            request.product_description,
+            request.geographic_location,
+            request.interests
+        )
+        
         # Generate behavioral analysis with enhanced context
         behavior_summary = analyze_persona_behavior(
             request.persona, 
             request.product_description, 
             request.geographic_location, 
-            request.interests
+            request.interests,
+            features
         )
         
         # Generate color palette based on psychology with geographic and interest context
-        color_palette = generate_color_palette(request.persona, request.geographic_location, request.interests)
+        color_palette = generate_color_palette(request.persona, request.geographic_location, request.interests, features)
         
         # Generate trending words with enhanced context
-        trending_words = generate_trending_words(request.persona, request.geographic_location, request.interests)
+        trending_words = generate_trending_words(request.persona, request.geographic_location, request.interests, features)
         
         # Create response object
         analysis_response = AnalysisResponse(
@@ -807,6 +837,7 @@ async def generate_advanced_analysis(request: AnalysisRequest):
         
         logger.info(f"Successfully generated analysis with {len(color_palette)} colors and {len(trending_words)} trending words")
         
+        analysis_cache.put(cache_key, analysis_response)
         return analysis_response
         
     except Exception as e:
@@ -832,9 +863,17 @@ async def save_campaign_to_history(campaign_data: CampaignHistoryCreate):
             title=title
         )
         
+        # Inline images are kept by reference, in the stored document and the response
+        intelligence_data = history_entry.intelligence_data or {}
+        if "persona_image_url" in intelligence_data:
+            history_entry.intelligence_data = {
+                **intelligence_data,
+                "persona_image_url": await asyncio.to_thread(image_store.externalize, intelligence_data["persona_image_url"])
+            }
+        
         # Store in database
-        history_dict = history_entry.dict()
-        history_dict = prepare_for_mongo(history_dict)
+        history_dict = prepare_for_mongo(history_entry.dict())
+        history_dict["search_tokens"] = history_search_tokens(history_dict)
         await db.campaign_history.insert_one(history_dict)
         
         logger.info(f"Campaign saved to history: {title}")
@@ -850,24 +889,15 @@ async def get_campaign_history(page: int = 1, limit: int = 10, search: Optional[
     try:
         skip = (page - 1) * limit
         
-        # Build query filter
-        query_filter = {}
-        if search:
-            # Search in title, age_range, geographic_location, or interests
-            query_filter = {
-                "$or": [
-                    {"title": {"$regex": search, "$options": "i"}},
-                    {"age_range": {"$regex": search, "$options": "i"}},
-                    {"geographic_location": {"$regex": search, "$options": "i"}},
-                    {"interests": {"$elemMatch": {"$regex": search, "$options": "i"}}}
-                ]
-            }
+        # Build query filter: every search word must prefix a word of the title,
+        # age_range, geographic_location or interests (indexed edge n-grams)
+        query_filter = history_search_filter(search) if search else {}
         
         # Get total count
         total_count = await db.campaign_history.count_documents(query_filter)
         
         # Get campaigns with pagination
-        campaigns = await db.campaign_history.find(query_filter).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+        campaigns = await db.campaign_history.find(query_filter, {"search_tokens": 0}).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
         
         # Parse datetime fields
         parsed_campaigns = [parse_from_mongo(campaign) for campaign in campaigns]
@@ -945,6 +975,60 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Startup jobs running in the background; the loop only keeps weak references to tasks
+background_tasks = set()
+
+def run_in_background(coroutine):
+    """Start a startup job that is kept alive until done and cancelled on shutdown"""
+    task = asyncio.create_task(coroutine)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+async def migrate_schema():
+    """Bring indexes and stored documents up to the latest schema version"""
+    try:
+        applied = await schema_migrator.migrate(db)
+        if applied:
+            logger.info(f"Applied schema migrations {applied}")
+    except Exception as e:
+        logger.error(f"Schema migration failed: {str(e)}")
+
+@app.on_event("startup")
+async def start_schema_migration():
+    # Index builds run in the background so startup does not wait on the database
+    run_in_background(migrate_schema())
+
+async def migrate_history_images():
+    """Move data: URL images in saved history documents into the image store"""
+    try:
+        migrated = await image_store.migrate_inline_images(db.campaign_history)
+        if migrated:
+            logger.info(f"Migrated {migrated} inline persona images in campaign history to references")
+    except Exception as e:
+        logger.error(f"Inline image migration failed: {str(e)}")
+
+@app.on_event("startup")
+async def start_history_image_migration():
+    if image_store.reference_mode:
+        # Runs in the background so startup does not wait on the history scan
+        run_in_background(migrate_history_images())
+
+@app.on_event("startup")
+async def start_llm_client():
+    from marketing_intelligence import api_config
+    if api_config.use_real_apis and api_config.emergent_llm_key:
+        try:
+            # Created once so every request reuses its connection pool
+            llm_client.client(api_config.emergent_llm_key, api_config.llm_base_url)
+        except ImportError as e:
+            logger.warning(f"LLM client unavailable: {str(e)}")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    # Stop unfinished startup jobs before their database client closes
+    for task in list(background_tasks):
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    client.close()
+    await llm_client.close()
\ No newline at end of file
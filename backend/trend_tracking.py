@@ -0,0 +1,148 @@
+import math
+import re
+import time
+import heapq
+import threading
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+from caching import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Sliding windows approximated by exponential decay (mean lifetime = window)
+TREND_WINDOWS = {
+    "1h": 3600,
+    "24h": 24 * 3600,
+    "7d": 7 * 24 * 3600
+}
+
+# Title words that mark an article as belonging to a marketing theme
+THEME_TERMS = {
+    "technology_adoption": {"ai", "technology", "digital"},
+    "sustainability_focus": {"sustainable", "environment", "green"},
+    "social_engagement": {"social", "community", "engagement"}
+}
+
+STOPWORDS = {
+    "the", "and", "for", "with", "from", "that", "this", "into", "over", "your",
+    "are", "was", "were", "has", "have", "its", "new", "how", "why", "what",
+    "will", "can", "not", "but", "all", "more", "after", "about", "says", "amid"
+}
+
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9\-]*")
+
+class DecayingCounter:
+    """Exponentially time-decayed counters with O(1) updates per key"""
+
+    def __init__(self, window_seconds: int, max_keys: int = 5000):
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        # key -> (value at last update, last update timestamp)
+        self._values: Dict[str, Tuple[float, float]] = {}
+
+    def _decayed(self, value: float, last_update: float, now: float) -> float:
+        return value * math.exp(-(now - last_update) / self.window_seconds)
+
+    def add(self, key: str, now: float, amount: float = 1.0):
+        """Decay the key's current value to now and add amount"""
+        value, last_update = self._values.get(key, (0.0, now))
+        self._values[key] = (self._decayed(value, last_update, now) + amount, now)
+
+        if len(self._values) > self.max_keys:
+            self._prune(now)
+
+    def _prune(self, now: float):
+        """Drop the weakest quarter of keys (O(n log n), once per max_keys / 4 new keys)"""
+        keep = heapq.nlargest(
+            int(self.max_keys * 0.75),
+            self._values.items(),
+            key=lambda item: self._decayed(item[1][0], item[1][1], now)
+        )
+        self._values = dict(keep)
+
+    def top(self, n: int, now: float, min_value: float = 0.05) -> List[Tuple[str, float]]:
+        """Get the n keys with the highest decayed values"""
+        scored = (
+            (key, self._decayed(value, last_update, now))
+            for key, (value, last_update) in self._values.items()
+        )
+        return [
+            (key, round(score, 3))
+            for key, score in heapq.nlargest(n, scored, key=lambda item: item[1])
+            if score >= min_value
+        ]
+
+class TrendingTopicTracker:
+    """Track theme and keyword frequency over the whole ingested article stream"""
+
+    def __init__(self, max_keywords: int = 5000):
+        self._lock = threading.Lock()
+        self.theme_counters = {name: DecayingCounter(seconds, max_keys=len(THEME_TERMS) + 1) for name, seconds in TREND_WINDOWS.items()}
+        self.keyword_counters = {name: DecayingCounter(seconds, max_keys=max_keywords) for name, seconds in TREND_WINDOWS.items()}
+        # Articles recur across feeds and refreshes; count each one once
+        self.seen_articles = LRUCache("trend_article_dedup", max_size=20000)
+        self.articles_ingested = 0
+
+    @staticmethod
+    def extract_themes(title: str) -> List[str]:
+        """Get the marketing themes a headline belongs to"""
+        title_words = set(title.lower().split())
+        return [theme for theme, terms in THEME_TERMS.items() if title_words & terms]
+
+    @staticmethod
+    def extract_keywords(title: str) -> List[str]:
+        """Get the distinct non-trivial words of a headline"""
+        words = WORD_PATTERN.findall(title.lower())
+        return list(dict.fromkeys(word for word in words if len(word) > 2 and word not in STOPWORDS))
+
+    def ingest_article(self, article: Dict[str, Any], now: Optional[float] = None) -> bool:
+        """Count an article's themes and keywords once; returns False for repeats"""
+        title = article.get("title", "")
+        fingerprint = article.get("url") or title
+        if not fingerprint:
+            return False
+
+        now = now if now is not None else time.time()
+        themes = self.extract_themes(title)
+        keywords = self.extract_keywords(title)
+
+        with self._lock:
+            # Checked and marked under the lock so concurrent ingests count an article once
+            if self.seen_articles.get(fingerprint):
+                return False
+            self.seen_articles.put(fingerprint, True)
+            for window in TREND_WINDOWS:
+                for theme in themes:
+                    self.theme_counters[window].add(theme, now)
+                for keyword in keywords:
+                    self.keyword_counters[window].add(keyword, now)
+            self.articles_ingested += 1
+
+        return True
+
+    def ingest_articles(self, articles: List[Dict[str, Any]]) -> int:
+        """Ingest a batch of articles, returning how many were new"""
+        now = time.time()
+        return sum(1 for article in articles if self.ingest_article(article, now))
+
+    def top_themes(self, window: str = "24h", limit: int = 5) -> List[str]:
+        """Get the currently strongest themes for a window"""
+        with self._lock:
+            return [theme for theme, _ in self.theme_counters[window].top(limit, time.time())]
+
+    def get_snapshot(self, window: str = "24h", limit: int = 10) -> Dict[str, Any]:
+        """Get scored top themes and keywords for a window"""
+        now = time.time()
+        with self._lock:
+            themes = self.theme_counters[window].top(limit, now)
+            keywords = self.keyword_counters[window].top(limit, now)
+
+        return {
+            "window": window,
+            "themes": [{"theme": theme, "score": score} for theme, score in themes],
+            "keywords": [{"keyword": keyword, "score": score} for keyword, score in keywords],
+            "articles_ingested": self.articles_ingested
+        }
+
+# Global tracker shared by every request in the process
+trend_tracker = TrendingTopicTracker()
@@ -35,6 +35,7 @@ import WordCloudVisualization from './visualizations/WordCloudVisualization';
 import BehavioralChart from './visualizations/BehavioralChart';
 import CategorizedNews from './visualizations/CategorizedNews';
 import HistoryPanel from './HistoryPanel';
+import { backendAssetUrl } from '../lib/utils';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -490,7 +491,7 @@ const EnhancedMarketingIntelligence = () => {
                       {intelligenceData.persona_image_url ? (
                         <div className="text-center">
                           <img 
-                            src={intelligenceData.persona_image_url} 
+                            src={backendAssetUrl(intelligenceData.persona_image_url, 256)} 
                             alt="Generated Persona" 
                             className="rounded-lg max-w-full max-h-40 mx-auto border border-slate-200 shadow-sm"
                             data-testid="persona-image"
@@ -22,6 +22,7 @@ import { toast } from 'sonner';
 import WordCloudVisualization from './visualizations/WordCloudVisualization';
 import BehavioralChart from './visualizations/BehavioralChart';
 import CategorizedNews from './visualizations/CategorizedNews';
+import { backendAssetUrl } from '../lib/utils';
 
 const FloatingDashboard = ({ 
   isOpen, 
@@ -185,7 +186,7 @@ const FloatingDashboard = ({
                     {intelligenceData.persona_image_url ? (
                       <div className="text-center">
                         <img 
-                          src={intelligenceData.persona_image_url} 
+                          src={backendAssetUrl(intelligenceData.persona_image_url, 256)} 
                           alt="Generated Persona" 
                           className="rounded-lg max-w-full max-h-40 mx-auto border border-slate-200 shadow-sm"
                           onError={(e) => {
@@ -27,6 +27,7 @@ import {
 } from 'lucide-react';
 import axios from 'axios';
 import { toast } from 'sonner';
+import { backendAssetUrl } from '../lib/utils';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -543,7 +544,7 @@ const MarketingIntelligence = () => {
                     {intelligenceData.persona_image_url && (
                       <div className="flex justify-center">
                         <img 
-                          src={intelligenceData.persona_image_url} 
+                          src={backendAssetUrl(intelligenceData.persona_image_url, 512)} 
                           alt="Generated Persona" 
                           className="rounded-lg max-w-xs border border-slate-200"
                           data-testid="persona-image"
@@ -4,3 +4,29 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs) {
   return twMerge(clsx(inputs));
 }
+
+const IMAGE_ENDPOINT_PATH = "/api/marketing/images/";
+
+function urlPath(url) {
+  try {
+    return new URL(url).pathname;
+  } catch {
+    return "";
+  }
+}
+
+// Backend-relative asset paths (e.g. /api/marketing/images/<hash>) live on the API host.
+// Stored persona images can be requested as a resized WebP derivative (128, 256 or 512px),
+// also when IMAGE_PUBLIC_BASE_URL makes the backend return absolute image URLs.
+export function backendAssetUrl(url, size) {
+  if (!url || url.startsWith("data:")) {
+    return url;
+  }
+  const relative = url.startsWith("/");
+  const resolved = relative ? `${process.env.REACT_APP_BACKEND_URL || ""}${url}` : url;
+  const path = relative ? url : urlPath(url);
+  if (!size || !path.includes(IMAGE_ENDPOINT_PATH)) {
+    return resolved;
+  }
+  return `${resolved}${resolved.includes("?") ? "&" : "?"}size=${size}`;
+}
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Backend modules use flat imports and expect to run from backend/
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+# server.py reads these at import time; unit tests never open a connection
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "unit_tests")
@@ -0,0 +1,40 @@
+from ad_copy_scoring import AdCopyScorer, _syllables
+
+TEMPLATES = {
+    "facebook": {"headline_words": (4, 8), "body_words": (10, 30), "cta_options": ["Shop Now", "Learn More"]}
+}
+
+GOOD = {
+    "headline": "Fresh coffee delivered every week",
+    "body": "Get fresh roasted coffee at your door. Pick your beans and save time. Cancel any time you like.",
+    "cta": "Shop Now",
+    "keywords": "coffee, subscription"
+}
+
+WEAK = {
+    "headline": "Coffee",
+    "body": "Unquestionably extraordinary caffeinated experiences",
+    "cta": "Click here right now to find out everything",
+    "keywords": ""
+}
+
+
+def test_syllable_estimate_drops_silent_e():
+    assert _syllables("make") == 1
+    assert _syllables("reading") == 2
+    assert _syllables("rhythm") == 1
+
+
+def test_scores_are_bounded_and_rank_fitting_copy_higher():
+    scores = AdCopyScorer().score([GOOD, WEAK], ["facebook", "facebook"], ["coffee", "subscription"], TEMPLATES)
+    assert all(0 <= score <= 100 for score in scores)
+    assert scores[0] > scores[1]
+    assert AdCopyScorer().score([], [], ["coffee"], TEMPLATES).size == 0
+
+
+def test_best_per_platform_keeps_highest_scoring_candidate():
+    best = AdCopyScorer().best_per_platform({"facebook": [WEAK, GOOD], "unknown": [WEAK]}, ["coffee"], TEMPLATES)
+    assert best["facebook"]["headline"] == GOOD["headline"]
+    assert best["facebook"]["candidates"] == 2
+    assert best["unknown"]["candidates"] == 1
+    assert "quality_score" in best["unknown"]
@@ -0,0 +1,43 @@
+import gc
+
+from caching import LRUCache, get_cache_stats
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    cache = LRUCache("test_lru_eviction", max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # a is now the most recent
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_expired_entries_miss(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("caching.time.monotonic", lambda: clock[0])
+    cache = LRUCache("test_lru_ttl", max_size=4, ttl_seconds=10)
+    cache.put("a", 1)
+    clock[0] += 5
+    assert cache.get("a") == 1
+    clock[0] += 10
+    assert cache.get("a", "gone") == "gone"
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"], stats["size"]) == (1, 1, 1, 0)
+
+
+def test_caches_sharing_a_name_are_reported_separately():
+    first = LRUCache("test_lru_shared_name")
+    second = LRUCache("test_lru_shared_name")
+    first.put("a", 1)
+
+    assert (first.registry_key, second.registry_key) == ("test_lru_shared_name", "test_lru_shared_name#2")
+    assert get_cache_stats("test_lru_shared_name")["size"] == 1
+    assert get_cache_stats("test_lru_shared_name#2")["size"] == 0
+
+    del second
+    gc.collect()
+    assert "test_lru_shared_name#2" not in get_cache_stats()
@@ -0,0 +1,79 @@
+import itertools
+import sqlite3
+
+import pytest
+
+import completion_cache as completion_cache_module
+from completion_cache import CompletionCache
+
+
+def test_fingerprint_ignores_param_order_but_not_values():
+    key = CompletionCache.fingerprint("text", "hi", model="a", temperature=0.2)
+    assert key == CompletionCache.fingerprint("text", "hi", temperature=0.2, model="a")
+    assert key != CompletionCache.fingerprint("text", "hi", model="b", temperature=0.2)
+    assert key != CompletionCache.fingerprint("image", "hi", model="a", temperature=0.2)
+
+
+def test_get_put_round_trip_and_hit_stats(tmp_path):
+    cache = CompletionCache(path=str(tmp_path / "cache.sqlite3"))
+    cache.enabled = True
+    assert cache.get("k") is None
+    cache.put("k", "value")
+    assert cache.get("k") == "value"
+
+    text = cache.get_stats()["kinds"]["text"]
+    assert (text["hits"], text["misses"], text["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_savings_use_the_cost_stored_with_each_entry(tmp_path):
+    cache = CompletionCache(path=str(tmp_path / "cache.sqlite3"))
+    cache.enabled = True
+    cache.put("k", "value", cost_usd=0.0025)
+    cache.get("k")
+    cache.get("k")
+    cache.record_hit("image", 0.04)
+
+    stats = cache.get_stats()
+    assert stats["kinds"]["text"]["cost_saved_usd"] == pytest.approx(0.005)
+    assert stats["cost_saved_usd"] == pytest.approx(0.045)
+
+
+def test_cache_files_without_costs_are_upgraded(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE completions (fingerprint TEXT PRIMARY KEY, kind TEXT NOT NULL, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        connection.execute("INSERT INTO completions VALUES ('old', 'text', 'value', 9e9, 9e9)")
+    cache = CompletionCache(path=str(path), ttl_seconds=None)
+    cache.enabled = True
+    assert cache.get("old") == "value"
+    assert cache.get_stats()["cost_saved_usd"] == 0.0
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, monkeypatch):
+    clock = itertools.count(1000)
+    monkeypatch.setattr(completion_cache_module.time, "time", lambda: next(clock))
+    cache = CompletionCache(path=str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.enabled = True
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")  # Refreshes a
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("1", "3")
+    assert cache.evictions == 1
+
+
+def test_expired_entries_are_dropped(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(completion_cache_module.time, "time", lambda: now[0])
+    cache = CompletionCache(path=str(tmp_path / "cache.sqlite3"), ttl_seconds=60)
+    cache.enabled = True
+    cache.put("k", "value")
+    now[0] += 61
+    assert cache.get("k") is None
+    assert cache.expirations == 1
+    assert cache.get_stats()["entries"] == 0
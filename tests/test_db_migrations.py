@@ -0,0 +1,93 @@
+import asyncio
+from collections import Counter
+
+from db_migrations import MIGRATIONS, SchemaMigrator, _plan_stages
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length):
+        return list(self.documents)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in list(self.documents):
+            yield document
+
+
+class FakeCollection:
+    """The slice of the Motor collection API the migrator uses"""
+
+    def __init__(self):
+        self.documents = []
+        self.indexes = []
+
+    def find(self, filter=None, projection=None):
+        missing = [field for field, condition in (filter or {}).items() if condition == {"$exists": False}]
+        return FakeCursor([document for document in self.documents if not any(field in document for field in missing)])
+
+    def aggregate(self, pipeline):
+        field = pipeline[1]["$group"]["_id"][1:]
+        counts = Counter(document[field] for document in self.documents if field in document)
+        return FakeCursor([{"_id": value, "count": count} for value, count in counts.items() if count > 1])
+
+    async def create_indexes(self, indexes):
+        self.indexes.extend(index.document["name"] for index in indexes)
+
+    async def insert_one(self, document):
+        self.documents.append(document)
+
+    async def update_one(self, filter, update):
+        for document in self.documents:
+            if document["_id"] == filter["_id"]:
+                document.update(update["$set"])
+
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+def test_migrations_apply_once_in_order_and_backfill_search_tokens():
+    db = FakeDatabase()
+    db.campaign_history.documents.append({"_id": 1, "id": "a", "title": "Spring Sale"})
+    migrator = SchemaMigrator()
+
+    assert asyncio.run(migrator.migrate(db)) == [1, 2, 3]
+    assert asyncio.run(migrator.migrate(db)) == []
+    assert db.campaigns.indexes == ["id_unique", "created_at_desc"]
+    assert "search_tokens_created_at_desc" in db.campaign_history.indexes
+    assert "spr" in db.campaign_history.documents[0]["search_tokens"]
+
+    status = asyncio.run(migrator.get_status(db))
+    assert (status["current_version"], status["latest_version"], status["pending"]) == (3, MIGRATIONS[-1].version, [])
+
+
+def test_duplicate_ids_block_only_their_own_version():
+    db = FakeDatabase()
+    db.campaigns.documents.extend([{"id": "dup"}, {"id": "dup"}, {"title": "no id"}])
+    migrator = SchemaMigrator()
+
+    assert asyncio.run(migrator.migrate(db)) == [2, 3]
+    assert db.campaigns.indexes == []
+    pending = asyncio.run(migrator.get_status(db))["pending"]
+    assert [entry["version"] for entry in pending] == [1]
+    assert "dup" in pending[0]["error"]
+
+    db.campaigns.documents.pop()
+    db.campaigns.documents.pop(0)
+    assert asyncio.run(migrator.migrate(db)) == [1]
+    assert migrator.failures == {}
+
+
+def test_plan_stages_flatten_the_winning_plan():
+    plan = {"stage": "LIMIT", "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "created_at_desc"}}}
+    assert _plan_stages(plan) == [{"stage": "LIMIT"}, {"stage": "FETCH"}, {"stage": "IXSCAN", "index": "created_at_desc"}]
@@ -0,0 +1,42 @@
+from history_search import MAX_GRAM, edge_ngrams, history_search_filter, history_search_tokens, normalize_tokens
+
+
+def test_tokens_are_lowercased_and_accent_folded():
+    assert normalize_tokens("São Paulo, Zürich & CAFÉ 25-34") == ["sao", "paulo", "zurich", "cafe", "25", "34"]
+    assert normalize_tokens("  !! ") == []
+
+
+def test_edge_ngrams_are_capped_at_max_gram():
+    assert list(edge_ngrams("yoga")) == ["y", "yo", "yog", "yoga"]
+    grams = list(edge_ngrams("internationalization"))
+    assert len(grams) == MAX_GRAM
+    assert grams[-1] == "internationalization"[:MAX_GRAM]
+
+
+def test_document_tokens_cover_every_search_field():
+    tokens = history_search_tokens({
+        "title": "Spring Sale",
+        "age_range": "25-34",
+        "geographic_location": "Málaga",
+        "interests": ["Yoga", "travel"],
+        "product_description": "not searched"
+    })
+    assert {"spr", "sale", "25", "34", "malaga", "yo", "trav"} <= set(tokens)
+    assert "not" not in tokens
+    assert tokens == sorted(set(tokens))
+
+
+def test_search_filter_requires_every_word():
+    assert history_search_filter("New  York new") == {"search_tokens": {"$all": ["new", "york"]}}
+    assert history_search_filter("Sao Pau") == {"search_tokens": {"$all": ["pau", "sao"]}}
+
+
+def test_search_filter_truncates_long_words_to_the_indexed_prefix():
+    word = "internationalization"
+    assert history_search_filter(word) == {"search_tokens": {"$all": [word[:MAX_GRAM]]}}
+    assert word[:MAX_GRAM] in history_search_tokens({"title": word})
+
+
+def test_empty_search_matches_everything():
+    assert history_search_filter("") == {}
+    assert history_search_filter("--- ?") == {}
@@ -0,0 +1,56 @@
+import base64
+import io
+
+import pytest
+
+from image_store import DERIVATIVE_FORMATS, DERIVATIVE_SIZES, PersonaImageStore, sniff_extension
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def png_bytes(size=(600, 300)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 40, 40)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_sniff_extension_reads_magic_numbers():
+    assert sniff_extension(png_bytes()) == ".png"
+    assert sniff_extension(b"\xff\xd8\xff\xe0rest") == ".jpg"
+    assert sniff_extension(b"<?xml?><svg></svg>") == ".svg"
+    assert sniff_extension(b"not an image") is None
+
+
+def test_content_addressed_store_round_trip(tmp_path):
+    store = PersonaImageStore(root_dir=str(tmp_path), public_base_url="https://cdn.example.com/")
+    data = png_bytes()
+    image_hash = store.put_content(data)
+    assert store.put_content(data) == image_hash
+    assert store.stats["stored"] == 1
+
+    path, media_type = store.find(image_hash)
+    assert (path.read_bytes(), media_type) == (data, "image/png")
+    assert store.find("../etc/passwd") is None
+    assert store.url_for(image_hash) == f"https://cdn.example.com/api/marketing/images/{image_hash}"
+
+
+def test_inline_data_urls_are_externalized(tmp_path):
+    store = PersonaImageStore(root_dir=str(tmp_path), public_base_url="")
+    store.reference_mode = True
+    data_url = "data:image/png;base64," + base64.b64encode(png_bytes()).decode("ascii")
+    reference = store.externalize(data_url)
+    assert reference.startswith("/api/marketing/images/")
+    assert store.externalize("https://example.com/a.png") == "https://example.com/a.png"
+
+
+def test_create_derivatives_renders_every_size_and_format(tmp_path):
+    store = PersonaImageStore(root_dir=str(tmp_path))
+    image_hash = store.put_content(png_bytes())
+    store.create_derivatives(image_hash)
+    assert store.stats["derivatives"] == len(DERIVATIVE_SIZES) * len(DERIVATIVE_FORMATS)
+
+    path, media_type = store.derivative(image_hash, 128, "jpeg")
+    assert media_type == "image/jpeg"
+    with Image.open(path) as image:
+        assert image.size == (128, 64)
+    assert store.stats["derivatives"] == len(DERIVATIVE_SIZES) * len(DERIVATIVE_FORMATS)  # Served from disk
@@ -0,0 +1,64 @@
+import random
+
+from keyword_sketch import CountMinSketch, KeywordTrendSketches, TopKTracker, sketch_indexes
+
+
+def test_sketch_indexes_are_deterministic_and_in_range():
+    indexes = sketch_indexes("sustainable", 64, 4)
+    assert indexes == sketch_indexes("sustainable", 64, 4)
+    assert len(indexes) == 4
+    assert all(0 <= index < 64 for index in indexes)
+
+
+def test_count_min_never_underestimates():
+    sketch = CountMinSketch(width=32, depth=3)
+    rng = random.Random(7)
+    truth = {}
+    for _ in range(2000):
+        key = f"kw{rng.randrange(200)}"
+        truth[key] = truth.get(key, 0) + 1
+        sketch.add(key)
+
+    assert sketch.total == 2000
+    assert all(sketch.estimate(key) >= count for key, count in truth.items())
+
+
+def test_count_min_is_exact_without_collisions():
+    sketch = CountMinSketch(width=4096, depth=4)
+    assert sketch.add("ai", count=3) == 3
+    assert sketch.add("ai") == 4
+    assert sketch.estimate("ai") == 4
+    assert sketch.estimate("never-seen") == 0
+
+
+def test_top_k_keeps_the_heaviest_keys():
+    tracker = TopKTracker(k=2)
+    tracker.offer("a", "A", 5)
+    tracker.offer("b", "B", 1)
+    tracker.offer("c", "C", 3)  # Replaces b, the current minimum
+    tracker.offer("d", "D", 2)  # Does not beat c
+    assert tracker.ranked() == [("A", 5), ("C", 3)]
+
+
+def test_trend_sketches_count_every_slice():
+    sketches = KeywordTrendSketches(width=256, depth=4, k=5)
+    sketches.record(["global", "city:london"], ["general", "fitness"], ["Yoga", "yoga ", "HIIT"])
+    sketches.record(["global"], ["general"], ["HIIT"])
+
+    # Keywords are counted case-insensitively, shown as last written
+    assert sorted(sketches.top_keywords("global", "general")) == [("HIIT", 2), ("yoga", 2)]
+    assert dict(sketches.top_keywords("city:london", "fitness")) == {"yoga": 2, "HIIT": 1}
+    assert sketches.top_keywords("city:paris", "general") == []
+    assert sketches.events_recorded == 2
+
+
+def test_trend_sketches_evict_least_recent_slice():
+    sketches = KeywordTrendSketches(width=64, depth=2, k=5, max_buckets=2)
+    sketches.record(["a"], ["general"], ["x"])
+    sketches.record(["b"], ["general"], ["x"])
+    sketches.record(["a"], ["general"], ["x"])  # Refreshes slice a
+    sketches.record(["c"], ["general"], ["x"])
+
+    assert sketches.get_stats()["buckets"] == 2
+    assert sketches.top_keywords("b", "general") == []
+    assert sketches.top_keywords("a", "general") == [("x", 2)]
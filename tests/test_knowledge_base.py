@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from knowledge_base import DEFAULT_RULES_PATH, PersonaKnowledgeBase, freeze
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(DEFAULT_RULES_PATH.read_text(encoding="utf-8"), encoding="utf-8")
+    return path
+
+
+def test_freeze_makes_tables_read_only():
+    frozen = freeze({"a": [1, {"b": 2}]})
+    assert isinstance(frozen["a"], tuple)
+    assert frozen["a"][1]["b"] == 2
+    with pytest.raises(TypeError):
+        frozen["a"][1]["b"] = 3
+
+
+def test_load_compiles_every_required_section(rules_file):
+    knowledge_base = PersonaKnowledgeBase(str(rules_file))
+    assert "instagram" in knowledge_base.section("ad_copy")["platform_templates"]
+    stats = knowledge_base.get_stats()
+    assert stats["loads"] == 1
+    assert stats["tables"]["behavioral.age_group_motivations"] > 0
+
+
+def test_reload_swaps_tables_and_keeps_them_on_error(rules_file):
+    knowledge_base = PersonaKnowledgeBase(str(rules_file))
+    rules = json.loads(rules_file.read_text(encoding="utf-8"))
+    rules["version"] = "test-reload"
+    rules["ad_copy"]["platform_templates"]["instagram"]["tone"] = "reloaded"
+    rules_file.write_text(json.dumps(rules), encoding="utf-8")
+
+    assert knowledge_base.load()["version"] == "test-reload"
+    assert knowledge_base.section("ad_copy")["platform_templates"]["instagram"]["tone"] == "reloaded"
+
+    del rules["behavioral"]["interest_modifiers"]
+    rules_file.write_text(json.dumps(rules), encoding="utf-8")
+    with pytest.raises(ValueError, match="interest_modifiers"):
+        knowledge_base.load()
+    assert knowledge_base.section("behavioral")["interest_modifiers"]
+    assert knowledge_base.loads == 2
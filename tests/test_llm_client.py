@@ -0,0 +1,96 @@
+import asyncio
+
+from llm_client import LatencyTracker, SharedLLMClient
+from llm_usage import usage_tracker
+
+
+class FakeClient:
+    """Completes after the next scheduled delay; records which attempts were cancelled"""
+
+    def __init__(self, *delays):
+        self.delays = list(delays)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def complete(self, prompt, **params):
+        delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        self.calls += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"reply after {delay}", {"prompt_tokens": 10, "completion_tokens": 5}
+
+
+def warmed_up(seconds=0.01):
+    shared = SharedLLMClient()
+    for _ in range(shared.latencies.min_samples):
+        shared.latencies.add("copy", seconds)
+    return shared
+
+
+def test_latency_percentile_needs_enough_samples():
+    tracker = LatencyTracker(window=10, min_samples=3)
+    tracker.add("copy", 1.0)
+    assert tracker.percentile("copy", 95) is None
+    for seconds in (2.0, 3.0, 4.0):
+        tracker.add("copy", seconds)
+    assert tracker.percentile("copy", 50) == 3.0
+    assert tracker.percentile("copy", 95) == 4.0
+
+
+def test_fast_primary_is_not_hedged():
+    shared = warmed_up(seconds=1.0)
+    client = FakeClient(0.0)
+    text, usage, attempts = asyncio.run(shared._hedged_complete("copy", client, "p", {}))
+    assert (text, attempts, client.calls) == ("reply after 0.0", 1, 1)
+    assert shared.hedge_stats["hedges"] == 0
+
+
+def test_slow_primary_is_hedged_and_the_loser_cancelled():
+    shared = warmed_up()
+    client = FakeClient(5.0, 0.0)
+    text, usage, attempts = asyncio.run(shared._hedged_complete("copy", client, "p", {}))
+    assert (text, attempts) == ("reply after 0.0", 2)
+    assert client.cancelled == 1
+    assert (shared.hedge_stats["hedges"], shared.hedge_stats["hedge_wins"]) == (1, 1)
+
+
+def test_hedge_rate_is_capped():
+    shared = warmed_up()
+    shared.max_hedge_rate = 0.0
+    client = FakeClient(0.05, 0.0)
+    text, usage, attempts = asyncio.run(shared._hedged_complete("copy", client, "p", {}))
+    assert (text, attempts, client.calls) == ("reply after 0.05", 1, 1)
+    assert shared.hedge_stats["capped"] == 1
+
+
+def test_cancelling_the_caller_cancels_every_attempt():
+    shared = warmed_up()
+    client = FakeClient(5.0)
+
+    async def run():
+        task = asyncio.create_task(shared._hedged_complete("copy", client, "p", {}))
+        await asyncio.sleep(0.05)  # Past the threshold: primary and hedge both running
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert (client.calls, client.cancelled) == (2, 2)
+
+
+def test_hedged_generation_bills_the_duplicate():
+    shared = warmed_up()
+    shared._clients["text"] = FakeClient(5.0, 0.0)
+    shared._settings["text"] = ("key", "")
+
+    async def run():
+        with usage_tracker.track_request():
+            await shared.generate_text("key", "p", use_cache=False, stage="copy", hedge=True, model="gpt-4o")
+            return usage_tracker.request_summary()
+
+    summary = asyncio.run(run())
+    assert set(summary["by_stage"]) == {"copy", "copy:hedge"}
+    assert summary["prompt_tokens"] == 20
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from llm_standin import LLMStandin, StandinConfig, app, standin
+
+
+@pytest.fixture
+def client():
+    config = standin.config
+    standin.configure({"text_latency_median_ms": 0, "image_latency_median_ms": 0, "latency_sigma": 0})
+    yield TestClient(app)
+    standin.config = config
+
+
+def test_json_prompts_get_one_entry_per_requested_platform():
+    text = LLMStandin(StandinConfig()).completion_text("Return a JSON object with one key per platform (facebook, google_ads)")
+    assert set(json.loads(text)) == {"facebook", "google_ads"}
+
+    text = LLMStandin(StandinConfig()).completion_text("a JSON object with one key per platform (x), each an array of 3 distinct alternatives")
+    assert len(json.loads(text)["x"]) == 3
+
+
+def test_chat_completion_reports_usage(client):
+    response = client.post("/v1/chat/completions", json={"model": "gpt-5", "messages": [{"role": "user", "content": "Write an ad"}]})
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["choices"][0]["message"]["content"].startswith("HEADLINE:")
+    assert payload["usage"]["total_tokens"] == payload["usage"]["prompt_tokens"] + payload["usage"]["completion_tokens"]
+
+
+def test_streamed_completion_reassembles_to_the_full_text(client):
+    response = client.post("/v1/chat/completions", json={"stream": True, "messages": [{"role": "user", "content": "Write an ad"}]})
+    lines = [line[len("data: "):] for line in response.text.splitlines() if line.startswith("data: ")]
+    assert lines[-1] == "[DONE]"
+    text = "".join(json.loads(line)["choices"][0]["delta"].get("content", "") for line in lines[:-1])
+    assert text == standin.completion_text("Write an ad")
+
+
+def test_configured_rate_limit_returns_429(client):
+    client.put("/standin/config", json={"rate_limit_rate": 1})
+    response = client.post("/v1/images/generations", json={"prompt": "persona", "n": 2})
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+    client.put("/standin/config", json={"rate_limit_rate": 0})
+    response = client.post("/v1/images/generations", json={"prompt": "persona", "n": 2})
+    assert len(response.json()["data"]) == 2
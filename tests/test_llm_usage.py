@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from llm_usage import LLMUsageTracker, estimate_tokens, summarize, text_cost
+
+
+def test_text_cost_uses_model_prices_per_million_tokens():
+    assert text_cost("gpt-4o-mini", 1_000_000, 1_000_000) == pytest.approx(0.75)
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcde") == 2
+
+
+def test_record_text_prefers_provider_token_counts_and_cached_calls_are_free():
+    tracker = LLMUsageTracker()
+    record = tracker.record_text("copy", "gpt-4o", "x" * 40, "y" * 8, 120.0, usage={"prompt_tokens": 100, "completion_tokens": 50})
+    assert (record.prompt_tokens, record.completion_tokens) == (100, 50)
+    assert tracker.record_text("copy", "gpt-4o", "x" * 40, "y" * 8, 1.0, cached=True).cost_usd == 0.0
+
+
+def test_summarize_aggregates_by_stage_and_model():
+    tracker = LLMUsageTracker()
+    records = [
+        tracker.record("persona", "gpt-4o", 10, 5, latency_ms=100),
+        tracker.record("copy", "gpt-4o", 20, 5, latency_ms=300),
+        tracker.record("copy", "dall-e-3", latency_ms=500, cost_usd=0.04)
+    ]
+    summary = summarize(records)
+    assert summary["calls"] == 3
+    assert summary["by_stage"]["copy"]["avg_latency_ms"] == 400.0
+    assert summary["by_model"]["gpt-4o"]["prompt_tokens"] == 30
+    assert summary["max_latency_ms"] == 500.0
+
+
+def test_request_tracking_collects_calls_from_gathered_tasks():
+    tracker = LLMUsageTracker()
+
+    async def call(stage):
+        tracker.record(stage, "gpt-4o", 1, 1)
+
+    async def handle():
+        with tracker.track_request() as records:
+            await asyncio.gather(call("a"), call("b"))
+            return records, tracker.request_summary()
+
+    records, summary = asyncio.run(handle())
+    assert sorted(record.stage for record in records) == ["a", "b"]
+    assert summary["calls"] == 2
+    assert tracker.request_summary() is None  # Outside the request
+    assert tracker.window_summary("5m")["calls"] == 2
@@ -0,0 +1,59 @@
+from motivation_matrices import MotivationMatrices
+from persona_resolution import ResolvedLocation
+
+RULES = {
+    "age_group_motivations": {"25-34": {"A": 80, "B": 50}, "55+": {"A": 40}},
+    "interest_modifiers": {"fit": {"B": 30, "C": 10}},
+    "location_modifiers": {"city:x": {"D": [70, 5], "A": [50, 30]}}
+}
+
+PLACE_X = ResolvedLocation(display="X", city="X", state=None, country=None, region=None, keys=("city:x",))
+
+
+def test_scores_apply_age_interest_and_location_rules():
+    matrices = MotivationMatrices(RULES)
+    scores = matrices.score(["25-34", "55+", "unknown"], [["fit"], [], []], [None, PLACE_X, None])
+    charts = matrices.top_motivations(scores, limit=3)
+
+    # Interest-only motivations start from 60; ties keep vocabulary order
+    assert charts[0] == [{"label": "A", "value": 80}, {"label": "B", "value": 80}, {"label": "C", "value": 70}]
+    # Location defaults fill in missing motivations; existing ones get the bonus
+    assert charts[1] == [{"label": "D", "value": 75}, {"label": "A", "value": 70}]
+    # Unknown age ranges fall back to the default row
+    assert charts[2] == [{"label": "A", "value": 80}, {"label": "B", "value": 50}]
+
+
+def test_scores_are_clipped_at_100():
+    rules = {**RULES, "interest_modifiers": {"fit": {"A": 30}, "run": {"A": 30}}}
+    matrices = MotivationMatrices(rules)
+    charts = matrices.top_motivations(matrices.score(["25-34"], [["fit", "run", "fit"]], [None]))
+    assert charts[0][0] == {"label": "A", "value": 100}
+
+
+def test_batch_charts_match_the_per_persona_path():
+    from marketing_intelligence import BehavioralAnalysisProcessor
+
+    processor = BehavioralAnalysisProcessor()
+    personas = [
+        {"age_range": "25-34", "interests": ["fitness", "technology"], "location": "New York, NY"},
+        {"age_range": "55+", "interests": ["travel", "family"], "location": "London, UK"},
+        {"age_range": "18-24", "interests": ["gaming"], "location": None}
+    ]
+    batch = processor.generate_behavioral_chart_data_batch(personas)
+    for persona, chart in zip(personas, batch):
+        single = processor.generate_behavioral_chart_data(persona["age_range"], persona["interests"], persona["location"])
+        # Equal values may be ordered differently, the values themselves may not
+        assert [row["value"] for row in chart] == [row["value"] for row in single]
+
+
+def test_demographic_batch_is_seeded_and_centred_on_the_age_range():
+    from marketing_intelligence import BehavioralAnalysisProcessor
+
+    processor = BehavioralAnalysisProcessor()
+    personas = [{"age_range": "18-24", "interests": ["a"], "location": "X"}, {"age_range": "35-44", "interests": [], "location": "Y"}]
+    first = processor.generate_demographic_breakdown_batch(personas, seed=3)
+    assert first == processor.generate_demographic_breakdown_batch(personas, seed=3)
+
+    percentages = [[group["percentage"] for group in breakdown["age_distribution"]] for breakdown in first]
+    assert 75 <= percentages[0][0] <= 85 and percentages[0][1] == 100 - percentages[0][0]
+    assert 75 <= percentages[1][2] <= 85 and percentages[1][1] == percentages[1][3] == (100 - percentages[1][2]) // 2
@@ -0,0 +1,33 @@
+from persona_features import PersonaFeatureExtractor, PersonaPhraseMatcher
+
+
+def test_phrase_matcher_prefers_longer_phrases_and_normalizes_text():
+    matcher = PersonaPhraseMatcher({"age:young_adult": ["young adult"], "age:young": ["young"], "tech:savvy": ["tech savvy"]})
+    assert matcher.match("Young-Adults who are tech_savvy") == {"age:young_adult", "tech:savvy"}
+    assert matcher.match("youngish") == frozenset()
+
+
+def test_extractor_picks_single_valued_features_by_priority():
+    extractor = PersonaFeatureExtractor()
+    features = extractor.extract(
+        "Busy millennial startup founder, tech-savvy, on a budget",
+        "SaaS platform with premium support",
+        "London, UK",
+        "fitness, travel"
+    )
+    assert features.age_cohort == "millennial"
+    assert features.lifestyle == "startup"
+    assert features.tech_level == "savvy"
+    assert features.product_kind == "software"
+    assert features.has("trait:busy", "style:luxury")
+    assert not features.has("age:gen_z")
+    assert features.location.country == "United Kingdom"
+    assert features.interest_ids == ("fitness", "travel")
+
+
+def test_extractor_caches_per_request_inputs():
+    extractor = PersonaFeatureExtractor()
+    first = extractor.extract("Gen Z gamer")
+    assert extractor.extract("Gen Z gamer") is first
+    assert first.age_cohort == "gen_z"
+    assert first.location is None and first.interest_ids == ()
@@ -0,0 +1,71 @@
+from persona_resolution import InterestResolver, LocationResolver
+
+
+def test_interest_synonyms_resolve_to_canonical_ids():
+    resolver = InterestResolver()
+    assert resolver.resolve("Machine Learning") == ("technology",)
+    assert resolver.resolve("  Eco_Friendly ") == ("sustainability",)  # Read as "eco friendly"
+    assert resolver.resolve("Yoga & Meditation") == ("wellness",)
+    assert resolver.resolve("video games") == ("gaming",)
+
+
+def test_interest_prefix_fallback_needs_three_characters():
+    resolver = InterestResolver()
+    assert resolver.resolve("photo") == ("photography",)
+    assert resolver.resolve("ph") == ()
+
+
+def test_resolve_all_is_ordered_and_deduplicated():
+    resolver = InterestResolver()
+    assert resolver.resolve_all(["tech", "AI", "travel", "software"]) == ["technology", "travel"]
+    assert resolver.resolve_text("fitness, travel,, ") == ["fitness", "travel"]
+    assert resolver.resolve_text(None) == []
+
+
+def test_interest_resolution_is_cached():
+    resolver = InterestResolver(cache_size=8)
+    resolver.resolve("Fitness")
+    resolver.resolve("  fitness ")
+    stats = resolver._cache.get_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_location_aliases_and_state_codes_resolve_to_one_place():
+    resolver = LocationResolver()
+    nyc = resolver.resolve("NYC")
+    assert nyc == resolver.resolve("New York, NY")
+    assert nyc.keys == ("city:new-york-city", "state:united-states:ny", "country:united-states", "region:north-america")
+
+
+def test_ambiguous_state_code_follows_the_matched_country():
+    resolver = LocationResolver()
+    assert resolver.resolve("Seattle, WA").keys[1] == "state:united-states:wa"
+    assert resolver.resolve("Perth, WA").keys[1] == "state:australia:wa"
+
+
+def test_washington_dc_is_not_washington_state():
+    resolver = LocationResolver()
+    for location in ("Washington DC", "Washington, D.C.", "washington d.c. area", "District of Columbia", "DC"):
+        assert resolver.resolve(location).keys[0] == "state:united-states:dc", location
+    assert resolver.resolve("Washington").keys[0] == "state:united-states:wa"
+
+
+def test_location_accents_regions_and_partial_names():
+    resolver = LocationResolver()
+    assert resolver.resolve("Sao Paulo").city == "São Paulo"
+    assert resolver.resolve("Europe").keys == ("region:europe",)
+    assert resolver.resolve("san fran").city == "San Francisco"
+
+
+def test_unknown_and_empty_locations_resolve_to_none():
+    resolver = LocationResolver()
+    assert resolver.resolve("nowhere xyz") is None
+    assert resolver.resolve("   ") is None
+    assert resolver.resolve(None) is None
+
+
+def test_resolved_location_lookup_prefers_the_most_specific_key():
+    place = LocationResolver().resolve("London, UK")
+    table = {"region:europe": "eu", "country:united-kingdom": "uk"}
+    assert place.lookup(table) == "uk"
+    assert place.lookup({}, "default") == "default"
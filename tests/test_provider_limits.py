@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+import provider_limits
+from provider_limits import AIMDLimiter, is_overload
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(provider_limits.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_is_overload_recognizes_throttling_and_server_errors():
+    assert is_overload(ProviderError(429))
+    assert is_overload(ProviderError(503))
+    assert not is_overload(ProviderError(400))
+    assert is_overload(asyncio.TimeoutError())
+    assert is_overload(RuntimeError("Rate limit reached for requests"))
+    assert not is_overload(ValueError("bad prompt"))
+
+
+def test_queued_calls_are_admitted_in_fifo_order():
+    async def run():
+        limiter = AIMDLimiter("test", initial_limit=1)
+        admitted = []
+
+        async def call(index):
+            await limiter.acquire()
+            admitted.append(index)
+
+        await limiter.acquire()
+        tasks = [asyncio.create_task(call(index)) for index in range(3)]
+        await asyncio.sleep(0)
+        assert limiter.get_stats()["queue_depth"] == 3
+
+        for _ in range(3):
+            limiter.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return admitted, limiter.get_stats()
+
+    admitted, stats = asyncio.run(run())
+    assert admitted == [0, 1, 2]
+    assert (stats["queued"], stats["max_queue_depth"], stats["in_flight"]) == (3, 3, 1)
+
+
+def test_cancelled_waiter_skipped_by_release_still_raises_cancelled():
+    async def run():
+        limiter = AIMDLimiter("test", initial_limit=1)
+        await limiter.acquire()
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        queued.cancel()
+        limiter.release()  # Pops the cancelled future before the task wakes up
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        return limiter.get_stats()
+
+    stats = asyncio.run(run())
+    assert (stats["in_flight"], stats["queue_depth"]) == (0, 0)
+
+
+def test_overload_halves_the_limit_at_most_once_per_interval(clock):
+    limiter = AIMDLimiter("test", initial_limit=8)
+    limiter.record(0.1, overloaded=True)
+    limiter.record(0.1, overloaded=True)  # Same window: ignored
+    assert limiter.limit == 4
+
+    clock[0] += 1
+    limiter.record(0.1, overloaded=True)
+    assert limiter.limit == 2
+    assert (limiter.stats["overloads"], limiter.stats["decreases"]) == (3, 2)
+
+
+def test_overload_never_drops_below_the_minimum(clock):
+    limiter = AIMDLimiter("test", initial_limit=2, min_limit=1)
+    for _ in range(3):
+        clock[0] += 1
+        limiter.record(0.1, overloaded=True)
+    assert limiter.limit == 1
+
+
+def test_healthy_calls_grow_the_limit_only_while_it_constrains():
+    limiter = AIMDLimiter("test", initial_limit=4, max_limit=5)
+    limiter.record(0.1, overloaded=False)  # Idle: nothing to gain
+    assert limiter.limit == 4
+
+    limiter.in_flight = 3
+    limiter.record(0.1, overloaded=False)
+    assert limiter.limit == pytest.approx(4.25)
+
+    limiter.limit = 4.99
+    limiter.in_flight = 4
+    limiter.record(0.1, overloaded=False)
+    assert limiter.limit == 5  # Capped at max_limit
+
+
+def test_slow_calls_trim_the_limit_gently(clock):
+    limiter = AIMDLimiter("test", initial_limit=10)
+    limiter.record(0.1, overloaded=False)
+    clock[0] += 1
+    limiter.record(1.0, overloaded=False)  # Past 2x the baseline
+    assert limiter.limit == pytest.approx(9)
+    assert limiter.stats["slow_calls"] == 1
+
+
+def test_slot_feeds_provider_errors_back(clock):
+    async def run():
+        limiter = AIMDLimiter("test", initial_limit=8)
+        with pytest.raises(ProviderError):
+            async with limiter.slot():
+                raise ProviderError(429)
+        clock[0] += 1
+        async with limiter.slot() as call:
+            call.mark_overloaded()
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter.limit == 2
+    assert limiter.in_flight == 0
+    assert limiter.stats["calls"] == 2
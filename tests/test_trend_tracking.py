@@ -0,0 +1,59 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from trend_tracking import DecayingCounter, TrendingTopicTracker
+
+
+def test_counter_decays_exponentially_over_its_window():
+    counter = DecayingCounter(window_seconds=100)
+    counter.add("ai", now=0.0, amount=10)
+    counter.add("ai", now=100.0)
+
+    ((key, score),) = counter.top(1, now=100.0)
+    assert key == "ai"
+    assert score == pytest.approx(10 * math.exp(-1) + 1, abs=1e-3)
+
+
+def test_counter_top_orders_and_drops_faded_keys():
+    counter = DecayingCounter(window_seconds=10)
+    counter.add("old", now=0.0, amount=5)
+    counter.add("new", now=100.0, amount=2)
+    assert counter.top(5, now=100.0) == [("new", 2.0)]
+
+
+def test_counter_prunes_the_weakest_keys():
+    counter = DecayingCounter(window_seconds=1000, max_keys=4)
+    for index in range(5):
+        counter.add(f"k{index}", now=0.0, amount=index + 1)
+    assert [key for key, _ in counter.top(10, now=0.0)] == ["k4", "k3", "k2"]
+
+
+def test_tracker_extracts_themes_and_keywords():
+    title = "How AI and Green Energy Are Changing the Community"
+    assert TrendingTopicTracker.extract_themes(title) == ["technology_adoption", "sustainability_focus", "social_engagement"]
+    assert TrendingTopicTracker.extract_keywords(title) == ["green", "energy", "changing", "community"]
+
+
+def test_tracker_counts_each_article_once():
+    tracker = TrendingTopicTracker()
+    article = {"title": "Digital wallets go mainstream", "url": "https://example.com/a"}
+    assert tracker.ingest_article(article) is True
+    assert tracker.ingest_article(article) is False
+    assert tracker.ingest_articles([article, {"title": "Digital art booms"}]) == 1
+
+    snapshot = tracker.get_snapshot("1h")
+    assert snapshot["articles_ingested"] == 2
+    assert snapshot["themes"][0]["theme"] == "technology_adoption"
+    assert snapshot["keywords"][0]["keyword"] == "digital"
+    assert tracker.top_themes("24h") == ["technology_adoption"]
+
+
+def test_concurrent_ingests_count_each_article_once():
+    tracker = TrendingTopicTracker()
+    articles = [{"title": f"Headline {index}", "url": f"https://example.com/{index}"} for index in range(200)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        new_counts = list(pool.map(tracker.ingest_articles, [articles] * 8))
+    assert sum(new_counts) == 200
+    assert tracker.articles_ingested == 200